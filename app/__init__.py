@@ -24,8 +24,17 @@ from flask_mail import Mail
 from flask_migrate import Migrate
 from sqlalchemy import select
 
+from . import (
+    assets,
+    category_tree,
+    page_cache,
+    search,  # noqa: F401  (registers the search index sync events)
+    showcase_cache,
+    sidebar_cache,
+    storage,
+)
 from .config import DevelopmentConfig, ProductionConfig, TestingConfig
-from .models import Category, User, db
+from .models import User, db
 
 login_manager = LoginManager()
 mail = Mail()
@@ -56,6 +65,9 @@ def create_app(config_class=None):  # noqa: C901
     app.config["THUMBNAIL_DIR"] = os.path.join(
         app.root_path, app.config["THUMBNAIL_DIR"]
     )
+    app.config["DERIVATIVE_DIR"] = os.path.join(
+        app.root_path, app.config["DERIVATIVE_DIR"]
+    )
 
     # Configure logging early
     _configure_logging(app)
@@ -65,6 +77,12 @@ def create_app(config_class=None):  # noqa: C901
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"  # type: ignore
     mail.init_app(app)
+    category_tree.init_app(app)
+    showcase_cache.init_app(app)
+    sidebar_cache.init_app(app)
+    storage.init_app(app)
+    assets.init_app(app)
+    page_cache.init_app(app)
 
     @login_manager.user_loader
     def load_user(user_id):
@@ -72,28 +90,17 @@ def create_app(config_class=None):  # noqa: C901
             select(User).where(User.id == int(user_id))
         ).scalar_one_or_none()
 
-    @app.context_processor
-    def inject_navbar_data():
-        categories = (
-            db.session.execute(
-                select(Category)
-                .where(Category.parent_id.is_(None))
-                .order_by(Category.name)
-            )
-            .scalars()
-            .all()
-        )
-        return {"categories": categories}
-
     @app.context_processor
     def inject_title_separator():
         return {"title_separator": " | "}
 
     from .routes.admin import admin_bp
+    from .routes.api import api_bp
     from .routes.auth import auth_bp
     from .routes.categories import categories_bp
     from .routes.errors import errors_bp
     from .routes.listings import listings_bp
+    from .routes.media import media_bp
     from .routes.users import users_bp
     from .routes.utils import utils_bp
 
@@ -110,6 +117,8 @@ def create_app(config_class=None):  # noqa: C901
         users_bp
     )  # No prefix - handles /profile, /profile/edit, and /admin/users/*
     app.register_blueprint(utils_bp, url_prefix="/utils")
+    app.register_blueprint(media_bp)  # /media/<area>/<name>
+    app.register_blueprint(api_bp)  # /api/listings
     app.register_blueprint(listings_bp, url_prefix="/")
 
     @app.cli.command("init")
@@ -134,6 +143,16 @@ def create_app(config_class=None):  # noqa: C901
                 f"Thumbnails directory already exists at {app.config['THUMBNAIL_DIR']}."
             )
 
+        # Ensure derivatives (responsive image sizes) directory exists
+        if not os.path.exists(app.config["DERIVATIVE_DIR"]):
+            os.makedirs(app.config["DERIVATIVE_DIR"])
+            print(f"Created derivatives directory: {app.config['DERIVATIVE_DIR']}")
+        else:
+            print(
+                f"Derivatives directory already exists at "
+                f"{app.config['DERIVATIVE_DIR']}."
+            )
+
         # Ensure temp directory exists
         app.config["TEMP_DIR"] = os.path.join(app.root_path, app.config["TEMP_DIR"])
         if not os.path.exists(app.config["TEMP_DIR"]):
@@ -182,11 +201,25 @@ def create_app(config_class=None):  # noqa: C901
             "Please create categories via the admin dashboard as needed."
         )
 
+    # Maintenance and job worker commands are needed in every environment
+    from app.cli.maintenance import (
+        backfill_thumbnails,
+        reap_files_command,
+        rebuild_search_index_command,
+        reconcile_listing_counts_command,
+    )
+
+    app.cli.add_command(backfill_thumbnails)
+    app.cli.add_command(reconcile_listing_counts_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(reap_files_command)
+
+    from app.cli.jobs import run_jobs_command
+
+    app.cli.add_command(run_jobs_command)
+
     # Import CLI commands from separate modules based on environment
     if os.environ.get("FLASK_ENV") == "development":
-        from app.cli.maintenance import backfill_thumbnails
-
-        app.cli.add_command(backfill_thumbnails)
         from app.cli.demo import demo_data
 
         app.cli.add_command(demo_data)
@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Long-lived HTTP caching of static assets and media.
+
+asset_url('css/styles.css') returns "/static/css/styles.css?v=<digest>", where
+the digest is taken from the file's content: a changed file gets a new URL, so
+responses for the current URL can be cached by browsers and CDNs for a year
+(immutable). Digests are computed once per file and worker; in debug mode they
+are recomputed when a file's modification time changes.
+
+make_immutable() is shared with the media route and the S3 backend, whose
+content-named files never change either. release_fingerprint() digests the
+templates and CSS/JS of the running code, for validators of rendered pages.
+"""
+
+import hashlib
+import os
+from typing import Optional
+
+from flask import current_app, request, url_for
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+
+# Absolute path -> (mtime, digest)
+_fingerprints: dict[str, tuple[float, str]] = {}
+# Digest of the templates and CSS/JS files, computed once per worker
+_release_fingerprint: Optional[str] = None
+
+
+def make_immutable(response):
+    """Mark a response as cacheable for a year without revalidation."""
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+def fingerprint(filename: str) -> Optional[str]:
+    """Short content digest of a file in the static folder (None if missing)."""
+    path = os.path.join(current_app.static_folder or "", filename)
+    cached = _fingerprints.get(path)
+    if cached is not None and not current_app.debug:
+        return cached[1]
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    if cached is None or cached[0] != mtime:
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(f.read(), digest_size=6).hexdigest()
+        cached = _fingerprints[path] = (mtime, digest)
+    return cached[1]
+
+
+def release_fingerprint() -> str:
+    """
+    Short digest of every template and CSS/JS file: changes with a deploy
+    that changes how pages render. Recomputed on every call in debug mode.
+    """
+    global _release_fingerprint
+    if _release_fingerprint is not None and not current_app.debug:
+        return _release_fingerprint
+    static_folder = current_app.static_folder or ""
+    roots = (
+        os.path.join(current_app.root_path, current_app.template_folder or ""),
+        os.path.join(static_folder, "css"),
+        os.path.join(static_folder, "js"),
+    )
+    digest = hashlib.blake2b(digest_size=6)
+    for root in roots:
+        for dirpath, _, filenames in sorted(os.walk(root)):
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                digest.update(os.path.relpath(path, root).encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    _release_fingerprint = digest.hexdigest()
+    return _release_fingerprint
+
+
+def asset_url(filename: str) -> str:
+    """Fingerprinted URL of a static CSS/JS file, for templates."""
+    digest = fingerprint(filename)
+    if digest is None:
+        return url_for("static", filename=filename)
+    return url_for("static", filename=filename, v=digest)
+
+
+def _cache_fingerprinted_assets(response):
+    # Only the current fingerprint is immutable: stale or made-up ones are not
+    if (
+        request.endpoint == "static"
+        and response.status_code in (200, 304)
+        and request.view_args
+        and request.args.get("v")
+        == fingerprint(request.view_args.get("filename", ""))
+    ):
+        make_immutable(response)
+    return response
+
+
+def init_app(app) -> None:
+    """Register the asset_url() template global and the cache headers hook."""
+    app.jinja_env.globals["asset_url"] = asset_url
+    app.after_request(_cache_fingerprinted_assets)
@@ -0,0 +1,271 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+In-process, versioned snapshot of the category hierarchy.
+
+Category browsing needs path resolution, breadcrumbs, full paths and descendant
+sets on every request. Computing those from the ORM means either a full table
+scan or one lazy load per parent/child. Instead, each worker builds an immutable
+CategoryTree once (a single column-only query) and reuses it until a category
+write bumps the "category_tree" row in the cache_generation table.
+
+Per request the only cost is a primary-key read of that generation counter,
+memoized on flask.g so repeated lookups in one request are free.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .models import (
+    CATEGORY_TREE_GENERATION,
+    Category,
+    as_utc,
+    db,
+    get_cache_generation,
+    get_cache_generation_state,
+)
+
+
+@dataclass(frozen=True)
+class CategoryNode:
+    """
+    Immutable, category-like view of one node in a CategoryTree.
+
+    Exposes the same read-only interface templates and helpers use on Category
+    (id, name, url_name, url_path, parent, breadcrumb, children, get_full_path(),
+    get_descendant_ids()) without touching the database.
+    """
+
+    id: int
+    name: str
+    url_name: str
+    parent_id: Optional[int]
+    sort_order: int
+    path: Optional[str]
+    url_path: str
+    full_path: str
+    ancestor_ids: tuple[int, ...]
+    descendant_ids: tuple[int, ...]
+    _tree: "CategoryTree" = field(repr=False, compare=False)
+
+    @property
+    def parent(self) -> Optional["CategoryNode"]:
+        return self._tree.get(self.parent_id)
+
+    @property
+    def breadcrumb(self) -> list["CategoryNode"]:
+        """Nodes from root to self (same contract as Category.breadcrumb)."""
+        return [self._tree.by_id[cid] for cid in self.ancestor_ids] + [self]
+
+    @property
+    def children(self) -> tuple["CategoryNode", ...]:
+        """Direct children, ordered by name."""
+        return self._tree.children_of(self.id)
+
+    def get_full_path(self) -> str:
+        return self.full_path
+
+    def get_descendant_ids(self) -> list[int]:
+        """IDs of this category and all its descendants (self first)."""
+        return list(self.descendant_ids)
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name}
+
+
+class CategoryTree:
+    """
+    Immutable snapshot of all categories, tagged with the generation it was
+    built from.
+
+    Lookups:
+    - by_id: id -> CategoryNode
+    - by_parent_and_url_name: (parent_id, url_name) -> CategoryNode
+    - roots / children_of(): name-ordered levels of the hierarchy
+
+    last_modified is the latest change to any category (including deletes),
+    or None for a tree that was never written.
+    """
+
+    def __init__(
+        self, generation: int, rows, last_modified: Optional[datetime] = None
+    ):
+        self.generation = generation
+        self.last_modified = last_modified
+        self.by_id: dict[int, CategoryNode] = {}
+        self.by_parent_and_url_name: dict[tuple[Optional[int], str], CategoryNode] = {}
+
+        parent_of: dict[int, Optional[int]] = {}
+        row_by_id = {}
+        child_ids: dict[Optional[int], list[int]] = {}
+        for row in rows:
+            row_by_id[row.id] = row
+            parent_of[row.id] = row.parent_id
+            child_ids.setdefault(row.parent_id, []).append(row.id)
+
+        # Ancestor chains (root first), guarding against cycles
+        ancestors: dict[int, tuple[int, ...]] = {}
+        for category_id in row_by_id:
+            chain = []
+            visited = {category_id}
+            parent_id = parent_of[category_id]
+            while parent_id is not None and parent_id in row_by_id:
+                if parent_id in visited:
+                    break
+                visited.add(parent_id)
+                chain.insert(0, parent_id)
+                parent_id = parent_of[parent_id]
+            ancestors[category_id] = tuple(chain)
+
+        # Descendant sets: every node belongs to the subtree of each ancestor
+        descendants: dict[int, list[int]] = {cid: [cid] for cid in row_by_id}
+        for category_id, chain in ancestors.items():
+            for ancestor_id in chain:
+                descendants[ancestor_id].append(category_id)
+
+        for category_id, row in row_by_id.items():
+            chain = ancestors[category_id]
+            names = [row_by_id[cid].name for cid in chain] + [row.name]
+            url_names = [row_by_id[cid].url_name for cid in chain] + [row.url_name]
+            node = CategoryNode(
+                id=row.id,
+                name=row.name,
+                url_name=row.url_name,
+                parent_id=row.parent_id,
+                sort_order=row.sort_order,
+                path=row.path,
+                url_path="/".join(url_names),
+                full_path=" > ".join(names),
+                ancestor_ids=chain,
+                descendant_ids=tuple(descendants[category_id]),
+                _tree=self,
+            )
+            self.by_id[row.id] = node
+            self.by_parent_and_url_name[(row.parent_id, row.url_name)] = node
+
+        self._children: dict[Optional[int], tuple[CategoryNode, ...]] = {
+            parent_id: tuple(
+                sorted((self.by_id[cid] for cid in ids), key=lambda node: node.name)
+            )
+            for parent_id, ids in child_ids.items()
+        }
+
+    @classmethod
+    def build(cls, session, generation: int) -> "CategoryTree":
+        """Load every category as plain column tuples and build a snapshot."""
+        rows = session.execute(
+            select(
+                Category.id,
+                Category.name,
+                Category.url_name,
+                Category.parent_id,
+                Category.sort_order,
+                Category.path,
+                Category.updated_at,
+            )
+        ).all()
+        # Deletes leave no updated_at behind: the generation's bump time covers them
+        _, bumped_at = get_cache_generation_state(session, CATEGORY_TREE_GENERATION)
+        times = [as_utc(row.updated_at) for row in rows] + [bumped_at]
+        last_modified = max((t for t in times if t is not None), default=None)
+        return cls(generation, rows, last_modified)
+
+    @property
+    def roots(self) -> tuple[CategoryNode, ...]:
+        return self._children.get(None, ())
+
+    def children_of(self, category_id: Optional[int]) -> tuple[CategoryNode, ...]:
+        return self._children.get(category_id, ())
+
+    def get(self, category_id: Optional[int]) -> Optional[CategoryNode]:
+        if category_id is None:
+            return None
+        return self.by_id.get(category_id)
+
+    def all_by_name(self) -> list[CategoryNode]:
+        """Every node, ordered by name (matches select(Category).order_by(name))."""
+        return sorted(self.by_id.values(), key=lambda node: node.name)
+
+    def resolve_path(self, path_string: str) -> Optional[CategoryNode]:
+        """
+        Resolve a slash-separated url_name path (e.g. "vehicles/motorcycles").
+
+        Returns None if the path is empty or any segment does not match.
+        """
+        segments = [segment for segment in (path_string or "").split("/") if segment]
+        if not segments:
+            return None
+        node: Optional[CategoryNode] = None
+        parent_id: Optional[int] = None
+        for segment in segments:
+            node = self.by_parent_and_url_name.get((parent_id, segment))
+            if node is None:
+                return None
+            parent_id = node.id
+        return node
+
+
+class CategoryTreeCache:
+    """
+    Per-app, per-process holder of the current CategoryTree.
+
+    Rebuilds the snapshot only when the stored generation differs from the one
+    the cached tree was built from.
+    """
+
+    def __init__(self):
+        self._tree: Optional[CategoryTree] = None
+        self._lock = threading.Lock()
+
+    def get(self, session) -> CategoryTree:
+        generation = get_cache_generation(session, CATEGORY_TREE_GENERATION)
+        tree = self._tree
+        if tree is not None and tree.generation == generation:
+            return tree
+        with self._lock:
+            if self._tree is None or self._tree.generation != generation:
+                self._tree = CategoryTree.build(session, generation)
+            return self._tree
+
+
+def init_app(app) -> None:
+    """Register the category tree cache on the Flask app."""
+    app.extensions["category_tree"] = CategoryTreeCache()
+
+
+def get_category_tree(session=None) -> CategoryTree:
+    """
+    Return the category tree snapshot for the current request.
+
+    The generation check runs at most once per application context; the result
+    is memoized on flask.g and dropped when this process commits a category write.
+    """
+    if "category_tree" in g:
+        return g.category_tree
+    if session is None:
+        session = db.session
+    tree = current_app.extensions["category_tree"].get(session)
+    g.category_tree = tree
+    return tree
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_request_category_tree(session):
+    """Drop the request-memoized tree after committing a category write."""
+    if session.info.pop("category_tree_changed", False) and has_app_context():
+        g.pop("category_tree", None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_category_tree_flag(session):
+    session.info.pop("category_tree_changed", None)
@@ -33,8 +33,10 @@ from flask import current_app
 from sqlalchemy import select
 
 from app import db
-from app.cli.maintenance import run_backfill_thumbnails
+from app.jobs import run_pending_jobs
 from app.models import Category, Listing, ListingImage, User
+from app.routes.utils import hash_file, queue_image_jobs, shared_content_hashes
+from app.storage import get_storage
 
 # from PIL import Image, ImageDraw, ImageFont
 
@@ -339,7 +341,7 @@ def demo_data(replace, images_only, cache_only):  # noqa: C901
         # If load_dotenv fails for any reason, continue without aborting the CLI
         pass
 
-    thumbnail_dir = current_app.config["THUMBNAIL_DIR"]
+    storage = get_storage()
 
     # Images-only mode: fetch fresh images from Unsplash, skipping cache
     if images_only:
@@ -374,9 +376,6 @@ def demo_data(replace, images_only, cache_only):  # noqa: C901
             "Replacing demo listings: clearing demo listings/images only; "
             "preserving users and categories."
         )
-        upload_dir = current_app.config["UPLOAD_DIR"]
-        thumbnail_dir = current_app.config["THUMBNAIL_DIR"]
-
         # Identify demo listings by marker in description
         all_listings = db.session.execute(select(Listing)).scalars().all()
         demo_listings = [
@@ -392,6 +391,14 @@ def demo_data(replace, images_only, cache_only):  # noqa: C901
         existing_images = []
         for lst in demo_listings:
             existing_images.extend(list(lst.images))
+        # Files whose content other (non-demo) listings also use are kept
+        shared = shared_content_hashes(existing_images)
+        existing_images = [
+            img for img in existing_images if img.content_hash not in shared
+        ]
+        existing_derivatives = [
+            d.filename for img in existing_images for d in img.derivatives
+        ]
         try:
             # Delete demo listings using ORM to trigger cascade for images
             for lst in demo_listings:
@@ -406,23 +413,23 @@ def demo_data(replace, images_only, cache_only):  # noqa: C901
             print(f"ERROR: Failed to clear demo listings: {e}")
             return
 
-        # Remove files on disk for previously recorded images
-        removed_files = 0
+        # Remove stored files of previously recorded images
+        stored_files = []
         for img in existing_images:
+            stored_files.append(("uploads", img.filename))
+            if img.thumbnail_filename:
+                stored_files.append(("thumbnails", img.thumbnail_filename))
+        stored_files.extend(("derivatives", name) for name in existing_derivatives)
+        removed_files = 0
+        for area, name in stored_files:
             try:
-                img_path = os.path.join(upload_dir, img.filename)
-                if os.path.exists(img_path):
-                    os.remove(img_path)
+                if storage.exists(area, name):
+                    storage.delete(area, name)
                     removed_files += 1
-                if img.thumbnail_filename:
-                    thumb_path = os.path.join(thumbnail_dir, img.thumbnail_filename)
-                    if os.path.exists(thumb_path):
-                        os.remove(thumb_path)
-                        removed_files += 1
             except Exception:
                 # Continue on individual file errors
                 pass
-        print(f"Removed {removed_files} files from uploads/thumbnails.")
+        print(f"Removed {removed_files} files from uploads/thumbnails/derivatives.")
 
     # Get subcategories only
     subcats = get_or_create_categories()
@@ -568,24 +575,32 @@ def demo_data(replace, images_only, cache_only):  # noqa: C901
 
     # Demo images: fetch/reuse Unsplash images for keyword queries
     src_folder = os.path.join(current_app.root_path, DEMO_IMAGES_FOLDER)
-    dest_folder = os.path.join(current_app.root_path, current_app.config["UPLOAD_DIR"])
-    os.makedirs(dest_folder, exist_ok=True)
-    os.makedirs(thumbnail_dir, exist_ok=True)
 
     # Build/refresh cache; returns only real images (no randoms)
-    image_files = ensure_demo_images(
+    ensure_demo_images(
         src_folder, queries=listing_queries, cache_only=cache_only
     )
-    # Optional eager copy to uploads for the ones we have
-    for fname in image_files:
-        src_path = os.path.join(src_folder, fname)
-        dest_path = os.path.join(dest_folder, fname)
-        if os.path.exists(src_path) and not os.path.exists(dest_path):
-            shutil.copyfile(src_path, dest_path)
+    # Cached images are stored in uploads under their content hash, so every
+    # listing that reuses one shares a single copy (and thumbnail)
+    stored_names = {}
+
+    def store_cached_image(img_name):
+        if img_name not in stored_names:
+            src_path = os.path.join(src_folder, img_name)
+            content_hash = hash_file(src_path)
+            ext = os.path.splitext(img_name)[1].lower()
+            stored_name = f"{content_hash}{ext}"
+            if not storage.exists("uploads", stored_name):
+                temp_path = storage.new_temp_path(ext)
+                shutil.copyfile(src_path, temp_path)
+                storage.store("uploads", stored_name, temp_path)
+            stored_names[img_name] = (stored_name, content_hash)
+        return stored_names[img_name]
 
     # Attach images to each listing - match images to listing's own
     # query for semantic correspondence
     attachments_created = 0
+    new_images = []
     for i, listing in enumerate(demo_listings):
         n_images = random.randint(MIN_IMAGES_PER_LISTING, MAX_IMAGES_PER_LISTING)
         query = listing_keywords[i] if i < len(listing_keywords) else None
@@ -599,33 +614,37 @@ def demo_data(replace, images_only, cache_only):  # noqa: C901
 
         # Ensure selected files exist in uploads (copy on-demand), then attach
         for img_name in selected_filenames:
-            src_path = os.path.join(src_folder, img_name)
-            dest_path = os.path.join(dest_folder, img_name)
-            if os.path.exists(src_path) and not os.path.exists(dest_path):
-                try:
-                    shutil.copyfile(src_path, dest_path)
-                except Exception:
-                    continue
-            db.session.add(ListingImage(listing_id=listing.id, filename=img_name))
+            try:
+                stored_name, content_hash = store_cached_image(img_name)
+            except Exception:
+                continue
+            image = ListingImage(
+                listing_id=listing.id,
+                filename=stored_name,
+                content_hash=content_hash,
+            )
+            db.session.add(image)
+            new_images.append(image)
             attachments_created += 1
 
-    # Commit image associations
+    # Commit image associations, with their thumbnail/derivative jobs
     try:
+        queue_image_jobs(new_images)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
         print(f"ERROR: Failed to attach images to listings: {e}")
         return
 
-    # Run backfill_thumbnails AFTER images are attached
+    # Run the image jobs AFTER images are attached
     if attachments_created:
         try:
-            print("Running thumbnail backfill for new images...")
-            run_backfill_thumbnails()
+            print("Generating thumbnails and responsive sizes for new images...")
+            run_pending_jobs()
         except Exception as e:
-            print(f"Warning: Error running backfill_thumbnails: {e}")
+            print(f"Warning: Error running image jobs: {e}")
     else:
-        print("No images attached; skipping thumbnail backfill.")
+        print("No images attached; skipping thumbnail generation.")
 
     print(
         f"Demo data seeded: categories, listings, images. "
@@ -642,7 +661,7 @@ def demo_data(replace, images_only, cache_only):  # noqa: C901
         f"{MAX_IMAGES_PER_LISTING} images."
     )
 
-    print(f"Thumbnails generated in {thumbnail_dir} using the shared utility.")
+    print(f"Thumbnails generated in '{storage.name}' storage using the shared utility.")
 
     if UNSPLASH_ACCESS_KEY is None:
         print(
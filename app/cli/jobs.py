@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Flask CLI command that runs queued background jobs.
+
+Use it with JOB_MODE=worker (jobs are then never run by web processes), or
+alongside the default thread mode to pick up retries and jobs left behind by
+restarted web workers.
+"""
+
+import time
+from datetime import timedelta
+
+import click
+
+from app.jobs import requeue_stale_jobs, run_pending_jobs
+
+
+@click.command("run-jobs")
+@click.option("--once", is_flag=True, help="Run the runnable jobs, then exit.")
+@click.option(
+    "--poll-interval",
+    default=5.0,
+    show_default=True,
+    help="Seconds to wait when the queue is empty.",
+)
+@click.option(
+    "--stale-after",
+    default=600,
+    show_default=True,
+    help="Seconds after which a running job is assumed abandoned and requeued.",
+)
+def run_jobs_command(once, poll_interval, stale_after):
+    """Process background jobs (thumbnails, ...) from the job table."""
+    requeued = requeue_stale_jobs(timedelta(seconds=stale_after))
+    if requeued:
+        print(f"Requeued {requeued} abandoned jobs.")
+
+    while True:
+        count = run_pending_jobs()
+        if count:
+            print(f"Ran {count} jobs.")
+        if once:
+            break
+        time.sleep(poll_interval)
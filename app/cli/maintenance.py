@@ -10,79 +10,407 @@ at the request of Fernando "ferabreu" Mees Abreu (https://github.com/ferabreu).
 
 Flask CLI commands for database maintenance tasks.
 
-Provides thumbnail backfill command to regenerate missing thumbnails
-for existing listing images.
+Provides a thumbnail backfill command to generate missing (or, with
+--regenerate, all) thumbnails for existing listing images in parallel,
+resumable batches, a reconcile command that repairs the
+denormalized per-category listing counters, a command that rebuilds
+the listing full-text search index, and a command that replays the file
+deletion journal.
 """
 
+import json
 import os
-import uuid
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 import click
 from flask import current_app
-from sqlalchemy import select
+from sqlalchemy import select, update
 
-from app.models import ListingImage, db
+from app.models import ListingImage, db, reconcile_listing_counts
+from app.search import rebuild_search_index
+from app.storage import create_storage, get_storage, storage_settings
 
+# Default checkpoint file (in the instance folder) for resuming the backfill
+BACKFILL_CHECKPOINT = "backfill-thumbnails.checkpoint"
 
-def run_backfill_thumbnails():
-    """Generate thumbnails for existing images that don't have them (callable)."""
+
+# Storage backend of a pool worker process, built from the first task
+_worker_storage = None
+
+
+def _thumbnail_task(task, storage=None):
+    """
+    Process-pool worker: create one thumbnail without touching the database.
+
+    Args:
+        task: (image_id, storage_settings, filename, thumbnail_filename, size)
+        storage: Backend to use; pool workers build their own from the task
+
+    Returns:
+        tuple: (image_id, error) - error is None on success
+    """
+    global _worker_storage
     from app.routes.utils import create_thumbnail
 
-    images_without_thumbnails = (
+    image_id, settings, filename, thumbnail_filename, size = task
+    if storage is None:
+        if _worker_storage is None:
+            _worker_storage = create_storage(settings)
+        storage = _worker_storage
+    try:
+        with storage.local_file("uploads", filename) as original_path:
+            thumbnail_path = storage.new_temp_path(".jpg")
+            if not create_thumbnail(original_path, thumbnail_path, size):
+                os.remove(thumbnail_path)
+                return image_id, "thumbnail could not be created"
+        storage.store("thumbnails", thumbnail_filename, thumbnail_path)
+    except FileNotFoundError:
+        return image_id, "original image not found"
+    except Exception as e:
+        return image_id, f"thumbnail could not be stored: {e}"
+    return image_id, None
+
+
+def _read_checkpoint(path, regenerate):
+    """Return the last image id completed by an interrupted run, or 0."""
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    # A checkpoint from the other mode does not apply to this run
+    if checkpoint.get("regenerate") != regenerate:
+        return 0
+    return int(checkpoint.get("last_id", 0))
+
+
+def _write_checkpoint(path, last_id, regenerate):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"last_id": last_id, "regenerate": regenerate}, f)
+    os.replace(temp_path, path)
+
+
+def _remove_thumbnails(storage, filenames):
+    for filename in filenames:
+        try:
+            storage.delete("thumbnails", filename)
+        except Exception as e:
+            print(f"Warning: could not delete thumbnail {filename}: {e}")
+
+
+def _remove_unreferenced_thumbnails(storage, filenames):
+    """Delete replaced thumbnails that no image uses anymore (shared content)."""
+    if not filenames:
+        return
+    referenced = set(
         db.session.execute(
-            select(ListingImage).filter(ListingImage.thumbnail_filename.is_(None))  # type: ignore
-        )
-        .scalars()
-        .all()
+            select(ListingImage.thumbnail_filename).where(
+                ListingImage.thumbnail_filename.in_(filenames)  # type: ignore
+            )
+        ).scalars()
     )
+    _remove_thumbnails(storage, set(filenames) - referenced)
 
-    if not images_without_thumbnails:
+
+def _build_thumbnail_tasks(rows, storage, settings, size, regenerate):
+    """
+    One task per thumbnail file: images with the same content share a
+    content-addressed thumbnail, reused as is unless regenerating.
+
+    Returns:
+        tuple: (targets, tasks) - image id -> thumbnail filename, and
+        thumbnail filename -> _thumbnail_task argument
+    """
+    from app.routes.utils import thumbnail_filename_for
+
+    targets = {}
+    tasks = {}
+    for row in rows:
+        thumbnail_filename = thumbnail_filename_for(row, size)
+        targets[row.id] = thumbnail_filename
+        if thumbnail_filename in tasks or (
+            row.content_hash
+            and not regenerate
+            and storage.exists("thumbnails", thumbnail_filename)
+        ):
+            continue
+        tasks[thumbnail_filename] = (
+            row.id,
+            settings,
+            row.filename,
+            thumbnail_filename,
+            size,
+        )
+    return targets, tasks
+
+
+def _run_thumbnail_tasks(tasks, storage, executor, workers):
+    """Run the tasks (in the pool, if any). Returns thumbnail filename -> error."""
+    if executor is not None:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        results = list(
+            executor.map(_thumbnail_task, tasks.values(), chunksize=chunksize)
+        )
+    else:
+        results = [_thumbnail_task(task, storage) for task in tasks.values()]
+    return {
+        filename: error for filename, (_, error) in zip(tasks, results) if error
+    }
+
+
+def _update_thumbnail_rows(rows, targets, errors):
+    """
+    Point each image of the batch at its new thumbnail (not committed).
+
+    Only replaces what the batch read: a thumbnail job may have finished (or
+    the image been deleted) in the meantime.
+
+    Returns:
+        tuple: (success_count, error_count, replaced, orphaned) - replaced
+        holds previous thumbnail files (deleted if unreferenced), orphaned
+        the new files of images that changed meanwhile
+    """
+    success_count = error_count = 0
+    replaced = []
+    orphaned = []
+    for row in rows:
+        thumbnail_filename = targets[row.id]
+        error = errors.get(thumbnail_filename)
+        if error:
+            print(f"Error processing {row.filename} (image {row.id}): {error}")
+            error_count += 1
+            continue
+        updated = db.session.execute(
+            update(ListingImage)
+            .where(
+                ListingImage.id == row.id,
+                ListingImage.thumbnail_filename.is_not_distinct_from(
+                    row.thumbnail_filename
+                ),
+            )
+            .values(thumbnail_filename=thumbnail_filename)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated:
+            success_count += 1
+            if row.thumbnail_filename not in (None, thumbnail_filename):
+                replaced.append(row.thumbnail_filename)
+        elif not row.content_hash:
+            orphaned.append(thumbnail_filename)
+    return success_count, error_count, replaced, orphaned
+
+
+def _print_backfill_summary(processed, success_count, error_count, workers, started):
+    if not processed:
         print("No images found that need thumbnail generation.")
         return
+    elapsed = time.monotonic() - started
+    print("\nThumbnail generation completed:")
+    print(f"Successfully processed: {success_count}")
+    print(f"Errors: {error_count}")
+    print(
+        f"Elapsed: {elapsed:.1f}s with {workers} worker(s) "
+        f"({processed / elapsed:.1f} images/s)"
+    )
 
-    print(f"Found {len(images_without_thumbnails)} images without thumbnails.")
 
-    upload_dir = current_app.config["UPLOAD_DIR"]
-    thumbnail_dir = current_app.config["THUMBNAIL_DIR"]
+def run_backfill_thumbnails(
+    workers=None,
+    batch_size=500,
+    regenerate=False,
+    checkpoint_path=None,
+    restart=False,
+):
+    """
+    Generate thumbnails for existing images that don't have them (callable).
 
-    success_count = 0
-    error_count = 0
+    Image ids are read in keyset-ordered batches of `batch_size`; each batch
+    is thumbnailed by a pool of `workers` processes (default: CPU count, 1 =
+    in this process) and committed on its own. The last committed id is
+    saved to a checkpoint file, so an interrupted run resumes where it
+    stopped; the checkpoint is removed once every image has been visited.
 
-    for image in images_without_thumbnails:
-        try:
-            original_path = os.path.join(upload_dir, image.filename)
-            if not os.path.exists(original_path):
-                print(f"Warning: Original image not found: {image.filename}")
-                error_count += 1
-                continue
-
-            thumbnail_filename = f"{uuid.uuid4().hex}.jpg"
-            thumbnail_path = os.path.join(thumbnail_dir, thumbnail_filename)
-
-            if create_thumbnail(original_path, thumbnail_path):
-                image.thumbnail_filename = thumbnail_filename
-                db.session.add(image)
-                success_count += 1
-                print(f"Generated thumbnail for {image.filename}")
-            else:
-                print(f"Failed to generate thumbnail for {image.filename}")
-                error_count += 1
+    Images with the same content share one thumbnail file, created once.
+    With `regenerate`, thumbnails are recreated for every image and replaced
+    files no image refers to anymore are deleted after each batch commits.
+    """
+    storage = get_storage()
+    settings = storage_settings(current_app.config)
+    size = tuple(current_app.config["THUMBNAIL_SIZE"])
+    if checkpoint_path is None:
+        checkpoint_path = os.path.join(current_app.instance_path, BACKFILL_CHECKPOINT)
+    workers = workers or os.cpu_count() or 1
 
-        except Exception as e:
-            print(f"Error processing {image.filename}: {e}")
-            error_count += 1
+    last_id = 0 if restart else _read_checkpoint(checkpoint_path, regenerate)
+    if last_id:
+        print(f"Resuming after image id {last_id} (use --restart to start over).")
 
+    statement = (
+        select(
+            ListingImage.id,
+            ListingImage.filename,
+            ListingImage.content_hash,
+            ListingImage.thumbnail_filename,
+        )
+        .order_by(ListingImage.id)
+        .limit(batch_size)
+    )
+    if not regenerate:
+        statement = statement.where(ListingImage.thumbnail_filename.is_(None))  # type: ignore
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    processed = success_count = error_count = 0
+    started = time.monotonic()
     try:
+        while True:
+            rows = db.session.execute(
+                statement.where(ListingImage.id > last_id)  # type: ignore
+            ).all()
+            if not rows:
+                break
+
+            targets, tasks = _build_thumbnail_tasks(
+                rows, storage, settings, size, regenerate
+            )
+            errors = _run_thumbnail_tasks(tasks, storage, executor, workers)
+            # New unshared (legacy, uuid-named) files of this batch
+            created = [
+                targets[row.id]
+                for row in rows
+                if not row.content_hash
+                and targets[row.id] in tasks
+                and targets[row.id] not in errors
+            ]
+            succeeded, failed, replaced, orphaned = _update_thumbnail_rows(
+                rows, targets, errors
+            )
+            success_count += succeeded
+            error_count += failed
+
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                _remove_thumbnails(storage, created)
+                print(f"Error committing batch after image id {last_id}: {e}")
+                print("Completed batches are saved; run the command again to resume.")
+                return
+
+            _remove_thumbnails(storage, orphaned)
+            _remove_unreferenced_thumbnails(storage, replaced)
+            last_id = rows[-1].id
+            _write_checkpoint(checkpoint_path, last_id, regenerate)
+            processed += len(rows)
+            elapsed = time.monotonic() - started
+            print(
+                f"Processed {processed} images up to id {last_id} "
+                f"({processed / elapsed:.1f} images/s)"
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    _print_backfill_summary(processed, success_count, error_count, workers, started)
+
+
+@click.command("backfill-thumbnails")
+@click.option(
+    "--workers",
+    type=int,
+    default=None,
+    help="Thumbnailing processes (default: number of CPUs; 1 = no pool).",
+)
+@click.option(
+    "--batch-size",
+    default=500,
+    show_default=True,
+    help="Images per batch; each batch is committed and checkpointed.",
+)
+@click.option(
+    "--regenerate",
+    is_flag=True,
+    help="Recreate thumbnails for all images, not only the missing ones.",
+)
+@click.option(
+    "--restart",
+    is_flag=True,
+    help="Ignore the checkpoint of an interrupted run and start over.",
+)
+def backfill_thumbnails(workers, batch_size, regenerate, restart):
+    """CLI wrapper: generate thumbnails for existing images without them."""
+    run_backfill_thumbnails(
+        workers=workers,
+        batch_size=batch_size,
+        regenerate=regenerate,
+        restart=restart,
+    )
+
+
+def run_reconcile_listing_counts():
+    """Recompute category listing counters from the listing table (callable)."""
+    try:
+        corrected = reconcile_listing_counts(db.session.connection())
         db.session.commit()
-        print("\nThumbnail generation completed:")
-        print(f"Successfully processed: {success_count}")
-        print(f"Errors: {error_count}")
     except Exception as e:
         db.session.rollback()
-        print(f"Error committing changes to database: {e}")
+        print(f"Error reconciling listing counts: {e}")
+        return
 
+    if corrected:
+        print(f"Corrected listing counters for {corrected} categories.")
+    else:
+        print("Listing counters are up to date.")
 
-@click.command("backfill-thumbnails")
-def backfill_thumbnails():
-    """CLI wrapper: generate thumbnails for existing images without them."""
-    run_backfill_thumbnails()
+
+@click.command("reconcile-listing-counts")
+def reconcile_listing_counts_command():
+    """CLI wrapper: repair drift in per-category listing counters."""
+    run_reconcile_listing_counts()
+
+
+def run_rebuild_search_index():
+    """Re-index every listing in the full-text search index (callable)."""
+    try:
+        indexed = rebuild_search_index(db.session.connection())
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error rebuilding search index: {e}")
+        return
+
+    if indexed is None:
+        print("Full-text search is not supported on this database.")
+    else:
+        print(f"Indexed {indexed} listings.")
+
+
+@click.command("rebuild-search-index")
+def rebuild_search_index_command():
+    """CLI wrapper: rebuild the listing full-text search index."""
+    run_rebuild_search_index()
+
+
+def run_reap_files():
+    """Delete the files left in the deletion journal (callable)."""
+    from app.routes.utils import reap_deleted_files
+
+    try:
+        processed = reap_deleted_files()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error deleting journaled files: {e}")
+        print("Completed batches are saved; run the command again to resume.")
+        return
+
+    print(f"Processed {processed} journaled file deletions.")
+
+
+@click.command("reap-files")
+def reap_files_command():
+    """CLI wrapper: replay the file deletion journal (e.g. after a crash)."""
+    run_reap_files()
@@ -55,6 +55,44 @@ class Config:
     TEMP_DIR = os.path.join("static", "temp")
     THUMBNAIL_DIR = os.path.join("static", "uploads", "thumbnails")
     THUMBNAIL_SIZE = (224, 224)
+    # Upload limits: the whole request (Flask answers 413 beyond it), each
+    # image file, and each image's pixel count (checked from the header,
+    # before anything is decoded)
+    MAX_CONTENT_LENGTH = int(os.environ.get("MAX_CONTENT_LENGTH", 64 * 1024 * 1024))
+    UPLOAD_MAX_FILE_SIZE = int(os.environ.get("UPLOAD_MAX_FILE_SIZE", 12 * 1024 * 1024))
+    IMAGE_MAX_PIXELS = int(os.environ.get("IMAGE_MAX_PIXELS", 50_000_000))
+    # Responsive copies of each upload, listed in srcset: widths in pixels
+    # (never upscaled) and formats in order of preference; formats this
+    # Pillow build cannot write (e.g. "avif") are skipped. "jpeg" is the
+    # fallback for browsers without WebP/AVIF support.
+    DERIVATIVE_DIR = os.path.join("static", "uploads", "derivatives")
+    IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1024, 1600)
+    IMAGE_DERIVATIVE_FORMATS = ("webp", "jpeg")
+    IMAGE_DERIVATIVE_QUALITY = 80
+    # Where originals, thumbnails and derivatives are kept: "local" (the
+    # directories above, served as static files) or "s3" (an S3-compatible
+    # bucket shared by all app nodes; needs boto3). S3_PUBLIC_URL is the base
+    # URL media is served from (e.g. a CDN in front of the bucket); without
+    # it, URLs point at the bucket endpoint. Credentials use boto3's usual
+    # chain (AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY, instance roles, ...).
+    STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "local")
+    S3_BUCKET = os.environ.get("S3_BUCKET") or None
+    S3_PREFIX = os.environ.get("S3_PREFIX", "")
+    S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL") or None
+    S3_REGION = os.environ.get("S3_REGION") or None
+    S3_PUBLIC_URL = os.environ.get("S3_PUBLIC_URL") or None
+    # How /media/<area>/<name> sends local files: "flask" streams them from
+    # the worker; "x-accel-redirect" (nginx) and "x-sendfile" (Apache
+    # mod_xsendfile, lighttpd) only answer with a header and let the fronting
+    # server send the bytes. MEDIA_ACCEL_REDIRECT_PREFIX is the nginx
+    # `internal` location with one alias per area (uploads, thumbnails,
+    # derivatives). Content-named files are cached as immutable for a year;
+    # MEDIA_CACHE_MAX_AGE (seconds) applies to legacy, uuid-named ones.
+    MEDIA_SEND_MODE = os.environ.get("MEDIA_SEND_MODE", "flask")
+    MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get(
+        "MEDIA_ACCEL_REDIRECT_PREFIX", "/_media/"
+    )
+    MEDIA_CACHE_MAX_AGE = 24 * 60 * 60
 
     # Index page showcase configuration
     # Number of showcase listings on index page (4-12 recommended, 20 max)
@@ -68,6 +106,60 @@ class Config:
     # None to auto-select from top 2N
     INDEX_SHOWCASE_CATEGORIES = None
 
+    # Seconds the precomputed showcase pools are reused (they are also rebuilt
+    # whenever listings or categories change); 0 = rebuild only on changes
+    INDEX_SHOWCASE_CACHE_TTL = 300
+
+    # Rendered sidebar category trees kept per worker, one per active category
+    # (all are dropped when categories change)
+    SIDEBAR_CACHE_SIZE = 64
+
+    # Full-page cache of public pages for anonymous users (see app/page_cache.py).
+    # Pages are rendered again after any listing or category write, or after
+    # PAGE_CACHE_TTL seconds (home page showcases are picked at random).
+    PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "false").lower() in [
+        "1",
+        "true",
+        "yes",
+    ]
+    # "memory" (per-worker LRU of PAGE_CACHE_SIZE pages) or "redis" (shared;
+    # requires classifieds[redis])
+    PAGE_CACHE_BACKEND = os.environ.get("PAGE_CACHE_BACKEND", "memory")
+    PAGE_CACHE_REDIS_URL = os.environ.get(
+        "PAGE_CACHE_REDIS_URL", "redis://localhost:6379/0"
+    )
+    PAGE_CACHE_SIZE = 1024
+    PAGE_CACHE_TTL = 300
+    PAGE_CACHE_ENDPOINTS = (
+        "listings.index",
+        "listings.category_listings",
+        "listings.category_filtered_listings",
+        "listings.listing_detail",
+    )
+
+    # JSON API (/api/listings): default and maximum page size, and the
+    # smallest response body worth compressing (gzip, or brotli if installed)
+    API_PAGE_SIZE = 20
+    API_MAX_PAGE_SIZE = 100
+    API_COMPRESS_MIN_SIZE = 512
+
+    # Listing grid / admin table pagination: "offset" (page numbers) or
+    # "keyset" (Prev/Next cursors on created_at, constant cost on deep pages)
+    LISTING_PAGINATION_MODE = os.environ.get("LISTING_PAGINATION_MODE", "offset")
+
+    # Background jobs (thumbnails): "thread" runs them in a per-process thread
+    # pool right after the request, "worker" leaves them to `flask run-jobs`,
+    # "inline" runs them synchronously (tests)
+    JOB_MODE = os.environ.get("JOB_MODE", "thread")
+    JOB_THREAD_WORKERS = 2
+    # Failed jobs are retried after JOB_RETRY_DELAY * 2^(attempt - 1) seconds.
+    # In thread mode a timer re-dispatches the queue then; retries pending
+    # across a restart wait for the next dispatch or `flask run-jobs`
+    JOB_MAX_ATTEMPTS = 3
+    JOB_RETRY_DELAY = 30
+    # Listings deleted (and committed) per step when deleting a user
+    USER_DELETE_CHUNK_SIZE = 500
+
     # Logging
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
     LOG_TO_STDOUT = os.environ.get("LOG_TO_STDOUT", "true").lower() in [
@@ -91,6 +183,8 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URL", "sqlite:///:memory:")
     WTF_CSRF_ENABLED = False  # Usually disabled for tests
+    JOB_MODE = "inline"
+    PAGE_CACHE_ENABLED = False
 
 
 class ProductionConfig(Config):
@@ -0,0 +1,249 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Database-backed background job queue.
+
+Slow work (e.g. thumbnail generation) is queued as Job rows in the same
+transaction as the data it belongs to, and run outside the request:
+- JOB_MODE = "thread": a small per-process thread pool picks up jobs right
+  after the request that queued them, and again when a failed job's backoff
+  has passed (default)
+- JOB_MODE = "worker": only `flask run-jobs` processes run jobs
+- JOB_MODE = "inline": jobs run synchronously when dispatched (tests)
+
+Jobs are claimed with a conditional UPDATE, so several threads or worker
+processes can poll the same table. A failing job is retried with exponential
+backoff until max_attempts, then marked failed with its last error kept.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from .models import Job, db
+
+# kind -> handler(payload); handlers run inside an app context
+JOB_HANDLERS: dict[str, Callable[[dict], None]] = {}
+
+_executor_lock = threading.Lock()
+# Id of the job the current thread is running (see report_progress)
+_running = threading.local()
+
+
+def job_handler(kind: str):
+    """Register a function as the handler for jobs of the given kind."""
+
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+
+    return decorator
+
+
+def enqueue_job(
+    kind: str,
+    payload: dict,
+    max_attempts: Optional[int] = None,
+    subject_id: Optional[int] = None,
+) -> Job:
+    """
+    Add a job to the current session. It is queued when the caller commits;
+    call dispatch_jobs() after the commit to start processing it.
+
+    subject_id records the row the job acts on, for looking its jobs up.
+    """
+    if max_attempts is None:
+        max_attempts = current_app.config.get("JOB_MAX_ATTEMPTS", 3)
+    job = Job(
+        kind=kind, payload=payload, max_attempts=max_attempts, subject_id=subject_id
+    )
+    db.session.add(job)
+    return job
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def claim_next_job() -> Optional[Job]:
+    """
+    Claim the oldest runnable pending job, or return None if there is none.
+
+    The status check in the UPDATE makes the claim atomic: if another worker
+    claimed the same job first, this one moves on to the next candidate.
+    """
+    while True:
+        job_id = db.session.execute(
+            select(Job.id)
+            .where(Job.status == Job.STATUS_PENDING, Job.run_after <= _now())
+            .order_by(Job.run_after, Job.id)
+            .limit(1)
+        ).scalar()
+        if job_id is None:
+            db.session.commit()
+            return None
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == Job.STATUS_PENDING)
+            .values(
+                status=Job.STATUS_RUNNING,
+                attempts=Job.attempts + 1,
+                started_at=_now(),
+            )
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id, populate_existing=True)
+
+
+def report_progress(done: int, total: Optional[int] = None) -> None:
+    """
+    Record how far the running job got (e.g. 1500 of 4000 listings deleted).
+    The update is part of the handler's transaction: it becomes visible with
+    the handler's next commit. Does nothing outside a job.
+    """
+    job_id = getattr(_running, "job_id", None)
+    if job_id is None:
+        return
+    db.session.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(progress=done, progress_total=total)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def run_job(job: Job) -> bool:
+    """Run one claimed job and record the outcome. Returns True on success."""
+    handler = JOB_HANDLERS.get(job.kind)
+    _running.job_id = job.id
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        handler(job.payload)
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(Job, job.id, populate_existing=True)
+        job.last_error = f"{type(e).__name__}: {e}"
+        if job.attempts >= job.max_attempts:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = _now()
+            current_app.logger.error(
+                "Job %s (%s) failed after %s attempts: %s",
+                job.id, job.kind, job.attempts, job.last_error,
+            )
+        else:
+            delay = current_app.config.get("JOB_RETRY_DELAY", 30)
+            backoff = delay * 2 ** (job.attempts - 1)
+            job.status = Job.STATUS_PENDING
+            job.run_after = _now() + timedelta(seconds=backoff)
+            current_app.logger.warning(
+                "Job %s (%s) attempt %s failed, will retry: %s",
+                job.id, job.kind, job.attempts, job.last_error,
+            )
+            db.session.commit()
+            _schedule_retry(backoff)
+            return False
+        db.session.commit()
+        return False
+    finally:
+        _running.job_id = None
+
+    job.status = Job.STATUS_DONE
+    job.last_error = None
+    job.finished_at = _now()
+    db.session.commit()
+    return True
+
+
+def run_pending_jobs(limit: Optional[int] = None) -> int:
+    """Run runnable jobs until none are left (or `limit` ran). Returns the count."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def requeue_stale_jobs(older_than: timedelta) -> int:
+    """
+    Return jobs stuck in "running" (e.g. their worker crashed) to the queue.
+    The interrupted attempt still counts towards max_attempts.
+    """
+    requeued = db.session.execute(
+        update(Job)
+        .where(Job.status == Job.STATUS_RUNNING, Job.started_at < _now() - older_than)
+        .values(status=Job.STATUS_PENDING, run_after=_now())
+    ).rowcount
+    db.session.commit()
+    return requeued
+
+
+def _get_executor(app) -> ThreadPoolExecutor:
+    executor = app.extensions.get("job_executor")
+    if executor is None:
+        with _executor_lock:
+            executor = app.extensions.get("job_executor")
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=app.config.get("JOB_THREAD_WORKERS", 2),
+                    thread_name_prefix="jobs",
+                )
+                app.extensions["job_executor"] = executor
+    return executor
+
+
+def _run_in_thread(app) -> None:
+    with app.app_context():
+        try:
+            run_pending_jobs()
+        except Exception:
+            app.logger.exception("Background job runner crashed")
+        finally:
+            db.session.remove()
+
+
+def _submit_to_executor(app) -> None:
+    try:
+        _get_executor(app).submit(_run_in_thread, app)
+    except RuntimeError:
+        # The executor was shut down (interpreter exit)
+        pass
+
+
+def _schedule_retry(delay: float) -> None:
+    """
+    Thread mode: run the queue again once a failed job's backoff has passed,
+    so the retry does not wait for another request to dispatch jobs. Worker
+    mode retries on the next `flask run-jobs` poll.
+    """
+    if current_app.config.get("JOB_MODE", "thread") != "thread":
+        return
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    timer = threading.Timer(delay, _submit_to_executor, (app,))
+    timer.daemon = True
+    timer.start()
+
+
+def dispatch_jobs() -> None:
+    """
+    Start processing committed jobs according to JOB_MODE.
+    Call after the transaction that queued them has been committed.
+    """
+    mode = current_app.config.get("JOB_MODE", "thread")
+    if mode == "inline":
+        run_pending_jobs()
+    elif mode == "thread":
+        _submit_to_executor(current_app._get_current_object())  # type: ignore[attr-defined]
+    # "worker": picked up by `flask run-jobs`
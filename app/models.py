@@ -10,7 +10,8 @@ at the request of Fernando "ferabreu" Mees Abreu (https://github.com/ferabreu).
 
 SQLAlchemy models for the classifieds Flask app.
 
-Defines User, Category, Listing, and ListingImage entities.
+Defines User, Category, Listing, ListingImage, ListingImageDerivative,
+CacheGeneration, and Job entities.
 Handles hierarchical categories, user accounts, and listing image management.
 
 Uses SQLAlchemy 2.0+ patterns with Mapped[] type hints and relationship() with back_populates.
@@ -23,8 +24,29 @@ from typing import Optional, Union
 from flask_login import UserMixin
 from flask_sqlalchemy import SQLAlchemy
 from slugify import slugify
-from sqlalchemy import ForeignKey, String, Text, event, select
-from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, scoped_session
+from sqlalchemy import (
+    JSON,
+    ForeignKey,
+    String,
+    Text,
+    and_,
+    case,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.orm import (
+    Mapped,
+    Session,
+    mapped_column,
+    relationship,
+    scoped_session,
+)
+from sqlalchemy.orm.attributes import set_committed_value
 from werkzeug.security import check_password_hash, generate_password_hash
 
 db = SQLAlchemy()
@@ -36,6 +58,17 @@ class Category(db.Model):
 
     Supports parent-child relationships for multi-level categories.
     The url_name field stores URL-safe category names for clean hierarchical paths.
+
+    The path field is a materialized path of ancestor IDs ending with the
+    category's own ID (e.g. "/1/5/9/"). It is maintained by mapper events below
+    and lets subtree lookups and cycle checks run as single indexed queries.
+
+    direct_listing_count and subtree_listing_count are denormalized counters
+    kept up to date by Listing events; `flask reconcile-listing-counts` repairs
+    drift caused by writes that bypass the ORM.
+
+    updated_at changes with the category's own columns and its path (a move of
+    an ancestor), not with its listing counters (see _touch_updated_at).
     """
 
     __tablename__ = "category"
@@ -44,6 +77,21 @@ class Category(db.Model):
     name: Mapped[str] = mapped_column(String(64))
     url_name: Mapped[str] = mapped_column(String(128), index=True)
     sort_order: Mapped[int] = mapped_column(default=0)
+    # Materialized path, assigned after insert (needs the generated id).
+    # Byte-order collation on PostgreSQL: subtree_clause relies on "/" sorting
+    # right below the digits, which locale collations do not guarantee.
+    # SQLite compares text bytewise already.
+    path: Mapped[Optional[str]] = mapped_column(
+        String(1024).with_variant(String(1024, collation="C"), "postgresql"),
+        index=True,
+        nullable=True,
+    )
+    # Denormalized listing counters (listings in this category / in its subtree)
+    direct_listing_count: Mapped[int] = mapped_column(default=0, index=True)
+    subtree_listing_count: Mapped[int] = mapped_column(default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
 
     # Recursive fields for multi-level categories
     parent_id: Mapped[Optional[int]] = mapped_column(
@@ -130,42 +178,55 @@ class Category(db.Model):
         """
         return {"id": self.id, "name": self.name}
 
+    @classmethod
+    def subtree_clause(cls, path: str):
+        """
+        SQL condition matching the category with this materialized path and all
+        its descendants.
+
+        Written as a half-open range instead of LIKE so SQLite can use the
+        path index: every descendant path starts with `path`, and "0" is the
+        character right after "/" in byte order (the column's collation).
+        """
+        return and_(cls.path >= path, cls.path < path[:-1] + "0")
+
+    def subtree_ids_select(self):
+        """
+        Return a SELECT of this category's ID and all descendant IDs, for use
+        in filters like Listing.category_id.in_(category.subtree_ids_select()).
+        """
+        return select(Category.id).where(Category.subtree_clause(self.path))
+
     def get_descendant_ids(self):
         """
         Return a list of IDs for this category and all its descendants.
 
-        Protect against cycles using a visited set.
+        Uses the materialized path (one indexed query). Categories that have
+        not been flushed yet have no descendants.
         """
+        if not self.path:
+            return [self.id]
 
-        def _collect(node, visited):
-            if node.id in visited:
-                return []
-            visited.add(node.id)
-            ids = [node.id]
-            for child in node.children:  # type: ignore
-                ids.extend(_collect(child, visited))
-            return ids
+        from . import db
 
-        return _collect(self, set())
+        return list(
+            db.session.execute(
+                self.subtree_ids_select().order_by(Category.path)
+            ).scalars()
+        )
 
     def is_ancestor_of(self, other: "Category") -> bool:
         """
-        Return True if this category is an ancestor of `other`.
-        Safe against cycles.
+        Return True if this category is an ancestor of `other`
+        (a category counts as its own ancestor, as before).
         """
         if other is None:
             return False
-        # walk up from other checking if we hit self (use visited set to avoid loops)
-        node = other
-        visited = set()
-        while node:
-            if node.id in visited:
-                break
-            if node.id == self.id:
-                return True
-            visited.add(node.id)
-            node = node.parent
-        return False
+        if self.id is not None and other.id == self.id:
+            return True
+        if self.id is None or not other.path:
+            return False
+        return f"/{self.id}/" in other.path
 
     def is_url_name_reserved(self) -> bool:
         """
@@ -210,7 +271,8 @@ class Category(db.Model):
         """
         Return True if setting parent_id=new_parent_id would create a cycle.
 
-        Uses the given SQLAlchemy session to traverse parent links safely.
+        Reads the new parent's materialized path in one query: the move is a
+        cycle when this category's ID appears among the parent's ancestors.
         Works for both persisted and new Category instances (self.id may be None).
         """
         if not new_parent_id:
@@ -218,7 +280,26 @@ class Category(db.Model):
         # Quick self-check (handles persisted objects)
         if self.id is not None and new_parent_id == self.id:
             return True
+        if self.id is None:
+            # A category without an id cannot be anyone's ancestor yet
+            return False
+
+        parent_path = session.execute(
+            select(Category.path).where(Category.id == new_parent_id)
+        ).scalar_one_or_none()
+        if not parent_path:
+            return False
+        return f"/{self.id}/" in parent_path
+
+    def _would_create_cycle_in_session(
+        self, new_parent_id: Optional[int], session: Session
+    ) -> bool:
+        """
+        Walk parent links through the session's identity map.
 
+        Slower than would_create_cycle() but sees unflushed parent changes;
+        used when several categories are re-parented in the same flush.
+        """
         visited = set()
         current_parent_id = new_parent_id
         depth = 0
@@ -271,29 +352,14 @@ class Category(db.Model):
 
             session = db.session  # type: ignore
 
-        # Parse the path into segments
-        segments = [segment for segment in path_string.split("/") if segment]
-        if not segments:
-            return None
-
-        # Load all categories once and build an in-memory lookup
-        # keyed by (parent_id, url_name)
-        all_categories = session.execute(select(cls)).scalars().all()  # type: ignore
-        lookup: dict[tuple[Optional[int], str], "Category"] = {
-            (category.parent_id, category.url_name): category
-            for category in all_categories
-        }
+        # Resolve the path against the in-process category tree snapshot
+        # (no category table scan), then load only the matching row.
+        from .category_tree import get_category_tree
 
-        current_category: Optional["Category"] = None
-        parent_id: Optional[int] = None
-
-        for segment in segments:
-            current_category = lookup.get((parent_id, segment))
-            if current_category is None:
-                # Path segment not found
-                return None
-            parent_id = current_category.id
-        return current_category
+        node = get_category_tree(session).resolve_path(path_string)
+        if node is None:
+            return None
+        return session.get(cls, node.id)  # type: ignore
 
 
 @dataclass
@@ -385,6 +451,8 @@ class Listing(db.Model):
     Listing model for classifieds postings.
 
     Includes metadata, relationship to user, category, and associated images.
+    updated_at changes with any column of the listing and with its images and
+    their derivatives (see _touch_updated_at and _touch_updated_listings).
     """
 
     __tablename__ = "listing"
@@ -398,6 +466,9 @@ class Listing(db.Model):
     created_at: Mapped[datetime] = mapped_column(
         default=lambda: datetime.now(timezone.utc)
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
 
     # Relationships
     owner: Mapped["User"] = relationship("User", back_populates="listings")
@@ -406,6 +477,13 @@ class Listing(db.Model):
         "ListingImage", back_populates="listing", cascade="all, delete-orphan"
     )
 
+    # Browse pages filter by category and admin/user pages by owner,
+    # both ordered by newest first
+    __table_args__ = (
+        db.Index("ix_listing_category_id_created_at", "category_id", "created_at"),
+        db.Index("ix_listing_user_id_created_at", "user_id", "created_at"),
+    )
+
     def __init__(
         self,
         title: str,
@@ -425,52 +503,661 @@ class ListingImage(db.Model):
     """
     ListingImage model for storing image filenames and thumbnails for listings.
 
-    Supports cascade deletion alongside listings.
+    Supports cascade deletion alongside listings. Files are content-addressed
+    and reference counted (see content_hash): deleting an image only removes
+    its files once no other image has the same content.
     """
 
     __tablename__ = "listing_image"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     filename: Mapped[str] = mapped_column(String(256))
+    # BLAKE2b digest of the original's bytes; files are named after it, so
+    # identical uploads share one original, thumbnail and set of derivatives.
+    # The rows sharing a hash are its references (NULL: legacy, unshared file)
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True, index=True
+    )
     thumbnail_filename: Mapped[Optional[str]] = mapped_column(
         String(256), nullable=True
     )
     listing_id: Mapped[int] = mapped_column(
-        ForeignKey("listing.id", name="fk_listingimage_listing_id", ondelete="CASCADE")
+        ForeignKey("listing.id", name="fk_listingimage_listing_id", ondelete="CASCADE"),
+        index=True,
     )
 
     # Relationship
     listing: Mapped["Listing"] = relationship("Listing", back_populates="images")
+    derivatives: Mapped[list["ListingImageDerivative"]] = relationship(
+        "ListingImageDerivative", back_populates="image", cascade="all, delete-orphan"
+    )
 
     def __init__(
         self,
         filename: str,
         listing_id: int,
         thumbnail_filename: Optional[str] = None,
+        content_hash: Optional[str] = None,
     ):
         self.filename = filename
         self.listing_id = listing_id
         self.thumbnail_filename = thumbnail_filename
+        self.content_hash = content_hash
+
+    def derivatives_for(self, format: str) -> list["ListingImageDerivative"]:
+        """Return this image's derivatives in the given format, narrowest first."""
+        return sorted(
+            (d for d in self.derivatives if d.format == format),
+            key=lambda d: d.width,
+        )
+
+
+class ListingImageDerivative(db.Model):
+    """
+    A resized copy of a ListingImage in one width and format (e.g. 640px WebP).
+
+    Generated in the background after upload; templates list them in srcset
+    so browsers download the smallest file that fits the layout.
+    """
+
+    __tablename__ = "listing_image_derivative"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    image_id: Mapped[int] = mapped_column(
+        ForeignKey(
+            "listing_image.id",
+            name="fk_listingimagederivative_image_id",
+            ondelete="CASCADE",
+        ),
+        index=True,
+    )
+    width: Mapped[int] = mapped_column()
+    height: Mapped[int] = mapped_column()
+    format: Mapped[str] = mapped_column(String(8))
+    filename: Mapped[str] = mapped_column(String(256))
+
+    # Relationship
+    image: Mapped["ListingImage"] = relationship(
+        "ListingImage", back_populates="derivatives"
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "image_id", "width", "format", name="uq_listingimagederivative_variant"
+        ),
+    )
+
+    def __init__(self, image_id: int, width: int, height: int, format: str, filename: str):
+        self.image_id = image_id
+        self.width = width
+        self.height = height
+        self.format = format
+        self.filename = filename
+
+
+class FileDeletion(db.Model):
+    """
+    Journal of stored image files waiting to be deleted.
+
+    Bulk listing deletes insert one row per file in the same transaction that
+    deletes the image rows, so a committed delete always leaves a record of
+    its files. The reaper job (see reap_deleted_files) removes the files in
+    batches and then their rows; after a crash the remaining rows are simply
+    processed again. area is a storage area: uploads, thumbnails, derivatives.
+    """
+
+    __tablename__ = "file_deletion"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    area: Mapped[str] = mapped_column(String(16))
+    name: Mapped[str] = mapped_column(String(256))
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __init__(self, area: str, name: str):
+        self.area = area
+        self.name = name
+
+
+class CacheGeneration(db.Model):
+    """
+    Named, monotonically increasing counters used to invalidate in-process caches.
+
+    Each worker process keeps its own caches (e.g. the category tree snapshot)
+    and compares the generation it was built from against the value stored here.
+    Writes bump the counter in the same transaction as the data they change,
+    so every worker notices the change on its next request. updated_at is the
+    time of the last bump: the "content" generation gives caches a global
+    (version, last modified) pair in one primary-key read.
+    """
+
+    __tablename__ = "cache_generation"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __init__(self, name: str, value: int = 0):
+        self.name = name
+        self.value = value
+
+
+class Job(db.Model):
+    """
+    Background job queued in the database (see app/jobs.py).
+
+    status moves pending -> running -> done, or back to pending with a later
+    run_after when an attempt fails, until max_attempts is reached and the job
+    is marked failed. last_error keeps the most recent failure message.
+    Long-running handlers report progress (done out of total) through
+    jobs.report_progress(). subject_id is the id of the row a job acts on
+    (e.g. the user being deleted), so its jobs can be looked up by index.
+    """
+
+    __tablename__ = "job"
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64))
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)
+    status: Mapped[str] = mapped_column(String(16), default=STATUS_PENDING)
+    attempts: Mapped[int] = mapped_column(default=0)
+    max_attempts: Mapped[int] = mapped_column(default=3)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
+    run_after: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    progress: Mapped[Optional[int]] = mapped_column(nullable=True)
+    progress_total: Mapped[Optional[int]] = mapped_column(nullable=True)
+    subject_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        # Workers poll for the oldest runnable pending job
+        db.Index("ix_job_status_run_after", "status", "run_after"),
+        # Jobs of a kind acting on given rows (admin pages)
+        db.Index("ix_job_kind_subject_id", "kind", "subject_id"),
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        payload: Optional[dict] = None,
+        max_attempts: int = 3,
+        subject_id: Optional[int] = None,
+    ):
+        self.kind = kind
+        self.payload = payload or {}
+        self.max_attempts = max_attempts
+        self.subject_id = subject_id
+        self.status = self.STATUS_PENDING
+        self.attempts = 0
+
+
+# Generation names (rows in cache_generation)
+CATEGORY_TREE_GENERATION = "category_tree"
+LISTINGS_GENERATION = "listings"
+# Any change to what public pages show (listings, their images, categories)
+CONTENT_GENERATION = "content"
+# Stored image files: bumped by uploads and by the file reaper; its row lock
+# serializes the two (see routes.utils.lock_media_files)
+MEDIA_GENERATION = "media"
+
+
+def get_cache_generation(session, name: str) -> int:
+    """
+    Return the current value of a named cache generation (0 if never bumped).
+    """
+    value = session.execute(
+        select(CacheGeneration.value).where(CacheGeneration.name == name)
+    ).scalar_one_or_none()
+    return value or 0
+
+
+def bump_cache_generation(connection, name: str) -> None:
+    """
+    Increment a named cache generation using the given connection.
+
+    Meant to be called from flush events so the bump commits (or rolls back)
+    together with the data change that caused it.
+    """
+    table = CacheGeneration.__table__
+    now = datetime.now(timezone.utc)
+    result = connection.execute(
+        update(table)
+        .where(table.c.name == name)
+        .values(value=table.c.value + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(name=name, value=1, updated_at=now))
+
+
+def get_cache_generation_state(session, name: str) -> tuple[int, Optional[datetime]]:
+    """
+    Return (value, time of the last bump) of a named cache generation;
+    (0, None) if it was never bumped. Times are UTC.
+    """
+    row = session.execute(
+        select(CacheGeneration.value, CacheGeneration.updated_at).where(
+            CacheGeneration.name == name
+        )
+    ).one_or_none()
+    if row is None:
+        return 0, None
+    return row.value, as_utc(row.updated_at)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Attach UTC to naive datetimes read back from the database."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
 
 
 @event.listens_for(Session, "before_flush")
 def _prevent_category_cycle(session, flush_context, instances):
     """
     Abort flush if a Category's parent would create a cycle.
-    Uses Category.would_create_cycle(session=...) for a DB-backed check.
-    """
-    for obj in list(session.new) + list(session.dirty):
-        if isinstance(obj, Category):
-            # Use the effective parent_id value intended to be persisted.
-            # For new/dirty objects SQLAlchemy will have obj.parent_id
-            # set appropriately.
-            parent_id = getattr(obj, "parent_id", None)
-            if not parent_id:
-                continue
-            # Use helper that walks the chain via this session
-            # (avoids multiple queries outside session)
-            if obj.would_create_cycle(parent_id, session):
-                raise ValueError("Cannot set parent: would create a category cycle.")
+
+    Uses the path-based Category.would_create_cycle() check. When more than one
+    category is re-parented in the same flush, the persisted paths may not
+    reflect the other pending moves, so the identity-map walk is used instead.
+    """
+    reparented = [
+        obj
+        for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Category)
+        and inspect(obj).attrs.parent_id.history.has_changes()
+    ]
+    for obj in reparented:
+        if not obj.parent_id:
+            continue
+        if len(reparented) > 1:
+            cycle = obj._would_create_cycle_in_session(obj.parent_id, session)
+        else:
+            cycle = obj.would_create_cycle(obj.parent_id, session)
+        if cycle:
+            raise ValueError("Cannot set parent: would create a category cycle.")
+
+
+def _fetch_category_path(connection, category_id: Optional[int]) -> str:
+    """Return the stored path of a category, or "/" for the root level."""
+    if category_id is None:
+        return "/"
+    table = Category.__table__
+    parent_path = connection.execute(
+        select(table.c.path).where(table.c.id == category_id)
+    ).scalar_one_or_none()
+    return parent_path or "/"
+
+
+@event.listens_for(Category, "after_insert")
+def _assign_category_path(mapper, connection, target):
+    """Store the materialized path once the new row has an id."""
+    path = f"{_fetch_category_path(connection, target.parent_id)}{target.id}/"
+    table = Category.__table__
+    connection.execute(update(table).where(table.c.id == target.id).values(path=path))
+    set_committed_value(target, "path", path)
+
+
+def _rewrite_subtree_paths(connection, old_path: str, new_path: str) -> None:
+    """Swap the old path prefix for the new one across a whole subtree."""
+    table = Category.__table__
+    connection.execute(
+        update(table)
+        .where(Category.subtree_clause(old_path))
+        .values(
+            path=literal(new_path) + func.substr(table.c.path, len(old_path) + 1),
+            updated_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+def _rebuild_category_paths(connection) -> dict[int, str]:
+    """
+    Recompute every category path from parent_id links and store the ones
+    that changed. Returns the full id -> path mapping.
+    """
+    table = Category.__table__
+    rows = connection.execute(
+        select(table.c.id, table.c.parent_id, table.c.path)
+    ).all()
+    parent_of = {row.id: row.parent_id for row in rows}
+    paths = {}
+    for row in rows:
+        chain = [row.id]
+        visited = {row.id}
+        parent_id = row.parent_id
+        while parent_id is not None and parent_id in parent_of:
+            if parent_id in visited:
+                break
+            visited.add(parent_id)
+            chain.insert(0, parent_id)
+            parent_id = parent_of[parent_id]
+        paths[row.id] = "/" + "/".join(str(cid) for cid in chain) + "/"
+        if paths[row.id] != row.path:
+            connection.execute(
+                update(table)
+                .where(table.c.id == row.id)
+                .values(path=paths[row.id], updated_at=datetime.now(timezone.utc))
+            )
+    return paths
+
+
+@event.listens_for(Session, "after_flush")
+def _move_category_subtrees(session, flush_context):
+    """
+    Rewrite materialized paths for re-parented categories and their subtrees.
+
+    A single move costs one UPDATE for the whole subtree, whatever its size.
+    Several moves in one flush can depend on each other (e.g. swapping a parent
+    and child), so those fall back to recomputing all paths.
+    """
+    moved = [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, Category)
+        and obj.path
+        and inspect(obj).attrs.parent_id.history.has_changes()
+    ]
+    if not moved:
+        return
+
+    connection = session.connection()
+    if len(moved) == 1:
+        target = moved[0]
+        old_path = target.path
+        new_path = f"{_fetch_category_path(connection, target.parent_id)}{target.id}/"
+        if old_path == new_path:
+            return
+        _rewrite_subtree_paths(connection, old_path, new_path)
+        # The subtree's listings now count towards different ancestors
+        table = Category.__table__
+        moved_count = connection.execute(
+            select(table.c.subtree_listing_count).where(table.c.id == target.id)
+        ).scalar_one()
+        if moved_count:
+            _add_subtree_listing_count(
+                connection, _path_ids(old_path)[:-1], -moved_count
+            )
+            _add_subtree_listing_count(
+                connection, _path_ids(new_path)[:-1], moved_count
+            )
+        new_paths = None
+    else:
+        new_paths = _rebuild_category_paths(connection)
+        reconcile_listing_counts(connection)
+
+    # Keep already-loaded categories consistent with the database
+    for obj in list(session.identity_map.values()):
+        if not isinstance(obj, Category) or not obj.path:
+            continue
+        if new_paths is not None:
+            if obj.id in new_paths:
+                set_committed_value(obj, "path", new_paths[obj.id])
+        elif obj.path.startswith(old_path):
+            set_committed_value(obj, "path", new_path + obj.path[len(old_path):])
+
+
+def _path_ids(path: Optional[str]) -> list[int]:
+    """Return the category IDs in a materialized path, root first."""
+    return [int(part) for part in (path or "").split("/") if part]
+
+
+def _add_subtree_listing_count(connection, category_ids, delta: int) -> None:
+    """Add delta to subtree_listing_count of the given categories."""
+    if not category_ids or not delta:
+        return
+    table = Category.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id.in_(category_ids))
+        .values(subtree_listing_count=table.c.subtree_listing_count + delta)
+    )
+
+
+def _adjust_listing_counts(connection, category_id: Optional[int], delta: int) -> None:
+    """
+    Add delta to a category's direct count and to the subtree count of the
+    category and every ancestor (one path read plus one UPDATE).
+    """
+    if category_id is None:
+        return
+    table = Category.__table__
+    path = connection.execute(
+        select(table.c.path).where(table.c.id == category_id)
+    ).scalar_one_or_none()
+    chain_ids = _path_ids(path) or [category_id]
+    connection.execute(
+        update(table)
+        .where(table.c.id.in_(chain_ids))
+        .values(
+            subtree_listing_count=table.c.subtree_listing_count + delta,
+            direct_listing_count=table.c.direct_listing_count
+            + case((table.c.id == category_id, delta), else_=0),
+        )
+    )
+
+
+def count_deleted_listings(connection, listing_ids) -> int:
+    """
+    Update the category counters and the listings generation for listings
+    about to be removed by a set-based DELETE, which bypasses the ORM events.
+
+    Args:
+        listing_ids: A SELECT of the listing ids (or a list of ids)
+
+    Returns:
+        Number of listings counted.
+    """
+    listing_table = Listing.__table__
+    counts = connection.execute(
+        select(listing_table.c.category_id, func.count())
+        .where(listing_table.c.id.in_(listing_ids))
+        .group_by(listing_table.c.category_id)
+    ).all()
+    for category_id, count in counts:
+        _adjust_listing_counts(connection, category_id, -count)
+    if counts:
+        bump_cache_generation(connection, LISTINGS_GENERATION)
+        bump_cache_generation(connection, CONTENT_GENERATION)
+    return sum(count for _, count in counts)
+
+
+def reconcile_listing_counts(connection) -> int:
+    """
+    Recompute every category's listing counters from the listing table.
+
+    Runs one GROUP BY over listings, rolls the counts up along each category's
+    materialized path, and writes only the rows that drifted.
+
+    Returns:
+        Number of categories whose counters were corrected.
+    """
+    table = Category.__table__
+    listing_table = Listing.__table__
+    direct_counts = dict(
+        connection.execute(
+            select(listing_table.c.category_id, func.count()).group_by(
+                listing_table.c.category_id
+            )
+        ).all()
+    )
+    rows = connection.execute(
+        select(
+            table.c.id,
+            table.c.path,
+            table.c.direct_listing_count,
+            table.c.subtree_listing_count,
+        )
+    ).all()
+
+    subtree_counts = {row.id: 0 for row in rows}
+    for row in rows:
+        count = direct_counts.get(row.id, 0)
+        if not count:
+            continue
+        for category_id in _path_ids(row.path) or [row.id]:
+            if category_id in subtree_counts:
+                subtree_counts[category_id] += count
+
+    corrected = 0
+    for row in rows:
+        direct = direct_counts.get(row.id, 0)
+        subtree = subtree_counts[row.id]
+        if (row.direct_listing_count, row.subtree_listing_count) != (direct, subtree):
+            connection.execute(
+                update(table)
+                .where(table.c.id == row.id)
+                .values(direct_listing_count=direct, subtree_listing_count=subtree)
+            )
+            corrected += 1
+    return corrected
+
+
+@event.listens_for(Listing, "after_insert")
+def _count_inserted_listing(mapper, connection, target):
+    _adjust_listing_counts(connection, target.category_id, 1)
+
+
+@event.listens_for(Listing, "after_delete")
+def _count_deleted_listing(mapper, connection, target):
+    _adjust_listing_counts(connection, target.category_id, -1)
+
+
+@event.listens_for(Listing, "after_update")
+def _count_moved_listing(mapper, connection, target):
+    history = inspect(target).attrs.category_id.history
+    if not history.has_changes():
+        return
+    old_category_id = history.deleted[0] if history.deleted else None
+    _adjust_listing_counts(connection, old_category_id, -1)
+    _adjust_listing_counts(connection, target.category_id, 1)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_category_tree_generation(session, flush_context):
+    """
+    Bump the category tree generation when any Category is inserted,
+    updated, or deleted, so cached tree snapshots get rebuilt.
+
+    Categories that are only "dirty" because their listings collection changed
+    do not count.
+    """
+    changed = [
+        obj
+        for obj in list(session.new) + list(session.deleted)
+        if isinstance(obj, Category)
+    ] + [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, Category)
+        and session.is_modified(obj, include_collections=False)
+    ]
+    if changed:
+        bump_cache_generation(session.connection(), CATEGORY_TREE_GENERATION)
+        session.info["category_tree_changed"] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_listings_generation(session, flush_context):
+    """
+    Bump the listings generation when a Listing is inserted, deleted, or moved
+    to another category, so cached showcase pools get rebuilt.
+
+    Edits to other listing columns leave pool membership unchanged and do not
+    bump it. Set-based deletes that bypass the ORM must bump it themselves.
+    """
+    changed = any(
+        isinstance(obj, Listing)
+        for obj in list(session.new) + list(session.deleted)
+    ) or any(
+        isinstance(obj, Listing)
+        and inspect(obj).attrs.category_id.history.has_changes()
+        for obj in session.dirty
+    )
+    if changed:
+        bump_cache_generation(session.connection(), LISTINGS_GENERATION)
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_updated_at(session, flush_context, instances):
+    """
+    Set updated_at of listings and categories whose columns changed, unless it
+    was set explicitly (new rows get it from the column default). Set-based
+    path rewrites and image changes touch the rows themselves.
+    """
+    now = datetime.now(timezone.utc)
+    for obj in session.dirty:
+        if (
+            isinstance(obj, (Listing, Category))
+            and session.is_modified(obj, include_collections=False)
+            and not inspect(obj).attrs.updated_at.history.has_changes()
+        ):
+            obj.updated_at = now
+
+
+@event.listens_for(Session, "after_flush")
+def _touch_updated_listings(session, flush_context):
+    """
+    Set updated_at of listings whose images or image derivatives changed in
+    this flush.
+    """
+    listing_ids = set()
+    image_ids = set()
+    for obj in list(session.new) + list(session.deleted) + list(session.dirty):
+        if isinstance(obj, ListingImage):
+            if obj not in session.dirty or session.is_modified(
+                obj, include_collections=False
+            ):
+                listing_ids.add(obj.listing_id)
+        elif isinstance(obj, ListingImageDerivative):
+            image_ids.add(obj.image_id)
+    if not (listing_ids or image_ids):
+        return
+    listing_table = Listing.__table__
+    image_table = ListingImage.__table__
+    condition = listing_table.c.id.in_(listing_ids)
+    if image_ids:
+        condition = condition | listing_table.c.id.in_(
+            select(image_table.c.listing_id).where(image_table.c.id.in_(image_ids))
+        )
+    session.connection().execute(
+        update(listing_table)
+        .where(condition)
+        .values(updated_at=datetime.now(timezone.utc))
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_content_generation(session, flush_context):
+    """
+    Bump the content generation when a Listing, ListingImage,
+    ListingImageDerivative or Category is inserted, deleted or has a column
+    changed, so cached pages (see page_cache) are rendered again.
+    """
+    content_types = (Listing, ListingImage, ListingImageDerivative, Category)
+    changed = any(
+        isinstance(obj, content_types)
+        for obj in list(session.new) + list(session.deleted)
+    ) or any(
+        isinstance(obj, content_types)
+        and session.is_modified(obj, include_collections=False)
+        for obj in session.dirty
+    )
+    if changed:
+        bump_cache_generation(session.connection(), CONTENT_GENERATION)
 
 
 # Reserved route names that cannot be used as category url_name
@@ -489,6 +1176,8 @@ RESERVED_CATEGORY_NAMES = {
     "users",
     "listings",
     "dashboard",
+    "search",
+    "media",
 }
 
 
@@ -0,0 +1,236 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Opt-in full-page cache for anonymous browsing.
+
+With PAGE_CACHE_ENABLED, GET requests of anonymous users (no login, no
+pending flash messages) to the public browsing pages (PAGE_CACHE_ENDPOINTS:
+home, category pages, listing detail) are answered from a cache of rendered
+responses. Entries are keyed by the path with its query string and the
+"content" generation (see cache_generation), which every listing, image or
+category write bumps in its own transaction: a write makes all cached pages
+stale at once, on every worker, for the price of one primary-key read per
+request. PAGE_CACHE_TTL additionally bounds how long an entry lives, so the
+random parts of a page (home page showcases) still refresh.
+
+Cached pages carry a strong ETag (digest of the body), Last-Modified (when
+the entry was rendered) and "Vary: Cookie", and conditional requests are
+answered with 304. PAGE_CACHE_BACKEND selects where entries live:
+- "memory": per-process LRU of PAGE_CACHE_SIZE entries (default)
+- "redis": shared Redis-compatible server at PAGE_CACHE_REDIS_URL; requires
+  the redis package (`classifieds[redis]`)
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import current_app, g, request, session
+from flask_login import current_user
+
+from .models import CONTENT_GENERATION, db, get_cache_generation
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """A rendered 200 response and its validators."""
+
+    body: bytes
+    content_type: str
+    etag: str
+    last_modified: datetime
+    expires_at: float
+
+    def to_bytes(self) -> bytes:
+        header = {
+            "content_type": self.content_type,
+            "etag": self.etag,
+            "last_modified": self.last_modified.timestamp(),
+            "expires_at": self.expires_at,
+        }
+        return json.dumps(header).encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedPage":
+        header, body = data.split(b"\n", 1)
+        fields = json.loads(header)
+        return cls(
+            body=body,
+            content_type=fields["content_type"],
+            etag=fields["etag"],
+            last_modified=datetime.fromtimestamp(
+                fields["last_modified"], tz=timezone.utc
+            ),
+            expires_at=fields["expires_at"],
+        )
+
+
+class MemoryPageStore:
+    """Per-process LRU of cached pages."""
+
+    name = "memory"
+
+    def __init__(self, config):
+        self.max_entries = config.get("PAGE_CACHE_SIZE", 1024)
+        self._pages: OrderedDict[str, CachedPage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedPage]:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                return None
+            if page.expires_at <= time.time():
+                del self._pages[key]
+                return None
+            self._pages.move_to_end(key)
+            return page
+
+    def set(self, key: str, page: CachedPage, ttl: int) -> None:
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+
+class RedisPageStore:
+    """
+    Cached pages in a Redis-compatible server, shared by all workers.
+    Entries expire on the server after PAGE_CACHE_TTL seconds; entries of old
+    generations are never read again and expire the same way.
+    """
+
+    name = "redis"
+
+    def __init__(self, config, client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "PAGE_CACHE_BACKEND='redis' requires redis: install classifieds[redis]."
+                ) from e
+            client = redis.Redis.from_url(config["PAGE_CACHE_REDIS_URL"])
+        self.client = client
+        self.prefix = config.get("PAGE_CACHE_KEY_PREFIX") or "classifieds:page:"
+
+    def get(self, key: str) -> Optional[CachedPage]:
+        data = self.client.get(self.prefix + key)
+        if data is None:
+            return None
+        return CachedPage.from_bytes(data)
+
+    def set(self, key: str, page: CachedPage, ttl: int) -> None:
+        self.client.set(self.prefix + key, page.to_bytes(), ex=max(ttl, 1))
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+STORES = {
+    MemoryPageStore.name: MemoryPageStore,
+    RedisPageStore.name: RedisPageStore,
+}
+
+
+def create_page_store(config):
+    """Build the store selected by config["PAGE_CACHE_BACKEND"]."""
+    backend = config.get("PAGE_CACHE_BACKEND") or MemoryPageStore.name
+    if backend not in STORES:
+        raise ValueError(f"Unknown PAGE_CACHE_BACKEND '{backend}'")
+    return STORES[backend](config)
+
+
+def get_page_store():
+    store = current_app.extensions.get("page_cache")
+    if store is None:
+        # PAGE_CACHE_ENABLED was switched on after create_app()
+        store = current_app.extensions["page_cache"] = create_page_store(
+            current_app.config
+        )
+    return store
+
+
+def _is_cacheable_request() -> bool:
+    return (
+        current_app.config.get("PAGE_CACHE_ENABLED", False)
+        and request.method in ("GET", "HEAD")
+        and request.endpoint in current_app.config["PAGE_CACHE_ENDPOINTS"]
+        and not current_user.is_authenticated
+        and "_flashes" not in session
+    )
+
+
+def _page_key() -> str:
+    generation = get_cache_generation(db.session, CONTENT_GENERATION)
+    return f"{generation}:{request.script_root}{request.full_path}"
+
+
+def _page_response(response, page: CachedPage):
+    """Add the validators of `page` and answer conditional requests."""
+    response.set_etag(page.etag)
+    response.last_modified = page.last_modified
+    response.vary.add("Cookie")
+    # Browsers may keep the page but must revalidate (cheap 304s)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _serve_cached_page():
+    if not _is_cacheable_request():
+        return None
+    key = _page_key()
+    page = get_page_store().get(key)
+    if page is None:
+        g.page_cache_key = key
+        return None
+    response = current_app.response_class(page.body, content_type=page.content_type)
+    response.headers["X-Page-Cache"] = "hit"
+    return _page_response(response, page)
+
+
+def _store_page(response):
+    key = g.pop("page_cache_key", None)
+    if (
+        key is None
+        or response.status_code != 200
+        or response.direct_passthrough
+        or response.mimetype != "text/html"
+        or session.modified
+    ):
+        return response
+    body = response.get_data()
+    ttl = current_app.config.get("PAGE_CACHE_TTL", 300)
+    page = CachedPage(
+        body=body,
+        content_type=response.content_type,
+        etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
+        last_modified=datetime.now(timezone.utc).replace(microsecond=0),
+        expires_at=time.time() + ttl,
+    )
+    get_page_store().set(key, page, ttl)
+    response.headers["X-Page-Cache"] = "miss"
+    return _page_response(response, page)
+
+
+def init_app(app) -> None:
+    """Register the request hooks, and the page store when enabled."""
+    if app.config.get("PAGE_CACHE_ENABLED", False):
+        app.extensions["page_cache"] = create_page_store(app.config)
+    app.before_request(_serve_cached_page)
+    app.after_request(_store_page)
@@ -0,0 +1,266 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Read-only JSON API for listings.
+
+- GET /api/listings: newest first, optionally restricted to a category
+  subtree (?category=<id or url path, e.g. vehicles/cars>). Keyset
+  pagination: ?limit=N (API_PAGE_SIZE by default, at most API_MAX_PAGE_SIZE)
+  and ?after=<next_cursor of the previous page>.
+- GET /api/listings/<id>: one listing.
+
+?fields=id,title,... selects the fields of each listing (see FIELDS); only
+the columns behind them are selected, and images are only queried for the
+"thumbnail" and "images" fields. Rows are serialized straight from column
+tuples, without loading Listing objects or relationships.
+
+Responses are compressed with brotli (when the brotli package is installed)
+or gzip, as negotiated with Accept-Encoding.
+"""
+
+import gzip
+from collections import defaultdict
+from urllib.parse import urljoin
+
+from flask import Blueprint, current_app, jsonify, request, url_for
+from sqlalchemy import select
+from werkzeug.exceptions import BadRequest, NotFound
+
+from ..category_tree import get_category_tree
+from ..models import Listing, ListingImage, ListingImageDerivative, as_utc, db
+from ..storage import media_url
+from .pagination import decode_cursor, encode_cursor, older_than
+
+try:  # Optional: Content-Encoding br
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+api_bp = Blueprint("api", __name__, url_prefix="/api")
+
+# Field name -> column; every field not listed here is derived
+COLUMNS = {
+    "id": Listing.id,
+    "title": Listing.title,
+    "description": Listing.description,
+    "price": Listing.price,
+    "category_id": Listing.category_id,
+    "created_at": Listing.created_at,
+    "updated_at": Listing.updated_at,
+}
+# Derived fields: listing page URL, category full path (from the category
+# tree snapshot), first image's thumbnail URL, all images with derivatives
+FIELDS = tuple(COLUMNS) + ("url", "category_path", "thumbnail", "images")
+DEFAULT_LIST_FIELDS = (
+    "id",
+    "title",
+    "price",
+    "category_id",
+    "created_at",
+    "url",
+    "thumbnail",
+)
+
+
+# By code: app-wide handlers for a code take precedence over class handlers
+@api_bp.errorhandler(400)
+@api_bp.errorhandler(404)
+def _json_error(error):
+    return jsonify({"error": error.description}), error.code
+
+
+@api_bp.after_request
+def _compress(response):
+    """Compress the JSON body as negotiated with Accept-Encoding."""
+    if (
+        response.direct_passthrough
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < current_app.config["API_COMPRESS_MIN_SIZE"]:
+        return response
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(body, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def _parse_fields(default) -> tuple[str, ...]:
+    raw = request.args.get("fields")
+    if not raw:
+        return tuple(default)
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise BadRequest(
+            f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(FIELDS)}"
+        )
+    return fields
+
+
+def _select_columns(fields):
+    """SELECT of the columns behind `fields`, plus id and created_at (cursors)."""
+    names = ["id", "created_at"] + [f for f in fields if f in COLUMNS]
+    if "category_path" in fields:
+        names.append("category_id")
+    return select(*(COLUMNS[name] for name in dict.fromkeys(names)))
+
+
+def _absolute(url):
+    return urljoin(request.url_root, url)
+
+
+def _load_images(listing_ids, with_derivatives: bool):
+    """listing id -> list of image dicts (in upload order), from column tuples."""
+    rows = db.session.execute(
+        select(
+            ListingImage.listing_id,
+            ListingImage.id,
+            ListingImage.filename,
+            ListingImage.thumbnail_filename,
+        )
+        .where(ListingImage.listing_id.in_(listing_ids))  # type: ignore
+        .order_by(ListingImage.listing_id, ListingImage.id)
+    ).all()
+    derivatives = defaultdict(list)
+    if with_derivatives and rows:
+        for row in db.session.execute(
+            select(
+                ListingImageDerivative.image_id,
+                ListingImageDerivative.width,
+                ListingImageDerivative.height,
+                ListingImageDerivative.format,
+                ListingImageDerivative.filename,
+            )
+            .where(
+                ListingImageDerivative.image_id.in_([r.id for r in rows])  # type: ignore
+            )
+            .order_by(ListingImageDerivative.format, ListingImageDerivative.width)
+        ):
+            derivatives[row.image_id].append(
+                {
+                    "width": row.width,
+                    "height": row.height,
+                    "format": row.format,
+                    "url": _absolute(media_url("derivatives", row.filename)),
+                }
+            )
+    images = defaultdict(list)
+    for row in rows:
+        image = {
+            "url": _absolute(media_url("uploads", row.filename)),
+            "thumbnail": (
+                _absolute(media_url("thumbnails", row.thumbnail_filename))
+                if row.thumbnail_filename
+                else None
+            ),
+        }
+        if with_derivatives:
+            image["derivatives"] = derivatives[row.id]
+        images[row.listing_id].append(image)
+    return images
+
+
+def _serialize(rows, fields) -> list[dict]:
+    images = {}
+    if "thumbnail" in fields or "images" in fields:
+        images = _load_images([row.id for row in rows], "images" in fields)
+    category_tree = get_category_tree() if "category_path" in fields else None
+
+    items = []
+    for row in rows:
+        item = {}
+        for field in fields:
+            if field in ("created_at", "updated_at"):
+                item[field] = as_utc(getattr(row, field)).isoformat()
+            elif field in COLUMNS:
+                item[field] = getattr(row, field)
+            elif field == "url":
+                item[field] = url_for(
+                    "listings.listing_detail", listing_id=row.id, _external=True
+                )
+            elif field == "category_path":
+                category = category_tree.get(row.category_id)
+                item[field] = category.url_path if category else None
+            elif field == "thumbnail":
+                first = images.get(row.id)
+                item[field] = first[0]["thumbnail"] if first else None
+            else:
+                item[field] = images.get(row.id, [])
+        items.append(item)
+    return items
+
+
+def _category_filter():
+    """Category ids of the ?category= subtree, or None for all listings."""
+    value = request.args.get("category", "").strip("/")
+    if not value:
+        return None
+    tree = get_category_tree()
+    category = tree.get(int(value)) if value.isdigit() else tree.resolve_path(value)
+    if category is None:
+        raise NotFound(f"Unknown category '{value}'.")
+    return category.descendant_ids
+
+
+@api_bp.route("/listings")
+def list_listings():
+    """
+    One page of listings, newest first.
+
+    Returns:
+        JSON object {"items": [...], "next_cursor": str or null}
+    """
+    fields = _parse_fields(DEFAULT_LIST_FIELDS)
+    limit = request.args.get("limit", current_app.config["API_PAGE_SIZE"], type=int)
+    limit = max(1, min(limit, current_app.config["API_MAX_PAGE_SIZE"]))
+
+    query = _select_columns(fields)
+    category_ids = _category_filter()
+    if category_ids is not None:
+        query = query.where(Listing.category_id.in_(category_ids))  # type: ignore
+    after = request.args.get("after")
+    if after:
+        cursor = decode_cursor(after)
+        if cursor is None:
+            raise BadRequest("Invalid cursor.")
+        query = query.where(older_than(*cursor))
+
+    # One extra row tells whether there is a next page
+    rows = db.session.execute(
+        query.order_by(Listing.created_at.desc(), Listing.id.desc()).limit(limit + 1)
+    ).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return jsonify({"items": _serialize(rows, fields), "next_cursor": next_cursor})
+
+
+@api_bp.route("/listings/<int:listing_id>")
+def get_listing(listing_id):
+    """
+    One listing; all fields unless ?fields= is given.
+
+    Returns:
+        JSON object of the listing's fields
+    """
+    fields = _parse_fields(FIELDS)
+    row = db.session.execute(
+        _select_columns(fields).where(Listing.id == listing_id)
+    ).one_or_none()
+    if row is None:
+        raise NotFound("Listing not found.")
+    return jsonify(_serialize([row], fields)[0])
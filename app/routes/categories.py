@@ -20,6 +20,7 @@ API endpoints return JSON only and are used for AJAX calls from the frontend.
 
 from flask import (
     Blueprint,
+    abort,
     flash,
     jsonify,
     redirect,
@@ -30,6 +31,7 @@ from flask import (
 from flask_login import login_required
 from sqlalchemy import select
 
+from ..category_tree import get_category_tree
 from ..forms import CategoryForm
 from ..models import (
     RESERVED_CATEGORY_NAMES,
@@ -52,31 +54,21 @@ def admin_list():
     """
     Lists all categories for admin management.
     Shows hierarchy: parent and children.
+
+    Renders from the category tree snapshot and reads the denormalized
+    subtree listing counters, so the page costs a constant number of queries.
     """
-    categories = (
-        db.session.execute(select(Category).order_by(Category.name)).scalars().all()
+    category_tree = get_category_tree()
+
+    # Listing count for each category (including descendants)
+    listing_counts = dict(
+        db.session.execute(select(Category.id, Category.subtree_listing_count)).all()
     )
 
-    # Calculate listing count for each category (including descendants)
-    listing_counts = {}
-    for c in categories:
-        listing_counts[c.id] = _count_listings_recursive(c, categories)
-
-    forms = {}
-    for c in categories:
-        form = CategoryForm(obj=c)
-        # Set parent_id choices, exclude self
-        form.parent_id.choices = [("0", "- None -")] + [
-            (str(cat.id), cat.get_full_path()) for cat in categories if cat.id != c.id
-        ]  # type: ignore
-        # Set the current parent_id value
-        form.parent_id.data = str(c.parent_id) if c.parent_id else "0"
-        forms[c.id] = form
     return render_template(
         "admin/admin_categories.html",
-        categories=categories,
+        root_categories=category_tree.roots,
         listing_counts=listing_counts,
-        forms=forms,
         page_title="Manage categories",
     )
 
@@ -214,13 +206,12 @@ def admin_delete(category_id):
     """
     category = db.get_or_404(Category, category_id)
 
-    # Build set of category ids to inspect: target + all descendants
-    descendant_ids = set(category.get_descendant_ids() or [])
-    ids_to_check = {category.id} | descendant_ids
-
     # Check for any listings in the category or any descendant category
+    # (single query over the materialized-path subtree)
     existing_listings = db.session.execute(
-        select(Listing.id).where(Listing.category_id.in_(ids_to_check))
+        select(Listing.id).where(
+            Listing.category_id.in_(category.subtree_ids_select())
+        )
     ).first()
     if existing_listings:
         flash(
@@ -265,7 +256,9 @@ def api_breadcrumb(category_id):
     """
     if category_id == 0:
         return jsonify([])  # No breadcrumb for root
-    category = db.one_or_404(select(Category).where(Category.id == category_id))
+    category = get_category_tree().get(category_id)
+    if category is None:
+        abort(404)
     return jsonify([c.to_dict() for c in category.breadcrumb])
 
 
@@ -307,13 +300,3 @@ def _validate_category_inputs(
 
     return url_name, None
 
-
-def _count_listings_recursive(category, all_categories):
-    """
-    Recursively count listings for a category and all its descendants.
-    """
-    count = len(category.listings)
-    for child in all_categories:
-        if child.parent_id == category.id:
-            count += _count_listings_recursive(child, all_categories)
-    return count
@@ -10,12 +10,12 @@ at the request of Fernando "ferabreu" Mees Abreu (https://github.com/ferabreu).
 
 Error handler routes for the classifieds Flask app.
 
-Defines custom responses for common HTTP errors (404, 500, 403),
+Defines custom responses for common HTTP errors (404, 500, 403, 413),
 rendering a user-friendly error page with appropriate status code
 and descriptive messages.
 """
 
-from flask import Blueprint, render_template
+from flask import Blueprint, current_app, render_template
 
 errors_bp = Blueprint("errors", __name__)
 
@@ -80,3 +80,28 @@ def forbidden_error(error):
         ),
         403,
     )
+
+
+@errors_bp.app_errorhandler(413)
+def request_too_large_error(error):
+    """
+    Handler for 413 Request Entity Too Large errors.
+    Rendered when an upload exceeds MAX_CONTENT_LENGTH; the request body is
+    not read past the limit.
+    """
+    error_name = "Upload too large"
+    max_size = current_app.config.get("MAX_CONTENT_LENGTH") or 0
+
+    return (
+        render_template(
+            "error.html",
+            error_code=413,
+            error_name=error_name,
+            error_description=(
+                f"The uploaded files exceed the {max_size / (1024 * 1024):g} MB "
+                "limit. Please upload fewer or smaller images."
+            ),
+            page_title=error_name,
+        ),
+        413,
+    )
@@ -8,31 +8,60 @@
 Helper functions for the Listings Blueprint.
 
 This module contains reusable helper functions for listing operations:
-- Showcase category selection and building
+- Showcase category selection, candidate pools (cached for the index page)
+  and building
+- Listing totals for pagination, read from the denormalized category counters
+- Validators (ETag, Last-Modified) for conditional GETs of listing pages
 - Listing deletion with ACID file operations
 - Listing editing with atomic temp->commit->move pattern
 """
 
+import hashlib
 import os
 import random
-import shutil
 import uuid
 from collections import defaultdict
-from typing import TypedDict
+from datetime import datetime
+from typing import Optional, TypedDict
 
 from flask import current_app, flash, redirect, render_template, request, url_for
 from flask_login import current_user
-from sqlalchemy import func, select
+from sqlalchemy import Integer, column, delete, func, select, values
+from sqlalchemy.orm import selectinload
 from werkzeug.utils import secure_filename
 
+from app.assets import release_fingerprint
+from app.category_tree import get_category_tree
 from app.forms import ListingForm
-from app.models import Category, Listing, ListingImage, db
+from app.jobs import dispatch_jobs
+from app.models import (
+    LISTINGS_GENERATION,
+    Category,
+    Listing,
+    ListingImage,
+    ListingImageDerivative,
+    as_utc,
+    count_deleted_listings,
+    db,
+    get_cache_generation,
+)
+from app.search import get_search_backend
+from app.showcase_cache import ShowcaseBundle, get_showcase_cache
 
 from ..utils import (
-    cleanup_temp_files,
-    create_thumbnail,
-    move_image_files_to_temp,
-    restore_files_from_temp,
+    UploadRejected,
+    discard_stored_uploads,
+    journal_image_files,
+    queue_file_reaper,
+    queue_image_jobs,
+    save_image_upload,
+    store_uploads,
+)
+
+# Listing cards and the detail page show thumbnails plus responsive sizes:
+# load images and their derivatives in two extra queries per statement
+LISTING_IMAGES_LOADER = selectinload(Listing.images).selectinload(
+    ListingImage.derivatives
 )
 
 
@@ -43,19 +72,19 @@ class CategoryShowcase(TypedDict):
     listings: list[Listing]
 
 
-def get_index_showcase_categories():
+def get_index_showcase_candidate_ids() -> list[int]:
     """
-    Retrieve up to N categories for displaying in index page showcases.
+    Return the IDs of categories eligible for index page showcases.
 
     Strategy:
     - If INDEX_SHOWCASE_CATEGORIES is explicitly configured, use those category IDs
-      (filtered to only include categories with listings).
-    - Otherwise, query top 2N categories by listing count, randomly select N from them,
-      and filter out categories with no listings.
+      (filtered to only include categories with listings), up to N.
+    - Otherwise, read the top 2N categories by their denormalized
+      direct_listing_count (an indexed read, no listing scan). Each request
+      then randomly picks N of them.
 
     Returns:
-        list: Up to N Category objects with listings, in no particular order.
-              Empty list if no categories with listings exist.
+        list: Category IDs with listings. Empty list if none exist.
 
     Note: Config keys still use "SHOWCASE" naming for backward compatibility.
           These will be renamed to "SHOWCASE" in a future refactor.
@@ -65,46 +94,183 @@ def get_index_showcase_categories():
 
     if explicit_categories:
         # Use explicitly configured category IDs, filtered to only those with listings
-        categories = (
+        category_ids = (
             db.session.execute(
-                select(Category).where(
+                select(Category.id).where(
                     Category.id.in_(explicit_categories),
-                    Category.listings.any(),
+                    Category.direct_listing_count > 0,
                 )
             )
             .scalars()
             .all()
         )
-        return categories[:showcase_count]
+        return list(category_ids[:showcase_count])
 
-    # Auto-select: query top 2N categories by listing count
+    # Auto-select: top 2N categories by listing count (only those with listings)
     top_count = showcase_count * 2
-    category_listing_counts = db.session.execute(
+    return list(
+        db.session.execute(
+            select(Category.id)
+            .where(Category.direct_listing_count > 0)
+            .order_by(Category.direct_listing_count.desc())
+            .limit(top_count)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def get_index_showcases(display_slots: int, fetch_limit: int) -> list[CategoryShowcase]:
+    """
+    Build the index page showcases from the cached showcase bundle.
+
+    The bundle (candidate categories and a pool of up to fetch_limit listing IDs
+    per category) is rebuilt only when listings or categories change or its TTL
+    expires. Per request this picks N categories and display_slots listings per
+    category at random from the pools, then loads the chosen listings with a
+    single IN query.
+    """
+    category_tree = get_category_tree()
+    key = (
+        get_cache_generation(db.session, LISTINGS_GENERATION),
+        category_tree.generation,
+    )
+
+    def build() -> ShowcaseBundle:
+        candidates = [
+            category_tree.get(category_id)
+            for category_id in get_index_showcase_candidate_ids()
+            if category_tree.get(category_id) is not None
+        ]
+        pools = get_showcase_pools(candidates, fetch_limit)
+        return ShowcaseBundle(
+            key=key,
+            category_ids=tuple(category.id for category in candidates),
+            pools={category_id: tuple(ids) for category_id, ids in pools.items()},
+        )
+
+    bundle = get_showcase_cache().get(key, build)
+
+    # Randomly select up to N of the candidate categories for this request
+    showcase_count = current_app.config.get("INDEX_SHOWCASE_COUNT", 4)
+    selected_ids = random.sample(
+        bundle.category_ids, min(showcase_count, len(bundle.category_ids))
+    )
+    categories = [category_tree.by_id[category_id] for category_id in selected_ids]
+    return showcases_from_pools(categories, bundle.pools, display_slots)
+
+
+def get_showcase_pools(categories, fetch_limit: int) -> dict[int, list[int]]:
+    """
+    Return candidate listing IDs for each category's showcase.
+
+    Each pool holds the category's direct listings (newest first), topped up
+    with listings from its descendants (newest first) when there are fewer
+    than fetch_limit direct ones, and never exceeds fetch_limit.
+
+    Runs as one query: a VALUES list maps each showcase to the categories it
+    draws from (its own category with priority 0, descendants with priority 1),
+    and ROW_NUMBER() OVER (PARTITION BY showcase) keeps the first fetch_limit
+    rows per showcase in SQL. Only IDs are returned, so memory use does not
+    depend on category size.
+    """
+    if not categories:
+        return {}
+
+    mapping_rows = []
+    for category in categories:
+        mapping_rows.append((category.id, category.id, 0))
+        mapping_rows.extend(
+            (category.id, descendant_id, 1)
+            for descendant_id in category.get_descendant_ids()
+            if descendant_id != category.id
+        )
+    showcase_map = (
+        values(
+            column("showcase_id", Integer),
+            column("category_id", Integer),
+            column("priority", Integer),
+            name="showcase_map",
+        )
+        .data(mapping_rows)
+        .cte()
+    )
+
+    position = (
+        func.row_number()
+        .over(
+            partition_by=showcase_map.c.showcase_id,
+            order_by=(
+                showcase_map.c.priority,
+                Listing.created_at.desc(),
+                Listing.id.desc(),
+            ),
+        )
+        .label("position")
+    )
+    ranked = (
         select(
-            Category.id,
-            func.count(Listing.id).label("listing_count"),
+            showcase_map.c.showcase_id,
+            Listing.id.label("listing_id"),
+            position,
         )
-        .outerjoin(Listing)
-        .group_by(Category.id)
-        .order_by(func.count(Listing.id).desc())
-        .limit(top_count)
+        .join_from(showcase_map, Listing, Listing.category_id == showcase_map.c.category_id)
+        .subquery()
+    )
+    rows = db.session.execute(
+        select(ranked.c.showcase_id, ranked.c.listing_id)
+        .where(ranked.c.position <= fetch_limit)
+        .order_by(ranked.c.showcase_id, ranked.c.position)
     ).all()
 
-    # Extract category IDs from results (only those with at least 1 listing)
-    category_ids = [cat_id for cat_id, count in category_listing_counts if count > 0]
+    pools: dict[int, list[int]] = defaultdict(list)
+    for showcase_id, listing_id in rows:
+        pools[showcase_id].append(listing_id)
+    return dict(pools)
 
-    # Randomly select up to N from the top 2N
-    selected_ids = random.sample(category_ids, min(showcase_count, len(category_ids)))
 
-    # Fetch and return the selected categories
-    return (
-        db.session.execute(select(Category).where(Category.id.in_(selected_ids)))
-        .scalars()
-        .all()
-    )
+def showcases_from_pools(
+    categories, pools: dict, display_slots: int
+) -> list[CategoryShowcase]:
+    """
+    Pick display_slots random listings from each category's pool and load them.
 
+    All picked listings (and their images, for the card thumbnails) are loaded
+    in one IN query plus one image query. Categories with an empty pool are
+    left out.
+    """
+    picks = {}
+    for category in categories:
+        pool = pools.get(category.id, ())
+        if pool:
+            picks[category.id] = random.sample(pool, min(display_slots, len(pool)))
+
+    listing_ids = [listing_id for ids in picks.values() for listing_id in ids]
+    listings_by_id = {}
+    if listing_ids:
+        listings_by_id = {
+            listing.id: listing
+            for listing in db.session.execute(
+                select(Listing)
+                .where(Listing.id.in_(listing_ids))
+                .options(LISTING_IMAGES_LOADER)
+            ).scalars()
+        }
 
-def build_category_showcases(  # noqa: C901
+    showcases = []
+    for category in categories:
+        # A listing deleted since the pool was built is simply skipped
+        selected_listings = [
+            listings_by_id[listing_id]
+            for listing_id in picks.get(category.id, ())
+            if listing_id in listings_by_id
+        ]
+        if selected_listings:
+            showcases.append({"category": category, "listings": selected_listings})
+    return showcases
+
+
+def build_category_showcases(
     categories: list[Category],
     display_slots: int,
     fetch_limit: int,
@@ -112,13 +278,9 @@ def build_category_showcases(  # noqa: C901
     """
     Build showcase data for multiple categories using batch queries.
 
-    This function optimizes showcase building by fetching listings for all
-    categories in maximum 2 database queries instead of N+1 queries:
-    1. Direct listings for all categories (single batch query)
-    2. Descendant listings for categories needing fallback (conditional batch query)
-
-    The function then groups listings in Python and applies per-category
-    randomization to maintain the existing user experience.
+    Computes the candidate pools (get_showcase_pools, one windowed query) and
+    then picks and loads the displayed listings (showcases_from_pools), so at
+    most 3 queries run regardless of the number or size of the categories.
 
     Args:
         categories: List of Category objects to build showcases for
@@ -129,97 +291,125 @@ def build_category_showcases(  # noqa: C901
         List of dicts with structure: {"category": Category, "listings": [Listing, ...]}
         Each category's listings are randomized and limited to display_slots.
         Only categories with listings are included in the output.
+    """
+    pools = get_showcase_pools(categories, fetch_limit)
+    return showcases_from_pools(categories, pools, display_slots)
 
-    Performance:
-        - Best case: 1 query (all categories have sufficient direct listings)
-        - Typical case: 2 queries (direct + descendant fallback for some categories)
-        - Worst case: 2 queries (all categories need descendant fallback)
+
+def get_category_listing_total(category_id: int) -> int:
     """
-    if not categories:
-        return []
+    Number of listings in a category and its descendants.
+
+    Reads Category.subtree_listing_count (one primary-key lookup) instead of
+    running COUNT(*) over the listing table.
+    """
+    total = db.session.execute(
+        select(Category.subtree_listing_count).where(Category.id == category_id)
+    ).scalar()
+    return total or 0
 
-    # Phase 1: Batch fetch direct listings for all categories
-    category_ids = [cat.id for cat in categories]
-    direct_listings = (
+
+def get_listing_total() -> int:
+    """Number of listings site-wide, summed from the per-category counters."""
+    return db.session.execute(
+        select(func.coalesce(func.sum(Category.direct_listing_count), 0))
+    ).scalar_one()
+
+
+def get_listing_validators(listing_id: int) -> Optional[tuple[str, datetime]]:
+    """
+    ETag and Last-Modified of a listing's detail page, from one primary-key
+    read of listing.updated_at (None if the listing does not exist).
+
+    Besides the listing (updated_at also moves with its images), the page
+    depends on the category tree (breadcrumb, sidebar), the viewer (navbar,
+    edit buttons), the URL (admin view) and the deployed templates and assets,
+    so all of them go into the ETag. Last-Modified is the later of the
+    listing's and the category tree's last change.
+    """
+    updated_at = as_utc(
         db.session.execute(
-            select(Listing)
-            .where(Listing.category_id.in_(category_ids))
-            .order_by(Listing.created_at.desc())
+            select(Listing.updated_at).where(Listing.id == listing_id)  # type: ignore
+        ).scalar_one_or_none()
+    )
+    if updated_at is None:
+        return None
+    category_tree = get_category_tree()
+    viewer = (
+        (current_user.id, current_user.email, current_user.is_admin)
+        if current_user.is_authenticated
+        else None
+    )
+    version = repr(
+        (
+            listing_id,
+            updated_at.isoformat(),
+            category_tree.generation,
+            viewer,
+            request.path,
+            release_fingerprint(),
         )
-        .scalars()
-        .all()
     )
+    etag = hashlib.blake2b(version.encode(), digest_size=16).hexdigest()
+    last_modified = max(updated_at, category_tree.last_modified or updated_at)
+    return etag, last_modified
 
-    # Phase 2: Group listings by category_id in Python
-    listings_by_category = defaultdict(list)
-    for listing in direct_listings:
-        listings_by_category[listing.category_id].append(listing)
 
-    # Phase 3: Identify categories needing descendant fallback
-    categories_needing_descendants = []
-    for category in categories:
-        direct_count = len(listings_by_category[category.id])
-        if direct_count < fetch_limit:
-            categories_needing_descendants.append(category)
-
-    # Phase 4: Batch fetch descendant listings if needed
-    if categories_needing_descendants:
-        # Collect all descendant IDs for categories needing them
-        all_descendant_ids = set()
-        for category in categories_needing_descendants:
-            descendant_ids = category.get_descendant_ids()
-            # Exclude the category itself (already fetched in direct query)
-            descendant_ids = [cid for cid in descendant_ids if cid != category.id]
-            all_descendant_ids.update(descendant_ids)
-
-        if all_descendant_ids:
-            descendant_listings = (
-                db.session.execute(
-                    select(Listing)
-                    .where(Listing.category_id.in_(list(all_descendant_ids)))
-                    .order_by(Listing.created_at.desc())
-                )
-                .scalars()
-                .all()
-            )
-
-            # Map descendant listings back to parent categories
-            # A descendant listing can belong to multiple parent showcases
-            for category in categories_needing_descendants:
-                descendant_ids = category.get_descendant_ids()
-                descendant_ids_set = {
-                    cid for cid in descendant_ids if cid != category.id
-                }
-                for listing in descendant_listings:
-                    if listing.category_id in descendant_ids_set:
-                        listings_by_category[category.id].append(listing)
-
-    # Phase 5: Build final showcase list with randomization
-    showcases = []
-    for category in categories:
-        listings_pool = listings_by_category[category.id]
+def delete_listings_in_bulk(listing_ids) -> int:
+    """
+    Delete listings with their images and derivatives using set-based
+    statements, journaling their image files. Does not commit.
 
-        # Limit pool to fetch_limit for memory efficiency
-        if len(listings_pool) > fetch_limit:
-            listings_pool = listings_pool[:fetch_limit]
+    The files are not touched here: they are recorded in the deletion journal
+    (see journal_image_files) and removed in bulk by a background reaper job
+    queued in the same transaction, so the time spent here does not depend on
+    the number of images. Category counters, the search index and the
+    listings generation are updated explicitly, since set-based deletes
+    bypass the ORM events.
 
-        if listings_pool:
-            # Randomize per category
-            random.shuffle(listings_pool)
-            # Select top N for display
-            selected_listings = listings_pool[:display_slots]
-            showcases.append({"category": category, "listings": selected_listings})
+    Args:
+        listing_ids: A SELECT of the ids of the listings to delete
 
-    return showcases
+    Returns:
+        Number of listings deleted.
+    """
+    connection = db.session.connection()
+    count = count_deleted_listings(connection, listing_ids)
+    if not count:
+        return 0
+    journal_image_files(listing_ids)
+    image_ids = select(ListingImage.id).where(
+        ListingImage.listing_id.in_(listing_ids)  # type: ignore
+    )
+    for statement in (
+        delete(ListingImageDerivative).where(
+            ListingImageDerivative.image_id.in_(image_ids)  # type: ignore
+        ),
+        delete(ListingImage).where(
+            ListingImage.listing_id.in_(listing_ids)  # type: ignore
+        ),
+    ):
+        db.session.execute(statement.execution_options(synchronize_session=False))
+    backend = get_search_backend(connection.dialect.name)
+    if backend is not None:
+        backend.delete(connection, listing_ids)
+    db.session.execute(
+        delete(Listing)
+        .where(Listing.id.in_(listing_ids))  # type: ignore
+        .execution_options(synchronize_session=False)
+    )
+    queue_file_reaper()
+    return count
 
 
-def _delete_listings_impl(listings):
+def _delete_listings_impl(listing_ids):
     """
-    Deletes multiple listings and their associated image files using
-    the 'temp' strategy.
+    Deletes multiple listings, their images and derivatives in one
+    transaction (see delete_listings_in_bulk); their image files are deleted
+    by a background job after the commit.
 
     Args:
-        listings: List of Listing objects to delete
+        listing_ids: A SELECT of the ids of the listings to delete
 
     Returns:
         Tuple of (success: bool, error_message: str or None, count: int)
@@ -227,40 +417,18 @@ def _delete_listings_impl(listings):
         - error_message: Error message if deletion failed, None otherwise
         - count: Number of listings deleted
     """
-    if not listings:
-        return True, None, 0
-
-    temp_dir = current_app.config["TEMP_DIR"]
-    upload_dir = current_app.config["UPLOAD_DIR"]
-    thumbnail_dir = current_app.config["THUMBNAIL_DIR"]
-
-    # Collect all images from all listings
-    all_images = []
-    for listing in listings:
-        all_images.extend(listing.images)
-
-    # Move all image files to temp directory
-    file_moves, success, error_msg = move_image_files_to_temp(
-        all_images, upload_dir, thumbnail_dir, temp_dir
-    )
-    if not success:
-        return False, error_msg, 0
-
-    # Delete listings from database
     try:
-        for listing in listings:
-            db.session.delete(listing)
+        count = delete_listings_in_bulk(listing_ids)
         db.session.commit()
     except Exception as e:
-        # Rollback: restore all files
-        restore_files_from_temp(file_moves)
         db.session.rollback()
         return False, f"Database error: {e}", 0
 
-    # Clean up temp files
-    cleanup_temp_files(file_moves)
-
-    return True, None, len(listings)
+    # Rows loaded before the delete are gone now
+    db.session.expire_all()
+    if count:
+        dispatch_jobs()
+    return True, None, count
 
 
 def _delete_listing_impl(listing_id):
@@ -278,38 +446,13 @@ def _delete_listing_impl(listing_id):
             page_title=listing.title,
         )
 
-    temp_dir = current_app.config["TEMP_DIR"]
-    upload_dir = current_app.config["UPLOAD_DIR"]
-    thumbnail_dir = current_app.config["THUMBNAIL_DIR"]
-
-    if not temp_dir:
-        flash("Temp directory is not configured.", "danger")
-        return render_template(
-            "listings/listing_detail.html",
-            listing=listing,
-            category=category,
-            category_path=category_path,
-            page_title=listing.title,
-        )
-    if not os.path.exists(temp_dir):
-        flash(
-            "Temp directory does not exist. Please initialize the application.",
-            "danger",
-        )
-        return render_template(
-            "listings/listing_detail.html",
-            listing=listing,
-            category=category,
-            category_path=category_path,
-            page_title=listing.title,
-        )
-
-    # Move images to temp
-    file_moves, success, error_msg = move_image_files_to_temp(
-        listing.images, upload_dir, thumbnail_dir, temp_dir
+    # Same path as bulk deletion: the image files are journaled and removed
+    # by the reaper job, which re-checks that no image uses them any more
+    success, error_msg, _ = _delete_listings_impl(
+        select(Listing.id).where(Listing.id == listing_id)
     )
     if not success:
-        flash(f"Error moving images: {error_msg}", "warning")
+        flash(f"Listing was not deleted. ({error_msg})", "danger")
         return render_template(
             "listings/listing_detail.html",
             listing=listing,
@@ -318,28 +461,6 @@ def _delete_listing_impl(listing_id):
             page_title=listing.title,
         )
 
-    # Delete listing from database
-    try:
-        db.session.delete(listing)
-        db.session.commit()
-    except Exception as e:
-        # Rollback: restore all files
-        restore_files_from_temp(file_moves)
-        db.session.rollback()
-        flash(
-            f"Database error. Listing was not deleted. Files restored. ({e})", "danger"
-        )
-        return render_template(
-            "listings/listing_detail.html",
-            listing=listing,
-            category=category,
-            category_path=category_path,
-            page_title=listing.title,
-        )
-
-    # Clean up temp files
-    cleanup_temp_files(file_moves)
-
     flash(f"Listing deleted successfully! (Category: {category_path})", "success")
     if request.path.startswith("/admin") and current_user.is_admin:
         return redirect(url_for("listings.admin_listings"))
@@ -466,65 +587,47 @@ def _edit_listing_impl(listing_id):  # noqa: C901
             listing.price = form.price.data or 0
             listing.category_id = form.category.data
 
-            moved_to_temp = []
-            added_temp_paths = []
-            added_files = []
-
-            upload_dir = current_app.config["UPLOAD_DIR"]
-            thumbnail_dir = current_app.config["THUMBNAIL_DIR"]
-
-            # Handle image deletions: move to temp, do not delete yet
-            # (enables rollback on DB error)
-            delete_image_ids = request.form.getlist("delete_images")
-            images_to_delete = []
-            for img_id in delete_image_ids:
-                image = db.session.get(ListingImage, int(img_id))
-                if image and image in listing.images:
-                    images_to_delete.append(image)
+            # (temp_path, stored name, content hash) of each validated upload
+            added_uploads = []
+
+            # Handle image deletions: the files are journaled in this
+            # transaction and removed by the reaper job after the commit
+            delete_image_ids = {
+                int(img_id) for img_id in request.form.getlist("delete_images")
+            }
+            images_to_delete = [
+                image for image in listing.images if image.id in delete_image_ids
+            ]
+            if images_to_delete:
+                # Before the deletes are flushed: the journal selects the rows
+                journal_image_files(image_ids=[image.id for image in images_to_delete])
+                for image in images_to_delete:
                     db.session.delete(image)
-
-            # Move images marked for deletion to temp
-            moved_to_temp, success, error_msg = move_image_files_to_temp(
-                images_to_delete, upload_dir, thumbnail_dir, temp_dir
-            )
-            if not success:
-                flash(f"Error moving images to temp: {error_msg}", "warning")
-                return render_template(
-                    "listings/listing_form.html",
-                    form=form,
-                    listing=listing,
-                    action="Edit",
-                    page_title=page_title,
-                    category=category,
-                    category_path=category_path,
-                )
+                queue_file_reaper()
 
             # Handle new image uploads: stage in TEMP_DIR until DB commit
             if form.images.data:
                 for file in form.images.data:
                     if file and file.filename:
                         ext = os.path.splitext(secure_filename(file.filename))[1]
-                        unique_filename = f"{uuid.uuid4().hex}{ext}"
-                        thumbnail_filename = f"{uuid.uuid4().hex}.jpg"
-                        temp_path = os.path.join(temp_dir, unique_filename)
-                        temp_thumb_path = os.path.join(temp_dir, thumbnail_filename)
-                        file.save(temp_path)
-                        if create_thumbnail(temp_path, temp_thumb_path):
-                            added_temp_paths.append(
-                                (
-                                    temp_path,
-                                    unique_filename,
-                                    temp_thumb_path,
-                                    thumbnail_filename,
-                                )
+                        # Stored under its content hash once validated;
+                        # thumbnails are generated by a background job after commit
+                        temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}{ext}")
+                        try:
+                            unique_filename, content_hash = save_image_upload(
+                                file, temp_path
+                            )
+                            rejection = None
+                        except UploadRejected as e:
+                            rejection = str(e)
+                        if rejection is None:
+                            added_uploads.append(
+                                (temp_path, unique_filename, content_hash)
                             )
-                            added_files.append((unique_filename, thumbnail_filename))
                         else:
                             try:
                                 if os.path.exists(temp_path):
                                     os.remove(temp_path)
-                                if os.path.exists(temp_thumb_path):
-                                    os.remove(temp_thumb_path)
                             except Exception as cleanup_err:
                                 # Best-effort temp cleanup; failure is
                                 # non-fatal but logged
@@ -532,19 +635,10 @@ def _edit_listing_impl(listing_id):  # noqa: C901
                                     "Temp remove failed (image during edit): %s",
                                     cleanup_err,
                                 )
-                            for (
-                                prev_temp_path,
-                                _,
-                                prev_temp_thumb_path,
-                                _,
-                            ) in added_temp_paths:
+                            for prev_temp_path, _, _ in added_uploads:
                                 try:
                                     if os.path.exists(prev_temp_path):
                                         os.remove(prev_temp_path)
-                                    if prev_temp_thumb_path and os.path.exists(
-                                        prev_temp_thumb_path
-                                    ):
-                                        os.remove(prev_temp_thumb_path)
                                 except Exception as cleanup_err:
                                     # Best-effort temp cleanup; failure is
                                     # non-fatal but logged
@@ -553,12 +647,10 @@ def _edit_listing_impl(listing_id):  # noqa: C901
                                         "edit): %s",
                                         cleanup_err,
                                     )
-                            # Restore files that were moved to temp
-                            restore_files_from_temp(moved_to_temp)
+                            # Nothing was deleted: drop the journal entries too
+                            db.session.rollback()
                             flash(
-                                f"Failed to create thumbnail for image "
-                                f"'{file.filename}'. Please try again or use "
-                                f"a different image format.",
+                                f"Image '{file.filename}' {rejection}",
                                 "danger",
                             )
                             return render_template(
@@ -573,23 +665,40 @@ def _edit_listing_impl(listing_id):  # noqa: C901
 
             commit_success = False
             try:
-                for unique_filename, thumbnail_filename in added_files:
+                new_images = []
+                for _, unique_filename, content_hash in added_uploads:
                     image = ListingImage(
                         filename=unique_filename,
+                        content_hash=content_hash,
                         listing_id=listing.id,
-                        thumbnail_filename=thumbnail_filename,
                     )
                     db.session.add(image)
+                    new_images.append(image)
+                queue_image_jobs(new_images)
+                # Originals are stored before their jobs are committed
+                store_uploads(
+                    (temp_path, unique_filename)
+                    for temp_path, unique_filename, _ in added_uploads
+                )
                 db.session.commit()
                 commit_success = True
             except Exception as e:
                 db.session.rollback()
-                # Restore files that were moved to temp (deleted images)
-                restore_files_from_temp(moved_to_temp)
+                discard_stored_uploads(
+                    [unique_filename for _, unique_filename, _ in added_uploads]
+                )
                 # Clean up temp files for newly added images
-                cleanup_temp_files(added_temp_paths)
+                for temp_path, _, _ in added_uploads:
+                    try:
+                        if os.path.exists(temp_path):
+                            os.remove(temp_path)
+                    except Exception as cleanup_err:
+                        current_app.logger.warning(
+                            "Temp remove failed (image during edit): %s",
+                            cleanup_err,
+                        )
                 flash(
-                    f"Database error. Changes not saved. Files restored. ({e})",
+                    f"Database error. Changes not saved. ({e})",
                     "danger",
                 )
                 return render_template(
@@ -603,38 +712,9 @@ def _edit_listing_impl(listing_id):  # noqa: C901
                 )
 
             if commit_success:
-                # Clean up temp files for deleted images
-                cleanup_temp_files(moved_to_temp)
-                # Move newly added images from temp to final location
-                for (
-                    temp_path,
-                    unique_filename,
-                    temp_thumb_path,
-                    thumbnail_filename,
-                ) in added_temp_paths:
-                    final_path = os.path.join(upload_dir, unique_filename)
-                    try:
-                        if os.path.exists(temp_path):
-                            shutil.move(temp_path, final_path)
-                    except Exception as e:
-                        flash(
-                            f"Warning: Could not finalize upload for "
-                            f"{unique_filename}: {e}",
-                            "warning",
-                        )
-                    if temp_thumb_path and thumbnail_filename:
-                        final_thumb_path = os.path.join(
-                            thumbnail_dir, thumbnail_filename
-                        )
-                        try:
-                            if os.path.exists(temp_thumb_path):
-                                shutil.move(temp_thumb_path, final_thumb_path)
-                        except Exception as e:
-                            flash(
-                                f"Warning: Could not finalize thumbnail for "
-                                f"{thumbnail_filename}: {e}",
-                                "warning",
-                            )
+                # Originals are in place: start generating thumbnails (and
+                # reaping the files of deleted images)
+                dispatch_jobs()
                 flash("Listing updated successfully!", "success")
                 if request.path.startswith("/admin") and current_user.is_admin:
                     return redirect(url_for("listings.admin_listings"))
@@ -17,7 +17,6 @@ This module contains all listing-related routes including:
 
 import os
 import random
-import shutil
 import uuid
 
 from flask import (
@@ -27,6 +26,7 @@ from flask import (
     redirect,
     render_template,
     request,
+    session,
     url_for,
 )
 from flask_login import current_user, login_required
@@ -34,39 +34,48 @@ from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 from werkzeug.utils import secure_filename
 
+from app.category_tree import get_category_tree
 from app.forms import ListingForm
+from app.jobs import dispatch_jobs
 from app.models import Category, CategoryView, Listing, ListingImage, db
+from app.search import search_listings
 
 from ..decorators import admin_required
-from ..utils import create_thumbnail
+from ..pagination import paginate_listings
+from ..utils import (
+    UploadRejected,
+    discard_stored_uploads,
+    queue_image_jobs,
+    save_image_upload,
+    store_uploads,
+)
 from . import listings_bp
 from .helpers import (
+    LISTING_IMAGES_LOADER,
     _delete_listing_impl,
     _delete_listings_impl,
     _edit_listing_impl,
     build_category_showcases,
-    get_index_showcase_categories,
+    get_category_listing_total,
+    get_index_showcases,
+    get_listing_total,
+    get_listing_validators,
 )
 
 
 @listings_bp.route("/")
 def index():
-    # Get selected categories for showcases
-    showcase_categories = get_index_showcase_categories()
-
-    # Check if any categories exist (controls "+ Post New Listing" button visibility)
-    any_categories_exist = len(showcase_categories) > 0
-
-    # Build showcase data using batch query helper
+    # Build showcase data from the cached showcase bundle
     listings_per_showcase = current_app.config.get("INDEX_SHOWCASE_LISTINGS_PER_CATEGORY", 10)
     # The UI shows up to 5 cards per row on ultrawide; fetch only what's useful
     display_slots = min(listings_per_showcase, 5)
     # Fetch a bit extra for variety without over-querying
     fetch_limit = max(display_slots * 2, listings_per_showcase)
 
-    category_showcases = build_category_showcases(
-        showcase_categories, display_slots, fetch_limit
-    )
+    category_showcases = get_index_showcases(display_slots, fetch_limit)
+
+    # Check if any categories exist (controls "+ Post New Listing" button visibility)
+    any_categories_exist = len(category_showcases) > 0
 
     return render_template(
         "index.html",
@@ -78,67 +87,93 @@ def index():
 
 @listings_bp.route("/category/<int:category_id>")
 def category_listings(category_id):
-    page = request.args.get("page", 1, type=int)
     per_page = 24
 
-    category = db.get_or_404(Category, category_id)
+    # Resolve from the in-process category tree snapshot (no category queries)
+    category_tree = get_category_tree()
+    category = category_tree.get(category_id)
+    if category is None:
+        abort(404)
     descendant_ids = category.get_descendant_ids()
-    listings_query = select(Listing).where(Listing.category_id.in_(descendant_ids))  # type: ignore
-    pagination = db.paginate(  # type: ignore
-        listings_query.order_by(Listing.created_at.desc()),
-        page=page,
-        per_page=per_page,
-        error_out=False,
+    # Cards show each listing's first image: load images and derivatives up front
+    listings_query = (
+        select(Listing)
+        .where(Listing.category_id.in_(descendant_ids))  # type: ignore
+        .options(LISTING_IMAGES_LOADER)
+    )
+    # Offset pages by default, (created_at, id) cursors when opted in; the
+    # total comes from the category counters instead of COUNT(*)
+    pagination = paginate_listings(
+        listings_query,
+        per_page,
+        total=get_category_listing_total(category.id),
     )
     listings = pagination.items
 
     category_path = category.get_full_path()
 
-    # --- Sidebar context additions ---
-    # 1. Get all root categories with their children (for sidebar)
-    categories = (
-        db.session.execute(
-            select(Category).where(Category.parent_id.is_(None)).order_by(Category.name)  # type: ignore
-        )
-        .scalars()
-        .all()
-    )
-    # 2. Compute ancestor IDs for expansion using breadcrumb property
-    ancestor_ids = [cat.id for cat in category.breadcrumb[:-1]]
-    expanded_ids = ancestor_ids  # List of IDs to auto-expand
-
     return render_template(
         "index.html",
         listings=listings,
         pagination=pagination,
+        pagination_args={"category_id": category_id},
         selected_category=category,
         category_path=category_path,
-        categories=categories,  # <-- for sidebar macro
         active_category_id=category_id,
-        expanded_ids=expanded_ids,
         page_title=category_path,
     )
 
 
+@listings_bp.route("/search")
+def search():
+    """Full-text search over listing titles and descriptions, best match first."""
+    query_text = request.args.get("q", "").strip()
+    page = request.args.get("page", 1, type=int)
+    per_page = 24
+
+    # Optional category filter: the category and its whole subtree
+    category_tree = get_category_tree()
+    category = category_tree.get(request.args.get("category", type=int))
+
+    pagination = None
+    statement = None
+    if query_text:
+        statement = search_listings(
+            db.session,
+            query_text,
+            category_ids=category.descendant_ids if category else None,
+        )
+    if statement is not None:
+        pagination = db.paginate(  # type: ignore
+            statement.options(LISTING_IMAGES_LOADER),
+            page=page,
+            per_page=per_page,
+            error_out=False,
+        )
+
+    return render_template(
+        "listings/search.html",
+        query=query_text,
+        listings=pagination.items if pagination else [],
+        pagination=pagination,
+        pagination_args={
+            "q": query_text,
+            "category": category.id if category else None,
+        },
+        selected_category=category,
+        all_categories=category_tree.all_by_name(),
+        page_title=f"Search: {query_text}" if query_text else "Search",
+    )
+
+
 @listings_bp.route("/<path:category_path>")
 def category_filtered_listings(category_path):
-    category = Category.from_path(category_path)
+    # Resolve from the in-process category tree snapshot (no category queries)
+    category_tree = get_category_tree()
+    category = category_tree.resolve_path(category_path)
     if not category:
         abort(404)
 
-    # --- Sidebar context additions ---
-    # 1. Get all root categories with their children (for sidebar)
-    categories = (
-        db.session.execute(
-            select(Category).where(Category.parent_id.is_(None)).order_by(Category.name)  # type: ignore
-        )
-        .scalars()
-        .all()
-    )
-    # 2. Compute ancestor IDs for expansion using breadcrumb property
-    ancestor_ids = [cat.id for cat in category.breadcrumb[:-1]]
-    expanded_ids = ancestor_ids  # List of IDs to auto-expand
-
     # Check if user explicitly requested listings view (grid instead of showcases)
     view_mode = request.args.get("view", "auto")
     force_listings_view = view_mode == "listings"
@@ -153,9 +188,8 @@ def category_filtered_listings(category_path):
         fetch_limit = max(display_slots * 2, listings_per_showcase)
 
         # Build showcases for each child category using batch query helper
-        sorted_children = sorted(
-            category.children, key=lambda c: c.name  # type: ignore[arg-type]
-        )
+        # (snapshot children are already ordered by name)
+        sorted_children = list(category.children)
         child_showcases = build_category_showcases(
             sorted_children, display_slots, fetch_limit
         )
@@ -166,6 +200,7 @@ def category_filtered_listings(category_path):
             db.session.execute(
                 select(Listing)
                 .where(Listing.category_id == category.id)  # type: ignore
+                .options(LISTING_IMAGES_LOADER)
                 .order_by(Listing.created_at.desc())
                 .limit(fetch_limit)
             )
@@ -191,25 +226,26 @@ def category_filtered_listings(category_path):
             category_showcases=child_showcases,
             selected_category=category,
             category_path=category.get_full_path(),
-            categories=categories,
             active_category_id=category.id,
-            expanded_ids=expanded_ids,
             any_categories_exist=True,
             page_title=category.name,
         )
     else:
         # Leaf category or forced listings view:
         # show grid of all listings with pagination
-        page = request.args.get("page", 1, type=int)
         per_page = 24
 
         descendant_ids = category.get_descendant_ids()
-        listings_query = select(Listing).where(Listing.category_id.in_(descendant_ids))  # type: ignore
-        pagination = db.paginate(  # type: ignore
-            listings_query.order_by(Listing.created_at.desc()),
-            page=page,
-            per_page=per_page,
-            error_out=False,
+        # Cards show each listing's first image: load images and derivatives up front
+        listings_query = (
+            select(Listing)
+            .where(Listing.category_id.in_(descendant_ids))  # type: ignore
+            .options(LISTING_IMAGES_LOADER)
+        )
+        pagination = paginate_listings(
+            listings_query,
+            per_page,
+            total=get_category_listing_total(category.id),
         )
         listings = pagination.items
 
@@ -217,28 +253,62 @@ def category_filtered_listings(category_path):
             "index.html",
             listings=listings,
             pagination=pagination,
+            pagination_args={
+                "category_path": category_path,
+                "view": "listings" if force_listings_view else None,
+            },
             selected_category=category,
             category_path=category.get_full_path(),
-            categories=categories,
             active_category_id=category.id,
-            expanded_ids=expanded_ids,
             page_title=category.name,
         )
 
 
 @listings_bp.route("/listing/<int:listing_id>")
 def listing_detail(listing_id):
-    listing = db.get_or_404(Listing, listing_id)
-    category = listing.category
+    # Revalidations are answered from listing.updated_at alone, before the
+    # listing, its images or its category are loaded. Pages showing flash
+    # messages are one-off: they get no validators.
+    validators = None
+    if "_flashes" not in session:
+        validators = get_listing_validators(listing_id)
+        if validators is None:
+            abort(404)
+        not_modified = current_app.response_class()
+        _set_listing_validators(not_modified, validators)
+        not_modified = not_modified.make_conditional(request)
+        if not_modified.status_code == 304:
+            return not_modified
+
+    listing = db.get_or_404(Listing, listing_id, options=[LISTING_IMAGES_LOADER])
+    # Breadcrumb and path come from the category tree snapshot
+    # instead of lazy-loading the category and its parents
+    category = get_category_tree().get(listing.category_id)
     category_path = category.get_full_path() if category else None
 
-    return render_template(
-        "listings/listing_detail.html",
-        listing=listing,
-        category=category,
-        category_path=category_path,
-        page_title=listing.title,
+    response = current_app.make_response(
+        render_template(
+            "listings/listing_detail.html",
+            listing=listing,
+            category=category,
+            category_path=category_path,
+            page_title=listing.title,
+        )
     )
+    if validators is not None:
+        _set_listing_validators(response, validators)
+    return response
+
+
+def _set_listing_validators(response, validators):
+    etag, last_modified = validators
+    # Weak: the same version renders equivalent, not byte-identical, pages
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    response.vary.add("Cookie")
+    response.cache_control.no_cache = True
+    if current_user.is_authenticated:
+        response.cache_control.private = True
 
 
 @listings_bp.route("/new", methods=["GET", "POST"])
@@ -344,55 +414,42 @@ def create_listing():  # noqa: C901
                 category_id=category_id,
             )
 
-            added_temp_paths = []
-            added_files = []
+            # (temp_path, stored name, content hash) of each validated upload
+            added_uploads = []
 
             # Store uploaded images in TEMP_DIR first
             if form.images.data:
                 for file in form.images.data:
                     if file and file.filename:
                         ext = os.path.splitext(secure_filename(file.filename))[1]
-                        unique_filename = f"{uuid.uuid4().hex}{ext}"
-                        thumbnail_filename = f"{uuid.uuid4().hex}.jpg"
-                        temp_path = os.path.join(temp_dir, unique_filename)
-                        temp_thumb_path = os.path.join(temp_dir, thumbnail_filename)
-                        file.save(temp_path)
-                        # Create thumbnail
-                        if create_thumbnail(temp_path, temp_thumb_path):
-                            added_temp_paths.append(
-                                (
-                                    temp_path,
-                                    unique_filename,
-                                    temp_thumb_path,
-                                    thumbnail_filename,
-                                )
+                        # Stored under its content hash once validated;
+                        # thumbnails are generated by a background job after commit
+                        temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}{ext}")
+                        try:
+                            unique_filename, content_hash = save_image_upload(
+                                file, temp_path
+                            )
+                            rejection = None
+                        except UploadRejected as e:
+                            rejection = str(e)
+                        if rejection is None:
+                            added_uploads.append(
+                                (temp_path, unique_filename, content_hash)
                             )
-                            added_files.append((unique_filename, thumbnail_filename))
                         else:
                             try:
                                 if os.path.exists(temp_path):
                                     os.remove(temp_path)
-                                if os.path.exists(temp_thumb_path):
-                                    os.remove(temp_thumb_path)
                             except Exception as cleanup_err:
                                 # Best-effort temp cleanup;
                                 # failure is non-fatal but logged
                                 current_app.logger.warning(
                                     "Temp remove failed (image): %s", cleanup_err
                                 )
-                            for (
-                                prev_temp_path,
-                                _,
-                                prev_temp_thumb_path,
-                                _,
-                            ) in added_temp_paths:
+                            for prev_temp_path, _, _ in added_uploads:
                                 try:
                                     if os.path.exists(prev_temp_path):
                                         os.remove(prev_temp_path)
-                                    if prev_temp_thumb_path and os.path.exists(
-                                        prev_temp_thumb_path
-                                    ):
-                                        os.remove(prev_temp_thumb_path)
                                 except Exception as cleanup_err:
                                     # Best-effort temp cleanup;
                                     # failure is non-fatal but logged
@@ -401,9 +458,7 @@ def create_listing():  # noqa: C901
                                         cleanup_err,
                                     )
                             flash(
-                                f"Failed to create thumbnail for image "
-                                f"'{file.filename}'. Please try again or use "
-                                "a different image format.",
+                                f"Image '{file.filename}' {rejection}",
                                 "danger",
                             )
                             return render_template(
@@ -417,23 +472,32 @@ def create_listing():  # noqa: C901
             try:
                 db.session.add(listing)
                 db.session.flush()  # Assigns an id to listing
-                for unique_filename, thumbnail_filename in added_files:
+                new_images = []
+                for _, unique_filename, content_hash in added_uploads:
                     image = ListingImage(
                         filename=unique_filename,
-                        thumbnail_filename=thumbnail_filename,
+                        content_hash=content_hash,
                         listing_id=listing.id,
                     )
                     db.session.add(image)
+                    new_images.append(image)
+                queue_image_jobs(new_images)
+                # Originals are stored before their jobs are committed
+                store_uploads(
+                    (temp_path, unique_filename)
+                    for temp_path, unique_filename, _ in added_uploads
+                )
                 db.session.commit()
                 commit_success = True
             except Exception as e:
                 db.session.rollback()
-                for temp_path, _, temp_thumb_path, _ in added_temp_paths:
+                discard_stored_uploads(
+                    [unique_filename for _, unique_filename, _ in added_uploads]
+                )
+                for temp_path, _, _ in added_uploads:
                     try:
                         if os.path.exists(temp_path):
                             os.remove(temp_path)
-                        if temp_thumb_path and os.path.exists(temp_thumb_path):
-                            os.remove(temp_thumb_path)
                     except Exception as cleanup_err:
                         # Best-effort temp cleanup after rollback;
                         # failure is non-fatal but logged
@@ -453,37 +517,8 @@ def create_listing():  # noqa: C901
                 )
 
             if commit_success:
-                upload_dir = current_app.config["UPLOAD_DIR"]
-                thumbnail_dir = current_app.config["THUMBNAIL_DIR"]
-                for (
-                    temp_path,
-                    unique_filename,
-                    temp_thumb_path,
-                    thumbnail_filename,
-                ) in added_temp_paths:
-                    final_path = os.path.join(upload_dir, unique_filename)
-                    try:
-                        if os.path.exists(temp_path):
-                            shutil.move(temp_path, final_path)
-                    except Exception as e:
-                        flash(
-                            f"Warning: Could not finalize upload for "
-                            f"{unique_filename}: {e}",
-                            "warning",
-                        )
-                    if temp_thumb_path and thumbnail_filename:
-                        final_thumb_path = os.path.join(
-                            thumbnail_dir, thumbnail_filename
-                        )
-                        try:
-                            if os.path.exists(temp_thumb_path):
-                                shutil.move(temp_thumb_path, final_thumb_path)
-                        except Exception as e:
-                            flash(
-                                f"Warning: Could not finalize thumbnail for "
-                                f"{thumbnail_filename}: {e}",
-                                "warning",
-                            )
+                # Originals are in place: start generating thumbnails
+                dispatch_jobs()
                 flash("Listing created successfully!", "success")
                 return redirect(
                     url_for("listings.listing_detail", listing_id=listing.id)
@@ -535,14 +570,28 @@ def admin_listings():
     sort_column = sort_column_map.get(sort, Listing.created_at)
     sort_order = sort_column.asc() if direction == "asc" else sort_column.desc()
 
-    pagination = db.paginate(  # type: ignore
-        select(Listing).order_by(sort_order), page=page, per_page=20
-    )
+    # The table shows each row's owner e-mail: join it instead of lazy-loading
+    # per row (category names come from the category tree snapshot)
+    listings_query = select(Listing).options(joinedload(Listing.owner))
+    if sort == "created_at" and direction == "desc":
+        # Newest-first is the default table order; it can use cursor pagination
+        pagination = paginate_listings(
+            listings_query, per_page=20, total=get_listing_total()
+        )
+    else:
+        pagination = db.paginate(  # type: ignore
+            listings_query.order_by(sort_order, Listing.id),
+            page=page,
+            per_page=20,
+            count=False,
+        )
+        pagination.total = get_listing_total()
     listings = pagination.items
 
     return render_template(
         "admin/admin_listings.html",
         listings=listings,
+        category_tree=get_category_tree(),
         pagination=pagination,
         sort=sort,
         direction=direction,
@@ -567,19 +616,10 @@ def delete_selected_listings():
         flash("No listings selected for deletion.", "warning")
         return redirect(url_for("listings.admin_listings"))
 
-    listings = (
-        db.session.execute(
-            select(Listing)
-            .options(joinedload(Listing.images))  # type: ignore
-            .where(Listing.id.in_(selected_ids))  # type: ignore
-        )
-        .scalars()
-        .unique()
-        .all()
+    success, error_message, count = _delete_listings_impl(
+        select(Listing.id).where(Listing.id.in_(selected_ids))  # type: ignore
     )
 
-    success, error_message, count = _delete_listings_impl(listings)
-
     if success:
         flash(f"Deleted {count} listing(s).", "success")
     else:
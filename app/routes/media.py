@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Media route for the classifieds Flask app.
+
+Serves listing images (originals, thumbnails, derivatives) of the local storage
+backend at /media/<area>/<name>. Depending on MEDIA_SEND_MODE the worker either
+streams the file itself ("flask") or only answers with a header telling the
+fronting server which file to send ("x-accel-redirect" for nginx, "x-sendfile"
+for Apache/lighttpd), so no Python worker is tied up streaming bytes.
+
+Content-named files (see storage.is_content_named) never change: they are
+served with a strong ETag and an immutable one-year Cache-Control, and
+revalidations are answered with 304 before any file is touched.
+"""
+
+import mimetypes
+import os
+
+from flask import Blueprint, abort, current_app, request, send_from_directory
+from werkzeug.utils import secure_filename
+
+from ..assets import make_immutable
+from ..storage import AREA_DIRS, LocalStorage, get_storage, is_content_named
+
+MEDIA_SEND_MODES = ("flask", "x-accel-redirect", "x-sendfile")
+
+media_bp = Blueprint("media", __name__)
+
+
+@media_bp.record_once
+def _check_send_mode(state):
+    mode = state.app.config.get("MEDIA_SEND_MODE", "flask")
+    if mode not in MEDIA_SEND_MODES:
+        raise ValueError(
+            f"Unknown MEDIA_SEND_MODE '{mode}' (use one of {', '.join(MEDIA_SEND_MODES)})"
+        )
+
+
+@media_bp.route("/media/<area>/<name>")
+def serve_media(area, name):
+    """Serve (or hand off to the fronting server) one stored image file."""
+    storage = get_storage()
+    # Plain filenames of a known area only; other backends serve their own URLs
+    if (
+        area not in AREA_DIRS
+        or secure_filename(name) != name
+        or not isinstance(storage, LocalStorage)
+    ):
+        abort(404)
+
+    directory = current_app.config[AREA_DIRS[area]]
+    immutable = is_content_named(name)
+    # The content hash in the name identifies the bytes: a strong validator
+    etag = os.path.splitext(name)[0] if immutable else True
+    mode = current_app.config["MEDIA_SEND_MODE"]
+
+    if mode == "flask":
+        response = send_from_directory(
+            directory,
+            name,
+            etag=etag,
+            max_age=current_app.config["MEDIA_CACHE_MAX_AGE"],
+        )
+    else:
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(name)[0] or "application/octet-stream"
+        )
+        if mode == "x-accel-redirect":
+            prefix = current_app.config["MEDIA_ACCEL_REDIRECT_PREFIX"].rstrip("/")
+            response.headers["X-Accel-Redirect"] = f"{prefix}/{area}/{name}"
+        else:
+            response.headers["X-Sendfile"] = os.path.join(directory, name)
+        if immutable:
+            response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config["MEDIA_CACHE_MAX_AGE"]
+        response = response.make_conditional(request)
+        if response.status_code == 304:
+            # Nothing to send: the fronting server must not send the file
+            response.headers.pop("X-Accel-Redirect", None)
+            response.headers.pop("X-Sendfile", None)
+
+    if immutable:
+        make_immutable(response)
+    return response
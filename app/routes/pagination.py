@@ -0,0 +1,193 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Pagination helpers for listing grids and admin listing tables.
+
+Two modes are supported:
+- offset: Flask-SQLAlchemy db.paginate() with page numbers. When the caller
+  already knows the total (e.g. from the denormalized category counters),
+  the COUNT(*) query is skipped.
+- keyset: cursor pagination on (created_at, id), newest first. Each page is a
+  range seek on the (category_id, created_at) / (user_id, created_at) indexes,
+  so deep pages cost the same as the first one.
+
+Keyset mode is opt-in: set LISTING_PAGINATION_MODE = "keyset" in the config,
+or pass an `after`/`before` cursor in the query string.
+"""
+
+import base64
+import binascii
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+from ..models import Listing, db
+
+
+def encode_cursor(created_at: datetime, listing_id: int) -> str:
+    """Encode a (created_at, id) position as an opaque URL-safe token."""
+    raw = f"{created_at.isoformat()}|{listing_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[tuple[datetime, int]]:
+    """
+    Decode a cursor token. Returns None for missing or malformed tokens,
+    which callers treat as "start from the first page".
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, listing_id = (
+            base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        )
+        return datetime.fromisoformat(created_at), int(listing_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def older_than(created_at: datetime, listing_id: int):
+    """WHERE clause for listings after a (created_at, id) cursor, newest first."""
+    return or_(
+        Listing.created_at < created_at,
+        and_(Listing.created_at == created_at, Listing.id < listing_id),
+    )
+
+
+@dataclass
+class KeysetPagination:
+    """
+    One page of keyset-paginated results.
+
+    Mirrors the attributes templates use on Flask-SQLAlchemy's Pagination
+    (items, per_page, total, pages, has_prev, has_next) and adds the cursors
+    for the neighbouring pages.
+    """
+
+    items: list
+    per_page: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    mode: str = field(default="keyset", init=False)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+    @property
+    def pages(self) -> int:
+        if not self.total:
+            return 1 if self.items else 0
+        return math.ceil(self.total / self.per_page)
+
+
+def keyset_paginate(
+    query,
+    per_page: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    total: Optional[int] = None,
+) -> KeysetPagination:
+    """
+    Return one newest-first page of a Listing query using (created_at, id) cursors.
+
+    Args:
+        query: select(Listing) with filters applied and no ORDER BY/LIMIT
+        per_page: page size
+        after: cursor of the last row of the previous page (go forward)
+        before: cursor of the first row of the next page (go back)
+        total: known or approximate total, only used for display
+    """
+    before_key = decode_cursor(before)
+    after_key = None if before_key else decode_cursor(after)
+
+    if before_key:
+        # Walk backwards (oldest first) from the cursor, then flip the page
+        created_at, listing_id = before_key
+        query = query.where(
+            or_(
+                Listing.created_at > created_at,
+                and_(Listing.created_at == created_at, Listing.id > listing_id),
+            )
+        ).order_by(Listing.created_at.asc(), Listing.id.asc())
+    else:
+        if after_key:
+            query = query.where(older_than(*after_key))
+        query = query.order_by(Listing.created_at.desc(), Listing.id.desc())
+
+    # One extra row tells us whether there is a further page in this direction
+    rows = list(db.session.execute(query.limit(per_page + 1)).scalars())
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before_key:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or before_key:
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        if (has_more and before_key) or after_key:
+            prev_cursor = encode_cursor(rows[0].created_at, rows[0].id)
+
+    return KeysetPagination(
+        items=rows,
+        per_page=per_page,
+        total=total,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
+
+
+def use_keyset_pagination() -> bool:
+    """Return True when the current request should use cursor pagination."""
+    if "after" in request.args or "before" in request.args:
+        return True
+    return current_app.config.get("LISTING_PAGINATION_MODE", "offset") == "keyset"
+
+
+def paginate_listings(query, per_page: int, total: Optional[int] = None) -> Any:
+    """
+    Paginate a newest-first Listing query in the mode chosen for this request.
+
+    Args:
+        query: select(Listing) with filters applied and no ORDER BY
+        per_page: page size
+        total: known total (skips COUNT(*) in offset mode); optional
+
+    Returns:
+        KeysetPagination in keyset mode, Flask-SQLAlchemy Pagination otherwise.
+    """
+    if use_keyset_pagination():
+        return keyset_paginate(
+            query,
+            per_page,
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            total=total,
+        )
+
+    page = request.args.get("page", 1, type=int)
+    pagination = db.paginate(  # type: ignore
+        query.order_by(Listing.created_at.desc(), Listing.id.desc()),
+        page=page,
+        per_page=per_page,
+        error_out=False,
+        count=total is None,
+    )
+    if total is not None:
+        pagination.total = total
+    return pagination
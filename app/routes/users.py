@@ -17,7 +17,10 @@ Self-service routes at /profile use @login_required only.
 
 from flask import (
     Blueprint,
+    abort,
+    current_app,
     flash,
+    jsonify,
     redirect,
     render_template,
     request,
@@ -25,15 +28,18 @@ from flask import (
 )
 from flask_login import current_user, login_required
 from sqlalchemy import func, select
-from sqlalchemy.orm import joinedload
 
 from ..forms import UserEditForm
-from ..models import Listing, User, db
+from ..jobs import dispatch_jobs, enqueue_job, job_handler, report_progress
+from ..models import Job, Listing, User, db
 from .decorators import admin_required
-from .listings.helpers import _delete_listings_impl
+from .listings.helpers import delete_listings_in_bulk
 
 users_bp = Blueprint("users", __name__)
 
+# Job kind that deletes a user and their listings in the background
+DELETE_USER_JOB = "delete_user"
+
 
 # --------------------- USER ROUTES --------------------------
 
@@ -145,6 +151,7 @@ def admin_list():
     return render_template(
         "admin/admin_users.html",
         users=users,
+        deletions=get_user_deletions(user.id for user in users),
         pagination=pagination,
         sort=sort,
         direction=direction,
@@ -201,7 +208,10 @@ def admin_edit(user_id):
 def admin_delete(user_id):
     """
     Allows admins to delete a user, except for the last admin user.
-    Also deletes all listings owned by the user and their associated image files.
+
+    The user, all their listings and the listings' image files are deleted by
+    a background job (see delete_user_job), so the request returns at once;
+    the users page shows the job's progress.
     """
     user = db.get_or_404(User, user_id)
 
@@ -212,41 +222,109 @@ def admin_delete(user_id):
         flash("Must have at least one admin user in the system.", "danger")
         return redirect(url_for("users.admin_list"))
 
-    # Get all listings owned by the user with their images loaded
-    listings = (
-        db.session.execute(
-            select(Listing)
-            .where(Listing.user_id == user_id)
-            .options(joinedload(Listing.images))  # type: ignore
-        )
-        .scalars()
-        .unique()
-        .all()
-    )
-
-    # Delete listings using the shared helper function
-    success, error_message, listing_count = _delete_listings_impl(listings)
-
-    if not success:
-        flash(f"Error deleting user's listings: {error_message}", "danger")
+    deletion = get_user_deletions([user.id]).get(user.id)
+    if deletion is not None and deletion.status != Job.STATUS_FAILED:
+        flash(f"User is already being deleted (job #{deletion.id}).", "info")
         return redirect(url_for("users.admin_list"))
 
-    # Delete user from database
     try:
-        db.session.delete(user)
+        job = enqueue_job(DELETE_USER_JOB, {"user_id": user.id}, subject_id=user.id)
         db.session.commit()
     except Exception as e:
         db.session.rollback()
-        flash(f"Database error. User was not deleted. ({e})", "danger")
+        flash(f"Database error. User deletion was not queued. ({e})", "danger")
         return redirect(url_for("users.admin_list"))
 
-    # Provide appropriate feedback
-    if listing_count > 0:
-        flash(
-            f"User deleted. Also deleted {listing_count} listing(s) "
-            "owned by this user.",
-            "success",
-        )
-    else:
-        flash("User deleted.", "success")
+    dispatch_jobs()
+    flash(
+        f"Deleting user {user.email} and their listings in the background "
+        f"(job #{job.id}).",
+        "success",
+    )
     return redirect(url_for("users.admin_list"))
+
+
+@users_bp.route("/admin/users/delete/status/<int:job_id>")
+@admin_required
+def admin_delete_status(job_id):
+    """Returns the state and progress of a user deletion job as JSON."""
+    job = db.get_or_404(Job, job_id)
+    if job.kind != DELETE_USER_JOB:
+        abort(404)
+    return jsonify(
+        {
+            "id": job.id,
+            "user_id": job.subject_id,
+            "status": job.status,
+            "progress": job.progress,
+            "progress_total": job.progress_total,
+            "error": job.last_error,
+        }
+    )
+
+
+def get_user_deletions(user_ids):
+    """
+    Latest pending, running or failed deletion job of each given user.
+
+    Returns:
+        dict: user id -> Job
+    """
+    ids = list(user_ids)
+    if not ids:
+        return {}
+    jobs = db.session.execute(
+        select(Job)
+        .where(
+            Job.kind == DELETE_USER_JOB,
+            Job.subject_id.in_(ids),  # type: ignore
+            Job.status.in_(  # type: ignore
+                [Job.STATUS_PENDING, Job.STATUS_RUNNING, Job.STATUS_FAILED]
+            ),
+        )
+        .order_by(Job.id)
+    ).scalars()
+    return {job.subject_id: job for job in jobs}
+
+
+@job_handler(DELETE_USER_JOB)
+def delete_user_job(payload):
+    """
+    Job handler: delete a user and all their listings.
+
+    Listings are deleted in chunks of USER_DELETE_CHUNK_SIZE with set-based
+    statements (see delete_listings_in_bulk), each chunk committed with the
+    job's progress. A retried job continues with the listings that are left.
+    """
+    user_id = payload["user_id"]
+    chunk_size = current_app.config["USER_DELETE_CHUNK_SIZE"]
+    remaining = db.session.execute(
+        select(func.count(Listing.id)).where(Listing.user_id == user_id)  # type: ignore
+    ).scalar_one()
+    deleted = 0
+    report_progress(deleted, remaining)
+    db.session.commit()
+
+    while True:
+        chunk = (
+            db.session.execute(
+                select(Listing.id)
+                .where(Listing.user_id == user_id)  # type: ignore
+                .order_by(Listing.id)
+                .limit(chunk_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not chunk:
+            break
+        deleted += delete_listings_in_bulk(
+            select(Listing.id).where(Listing.id.in_(chunk))  # type: ignore
+        )
+        report_progress(deleted, remaining)
+        db.session.commit()
+
+    user = db.session.get(User, user_id, populate_existing=True)
+    if user is not None:
+        db.session.delete(user)
+        db.session.commit()
@@ -11,29 +11,79 @@ at the request of Fernando "ferabreu" Mees Abreu (https://github.com/ferabreu).
 Shared route utilities for the classifieds Flask app.
 
 This module contains shared utility functions for use by multiple route Blueprints.
-Utilities include image/thumbnail processing and ACID file operations for atomic
-database/filesystem commits.
+Utilities include image/thumbnail processing (including the background thumbnail
+and responsive derivative job handlers), ACID file operations for atomic
+database/filesystem commits, and the deletion journal emptied by a background
+reaper job after bulk deletes.
 """
 
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
 from flask import Blueprint, current_app
-from PIL import Image
+from PIL import Image, ImageOps, features
+from sqlalchemy import DateTime, delete, exists, insert, literal, or_, select
+from sqlalchemy.orm import aliased
+
+from ..jobs import dispatch_jobs, enqueue_job, job_handler
+from ..models import (
+    MEDIA_GENERATION,
+    FileDeletion,
+    Job,
+    ListingImage,
+    ListingImageDerivative,
+    bump_cache_generation,
+    db,
+)
+from ..storage import get_storage, is_content_named
 
 utils_bp = Blueprint("utils", __name__)
 
-
-def create_thumbnail(image_path, thumbnail_path):
+# Job kinds for processing a ListingImage in the background
+THUMBNAIL_JOB = "thumbnail"
+DERIVATIVES_JOB = "image_derivatives"
+# Job kind that deletes the files recorded in the deletion journal
+REAP_FILES_JOB = "reap_files"
+
+# Leading bytes of the accepted upload formats (see ALLOWED_EXTENSIONS)
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "JPEG",
+    b"\x89PNG\r\n\x1a\n": "PNG",
+    b"GIF87a": "GIF",
+    b"GIF89a": "GIF",
+}
+UPLOAD_SNIFF_SIZE = 16
+# Extension of stored originals, by detected format (not the uploaded name)
+STORED_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif"}
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Pillow save() format name and file extension for each derivative format
+DERIVATIVE_FORMATS = {
+    "avif": ("AVIF", "avif"),
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+
+def create_thumbnail(image_path, thumbnail_path, size=None):
     """
     Create a thumbnail from an image file.
 
     Args:
         image_path (str): Path to the original image
         thumbnail_path (str): Path where the thumbnail will be saved
-        size (tuple): Thumbnail size (width, height)
+        size (tuple): Thumbnail size (width, height); defaults to the
+            THUMBNAIL_SIZE config (pass it explicitly outside an app context)
 
     Returns:
         bool: True if thumbnail was created successfully, False otherwise
     """
-    size = current_app.config["THUMBNAIL_SIZE"]
+    if size is None:
+        size = current_app.config["THUMBNAIL_SIZE"]
 
     try:
         with Image.open(image_path) as img:
@@ -64,126 +114,588 @@ def create_thumbnail(image_path, thumbnail_path):
         return False
 
 
-def move_image_files_to_temp(images, upload_dir, thumbnail_dir, temp_dir):
+class UploadRejected(ValueError):
+    """
+    An uploaded image failed validation. The message completes the sentence
+    "Image '<filename>' ..." shown to the user.
+    """
+
+
+def _format_megabytes(size):
+    return f"{size / (1024 * 1024):g} MB"
+
+
+def save_image_upload(file, path):
     """
-    Move image files and their thumbnails to temp directory.
+    Stream an uploaded image to `path`, rejecting bad uploads as cheaply as
+    possible. Thumbnails and derivatives (full decodes) happen later, in
+    background jobs, and only for uploads that pass these checks:
 
-    This implements the first step of the temp→commit→cleanup pattern for
-    atomic file operations. Files are moved (not copied) to enable rollback
-    if database commit fails.
+    1. The leading bytes must match an accepted format; nothing is written
+       otherwise.
+    2. The file is copied in chunks and abandoned as soon as it exceeds
+       UPLOAD_MAX_FILE_SIZE. (MAX_CONTENT_LENGTH caps the whole request.)
+    3. Pillow parses only the header: the format must match the signature
+       and width x height must fit IMAGE_MAX_PIXELS (decompression bombs).
+    4. verify() checks the file structure without decoding pixels.
+
+    The content hash is computed while copying; the returned filename is the
+    one the original must be stored under in UPLOAD_DIR (see store_uploads).
 
     Args:
-        images: List of ListingImage objects to move
-        upload_dir: Source directory for image files
-        thumbnail_dir: Source directory for thumbnail files
-        temp_dir: Destination temp directory
+        file: werkzeug FileStorage from the form
+        path (str): Destination path (in TEMP_DIR)
 
     Returns:
-        tuple: (file_moves, success, error_message)
-            - file_moves: List of tuples (orig_path, temp_path, orig_thumb, temp_thumb)
-            - success: Boolean indicating if all moves succeeded
-            - error_message: String with error details if success=False, None otherwise
-    """
-    import os
-    import shutil
+        tuple: (stored filename, content hash)
 
-    file_moves = []
+    Raises:
+        UploadRejected: with a user-facing reason; no file is left at `path`
+    """
+    expected_format, head = _sniff_image_format(file)
+    try:
+        content_hash = _copy_upload(file, head, path)
+        _validate_image_header(path, expected_format, file.filename)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return f"{content_hash}.{STORED_EXTENSIONS[expected_format]}", content_hash
+
+
+def _sniff_image_format(file):
+    """Return (Pillow format, leading bytes) from the upload's magic bytes."""
+    head = file.stream.read(UPLOAD_SNIFF_SIZE)
+    expected_format = next(
+        (fmt for magic, fmt in IMAGE_SIGNATURES.items() if head.startswith(magic)),
+        None,
+    )
+    if expected_format is None:
+        raise UploadRejected("could not be read as a JPEG, PNG or GIF image.")
+    return expected_format, head
+
+
+def _copy_upload(file, head, path):
+    """
+    Copy the upload to `path` in chunks, hashing it on the way; give up as
+    soon as it exceeds UPLOAD_MAX_FILE_SIZE. Returns the content hash.
+    """
+    max_size = current_app.config["UPLOAD_MAX_FILE_SIZE"]
+    size = len(head)
+    digest = new_content_hasher()
+    digest.update(head)
+    with open(path, "wb") as out:
+        out.write(head)
+        while size <= max_size:
+            chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+            out.write(chunk)
+    if size > max_size:
+        raise UploadRejected(f"is larger than {_format_megabytes(max_size)}.")
+    return digest.hexdigest()
+
+
+def _validate_image_header(path, expected_format, filename):
+    """
+    Parse only the image header: the format must match the signature and
+    width x height must fit IMAGE_MAX_PIXELS; verify() then checks the
+    structure without decoding pixels.
+    """
+    max_pixels = current_app.config["IMAGE_MAX_PIXELS"]
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            if img.format != expected_format:
+                raise UploadRejected(
+                    "could not be read. Please use a different image format."
+                )
+            if width * height > max_pixels:
+                raise UploadRejected(
+                    f"is too large ({width}x{height} pixels). Please use an "
+                    f"image of at most {max_pixels / 1_000_000:g} megapixels."
+                )
+            img.verify()
+    except Image.DecompressionBombError:
+        raise UploadRejected(
+            f"is too large. Please use an image of at most "
+            f"{max_pixels / 1_000_000:g} megapixels."
+        )
+    except UploadRejected:
+        raise
+    except Exception as e:
+        current_app.logger.info("Rejected upload %s: %s", filename, e)
+        raise UploadRejected("could not be read. Please use a different image format.")
 
-    for image in images:
-        orig_path = os.path.join(upload_dir, image.filename)
-        temp_path = os.path.join(temp_dir, image.filename)
-        orig_thumb = None
-        temp_thumb = None
 
-        if image.thumbnail_filename:
-            orig_thumb = os.path.join(thumbnail_dir, image.thumbnail_filename)
-            temp_thumb = os.path.join(temp_dir, image.thumbnail_filename)
+def new_content_hasher():
+    """Return the hash object used to address stored image content."""
+    return hashlib.blake2b(digest_size=32)
 
-        try:
-            # Move image file if it exists
-            if os.path.exists(orig_path):
-                shutil.move(orig_path, temp_path)
-            else:
-                temp_path = None  # Mark as not moved
 
-            # Move thumbnail if it exists
-            if orig_thumb and temp_thumb and os.path.exists(orig_thumb):
-                shutil.move(orig_thumb, temp_thumb)
-            else:
-                temp_thumb = None  # Mark as not moved
+def hash_file(path):
+    """Return the content hash of a file (see new_content_hasher)."""
+    digest = new_content_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-            file_moves.append((orig_path, temp_path, orig_thumb, temp_thumb))
 
-        except Exception as e:
-            # Rollback: restore any files we've moved so far
-            restore_files_from_temp(file_moves)
-            return [], False, f"Error moving image {image.filename}: {e}"
+def finalize_upload(temp_path, filename):
+    """
+    Move a validated upload from TEMP_DIR into storage under its
+    content-addressed filename.
 
-    return file_moves, True, None
+    If the same content is already stored, the existing file is kept and the
+    temp copy discarded: identical bytes are stored once.
+    """
+    if not os.path.exists(temp_path):
+        return
+    storage = get_storage()
+    if storage.exists("uploads", filename):
+        os.remove(temp_path)
+    else:
+        storage.store("uploads", filename, temp_path)
 
 
-def restore_files_from_temp(file_moves):
+def lock_media_files():
     """
-    Restore files from temp directory back to original locations (rollback).
+    Take the media lock (the MEDIA_GENERATION row) until the current
+    transaction ends.
+
+    The reaper holds it while it checks which content is still in use and
+    deletes files; uploads hold it while they store originals and commit the
+    images using them. So the reaper either finishes first, and an upload of
+    the same bytes stores its file again afterwards, or it sees the committed
+    images and keeps the file.
+    """
+    bump_cache_generation(db.session.connection(), MEDIA_GENERATION)
+
 
-    Used when database commit fails and we need to undo file movements.
-    This is a best-effort operation - failures are logged but don't raise errors.
+def store_uploads(filenames_by_temp_path):
+    """
+    Move validated uploads into storage inside the transaction that adds their
+    ListingImage rows and image jobs: call it before the commit, so a worker
+    can never claim a job whose original is not stored yet. Holds the media
+    lock until that commit (see lock_media_files).
 
     Args:
-        file_moves: List of tuples (orig_path, temp_path, orig_thumb, temp_thumb)
-                   returned from move_image_files_to_temp()
+        filenames_by_temp_path: Iterable of (temp_path, stored filename)
     """
-    import os
-    import shutil
+    lock_media_files()
+    for temp_path, filename in filenames_by_temp_path:
+        finalize_upload(temp_path, filename)
+
+
+def discard_stored_uploads(filenames):
+    """
+    Hand originals stored for a transaction that then failed to the reaper,
+    which deletes them unless an image uses their content by then. Call
+    after the rollback; best effort (failures are logged).
+    """
+    if not filenames:
+        return
+    try:
+        for filename in filenames:
+            db.session.add(FileDeletion("uploads", filename))
+        queue_file_reaper()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning("Could not journal discarded uploads: %s", e)
+        return
+    dispatch_jobs()
+
+
+def thumbnail_filename_for(image, size):
+    """
+    Thumbnail filename for a ListingImage: derived from the content hash
+    (and size), so images with the same content share one thumbnail.
+    """
+    if image.content_hash:
+        return f"{image.content_hash}-{size[0]}x{size[1]}.jpg"
+    return f"{uuid.uuid4().hex}.jpg"
 
-    for orig_path, temp_path, orig_thumb, temp_thumb in file_moves:
-        # Restore image file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                shutil.move(temp_path, orig_path)
-            except Exception as e:
-                current_app.logger.warning(
-                    f"Failed to restore {orig_path} from temp: {e}"
-                )
 
-        # Restore thumbnail
-        if temp_thumb and os.path.exists(temp_thumb):
+def shared_content_hashes(images):
+    """
+    Return the content hashes of `images` that are still referenced by other
+    ListingImages. Their files must be kept when `images` are deleted.
+    """
+    hashes = {image.content_hash for image in images if image.content_hash}
+    if not hashes:
+        return set()
+    ids = [image.id for image in images if image.id is not None]
+    return set(
+        db.session.execute(
+            select(ListingImage.content_hash)
+            .where(
+                ListingImage.content_hash.in_(hashes),  # type: ignore
+                ListingImage.id.not_in(ids),  # type: ignore
+            )
+            .distinct()
+        ).scalars()
+    )
+
+
+def get_derivative_formats():
+    """
+    Return the configured derivative formats this Pillow build can write,
+    in order of preference.
+    """
+    formats = []
+    for format in current_app.config["IMAGE_DERIVATIVE_FORMATS"]:
+        if format not in DERIVATIVE_FORMATS:
+            continue
+        if format != "jpeg":
             try:
-                shutil.move(temp_thumb, orig_thumb)
-            except Exception as e:
-                current_app.logger.warning(
-                    f"Failed to restore thumbnail {orig_thumb} from temp: {e}"
-                )
+                if not features.check_module(format):
+                    continue
+            except ValueError:  # Pillow too old to know the format
+                continue
+        formats.append(format)
+    return formats
 
 
-def cleanup_temp_files(file_moves):
+def plan_derivatives(image_path, widths, formats, name_prefix=None):
     """
-    Delete files from temp directory after successful database commit.
+    List the derivatives of an image from its header alone (no decoding).
 
-    This is the final step of the temp→commit→cleanup pattern.
-    Failures are logged but don't raise errors (best-effort cleanup).
+    Widths are never upscaled: widths larger than the original collapse into
+    one copy at the original width. Dimensions follow the EXIF orientation.
+    With a `name_prefix` (the content hash), files are named
+    "<prefix>-<width>w.<ext>", so images with the same content share them.
 
     Args:
-        file_moves: List of tuples (orig_path, temp_path, orig_thumb, temp_thumb)
-                   returned from move_image_files_to_temp()
+        image_path (str): Path to the original image
+        widths (iterable): Target widths in pixels
+        formats (iterable): Keys of DERIVATIVE_FORMATS
+        name_prefix (str): Optional deterministic filename prefix
+
+    Returns:
+        list: (width, height, format, filename) for each derivative
     """
-    import os
+    with Image.open(image_path) as original:
+        width, height = original.size
+        # EXIF orientations 5-8 are rotated by 90 degrees
+        if original.getexif().get(0x0112) in (5, 6, 7, 8):
+            width, height = height, width
+
+    planned = []
+    for target in sorted({min(w, width) for w in widths}):
+        target_height = max(1, round(height * target / width))
+        for format in formats:
+            ext = DERIVATIVE_FORMATS[format][1]
+            if name_prefix:
+                filename = f"{name_prefix}-{target}w.{ext}"
+            else:
+                filename = f"{uuid.uuid4().hex}.{ext}"
+            planned.append((target, target_height, format, filename))
+    return planned
 
-    for orig_path, temp_path, orig_thumb, temp_thumb in file_moves:
-        # Delete image from temp
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except Exception as e:
-                current_app.logger.warning(
-                    f"Failed to delete temp file {temp_path}: {e}"
+
+def create_derivatives(image_path, output_dir, planned, quality):
+    """
+    Write planned derivatives (see plan_derivatives) into a local directory.
+
+    The image is decoded once and rotated according to its EXIF orientation.
+
+    Args:
+        image_path (str): Path to the original image
+        output_dir (str): Directory where the derivative files are written
+        planned (list): (width, height, format, filename) tuples
+        quality (int): Encoder quality (1-100)
+
+    Raises:
+        Any Pillow or OS error; files written before the error are removed.
+    """
+    written = []
+    try:
+        with Image.open(image_path) as original:
+            img = ImageOps.exif_transpose(original)
+            if img.mode == "P":
+                img = img.convert("RGBA")
+            elif img.mode not in ("RGBA", "RGB"):
+                img = img.convert("RGB")
+
+            # JPEG has no alpha channel: flatten onto white, like thumbnails
+            if img.mode == "RGBA":
+                flat = Image.new("RGB", img.size, color="white")
+                flat.paste(img, mask=img.getchannel("A"))
+            else:
+                flat = img
+
+            for width, height, format, filename in planned:
+                source = flat if format == "jpeg" else img
+                resized = (
+                    source
+                    if (width, height) == source.size
+                    else source.resize((width, height), Image.Resampling.LANCZOS)
                 )
+                options = {"quality": quality}
+                if format == "jpeg":
+                    options.update(optimize=True, progressive=True)
+                resized.save(
+                    os.path.join(output_dir, filename),
+                    DERIVATIVE_FORMATS[format][0],
+                    **options,
+                )
+                written.append(filename)
+    except Exception:
+        remove_derivative_files(output_dir, written)
+        raise
+
+
+def remove_derivative_files(output_dir, filenames):
+    """Best-effort removal of derivative files (e.g. after a failed commit)."""
+    for filename in filenames:
+        path = os.path.join(output_dir, filename)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            current_app.logger.warning(f"Failed to delete derivative {path}: {e}")
+
+
+def queue_image_jobs(images):
+    """
+    Queue the background processing of new ListingImages: one thumbnail job
+    per image without a thumbnail and one responsive derivatives job per image.
+
+    Call before committing the images so the jobs are saved in the same
+    transaction; then call dispatch_jobs() once the files are in UPLOAD_DIR.
+    """
+    db.session.flush()  # assigns image ids
+    for image in images:
+        if not image.thumbnail_filename:
+            enqueue_job(THUMBNAIL_JOB, {"image_id": image.id})
+        enqueue_job(DERIVATIVES_JOB, {"image_id": image.id})
+
+
+@job_handler(THUMBNAIL_JOB)
+def generate_thumbnail_job(payload):
+    """
+    Job handler: create the thumbnail for one ListingImage.
 
-        # Delete thumbnail from temp
-        if temp_thumb and os.path.exists(temp_thumb):
+    Images deleted in the meantime, or that already have a thumbnail, are
+    skipped. A missing original raises, so the job is retried (the upload may
+    still be moving into place) and eventually marked failed.
+    """
+    image = db.session.get(ListingImage, payload["image_id"])
+    if image is None or image.thumbnail_filename:
+        return
+
+    storage = get_storage()
+    size = current_app.config["THUMBNAIL_SIZE"]
+    thumbnail_filename = thumbnail_filename_for(image, size)
+    # The same content may have been thumbnailed for another image already
+    if not (image.content_hash and storage.exists("thumbnails", thumbnail_filename)):
+        with storage.local_file("uploads", image.filename) as original_path:
+            thumbnail_path = storage.new_temp_path(".jpg")
+            if not create_thumbnail(original_path, thumbnail_path, size):
+                os.remove(thumbnail_path)
+                raise ValueError(f"Could not create thumbnail for {image.filename}")
+        storage.store("thumbnails", thumbnail_filename, thumbnail_path)
+
+    image.thumbnail_filename = thumbnail_filename
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # Content-addressed files may be shared: leave them for reuse
+        if not image.content_hash:
+            storage.delete("thumbnails", thumbnail_filename)
+        raise
+
+
+@job_handler(DERIVATIVES_JOB)
+def generate_derivatives_job(payload):
+    """
+    Job handler: create the responsive derivatives of one ListingImage.
+
+    Images deleted in the meantime, or that already have derivatives, are
+    skipped; a missing original raises so the job is retried.
+    """
+    image = db.session.get(ListingImage, payload["image_id"])
+    if image is None or image.derivatives:
+        return
+
+    storage = get_storage()
+    with storage.local_file("uploads", image.filename) as original_path:
+        planned = plan_derivatives(
+            original_path,
+            current_app.config["IMAGE_DERIVATIVE_WIDTHS"],
+            get_derivative_formats(),
+            name_prefix=image.content_hash,
+        )
+        # Only encode what is not stored yet (same content uploaded before)
+        missing = [
+            derivative
+            for derivative in planned
+            if not (image.content_hash and storage.exists("derivatives", derivative[3]))
+        ]
+        if missing:
+            work_dir = tempfile.mkdtemp(dir=storage.temp_dir)
             try:
-                os.remove(temp_thumb)
-            except Exception as e:
-                current_app.logger.warning(
-                    f"Failed to delete temp thumbnail {temp_thumb}: {e}"
+                create_derivatives(
+                    original_path,
+                    work_dir,
+                    missing,
+                    current_app.config["IMAGE_DERIVATIVE_QUALITY"],
                 )
+                for derivative in missing:
+                    storage.store(
+                        "derivatives", derivative[3], os.path.join(work_dir, derivative[3])
+                    )
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    for width, height, format, filename in planned:
+        db.session.add(
+            ListingImageDerivative(
+                image_id=image.id,
+                width=width,
+                height=height,
+                format=format,
+                filename=filename,
+            )
+        )
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # Content-addressed files may be shared: leave them for reuse
+        if not image.content_hash:
+            for derivative in missing:
+                storage.delete("derivatives", derivative[3])
+        raise
+
+
+def journal_image_files(listing_ids=None, image_ids=None):
+    """
+    Record the stored files of the images being deleted in the deletion
+    journal, except content that other images still use.
+
+    Runs INSERT ... SELECT statements in the caller's transaction: call it
+    before the image rows are deleted (or flushed as deleted), and commit
+    both together. The files are removed later by the reaper job (see
+    queue_file_reaper).
+
+    Args:
+        listing_ids: A SELECT of the ids of the listings being deleted
+        image_ids: Ids of the images being deleted, when only some images
+            of a listing go
+    """
+    other = aliased(ListingImage)
+    if image_ids is not None:
+        being_deleted = ListingImage.id.in_(image_ids)  # type: ignore
+        kept = other.id.not_in(image_ids)  # type: ignore
+    else:
+        being_deleted = ListingImage.listing_id.in_(listing_ids)  # type: ignore
+        kept = other.listing_id.not_in(listing_ids)  # type: ignore
+    # Legacy files (no hash) are never shared
+    unshared = or_(
+        ListingImage.content_hash.is_(None),  # type: ignore
+        ~exists().where(other.content_hash == ListingImage.content_hash, kept),
+    )
+    now = literal(datetime.now(timezone.utc), DateTime())
+    journal = FileDeletion.__table__
+    columns = ["area", "name", "created_at"]
+    for area, name_column, extra in (
+        ("uploads", ListingImage.filename, None),
+        (
+            "thumbnails",
+            ListingImage.thumbnail_filename,
+            ListingImage.thumbnail_filename.is_not(None),  # type: ignore
+        ),
+        ("derivatives", ListingImageDerivative.filename, None),
+    ):
+        statement = select(literal(area), name_column, now).where(being_deleted, unshared)
+        if area == "derivatives":
+            statement = statement.select_from(ListingImageDerivative).join(
+                ListingImage, ListingImageDerivative.image_id == ListingImage.id
+            )
+        if extra is not None:
+            statement = statement.where(extra)
+        db.session.execute(
+            insert(journal).from_select(columns, statement.distinct())
+        )
+
+
+def queue_file_reaper():
+    """
+    Queue the job that empties the deletion journal, unless one is pending.
+    Commit, then call dispatch_jobs() to start it.
+    """
+    pending = db.session.execute(
+        select(Job.id)
+        .where(Job.kind == REAP_FILES_JOB, Job.status == Job.STATUS_PENDING)
+        .limit(1)
+    ).scalar()
+    if pending is None:
+        enqueue_job(REAP_FILES_JOB, {})
+
+
+def reap_deleted_files(batch_size=500):
+    """
+    Delete the files recorded in the deletion journal, in batches.
+
+    Each batch deletes its files (grouped per area, so backends can batch the
+    requests) before its journal rows, and is committed on its own: after a
+    crash the unfinished batch is simply replayed. A content-named file is
+    kept if an image with that content was uploaded again after its deletion
+    was journaled; each batch holds the media lock (see lock_media_files) so
+    such an upload cannot commit between the check and the delete.
+
+    Returns:
+        int: Number of journal entries processed
+    """
+    storage = get_storage()
+    processed = 0
+    while True:
+        lock_media_files()
+        rows = db.session.execute(
+            select(FileDeletion.id, FileDeletion.area, FileDeletion.name)
+            .order_by(FileDeletion.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            db.session.rollback()  # Releases the media lock
+            return processed
+
+        hashes = {row.name[:64] for row in rows if is_content_named(row.name)}
+        in_use = (
+            set(
+                db.session.execute(
+                    select(ListingImage.content_hash).where(
+                        ListingImage.content_hash.in_(hashes)  # type: ignore
+                    )
+                ).scalars()
+            )
+            if hashes
+            else set()
+        )
+        names_by_area = {}
+        for row in rows:
+            if is_content_named(row.name) and row.name[:64] in in_use:
+                continue
+            names_by_area.setdefault(row.area, set()).add(row.name)
+        for area, names in names_by_area.items():
+            storage.delete_many(area, sorted(names))
+
+        db.session.execute(
+            delete(FileDeletion).where(
+                FileDeletion.id.in_([row.id for row in rows])  # type: ignore
+            )
+        )
+        db.session.commit()
+        processed += len(rows)
+
+
+@job_handler(REAP_FILES_JOB)
+def reap_files_job(payload):
+    """Job handler: delete the files recorded in the deletion journal."""
+    reap_deleted_files()
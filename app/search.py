@@ -0,0 +1,328 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Full-text search over listing titles and descriptions.
+
+The index lives next to the listing table and is maintained by ORM events in
+the same transaction as the listing write. Backends are chosen by database
+dialect:
+- SQLite: an FTS5 virtual table (listing_fts, rowid = listing.id) ranked by bm25()
+- PostgreSQL: a listing_search table with a weighted tsvector and a GIN index,
+  ranked by ts_rank()
+
+Both expose the same interface, so the /search route and the rebuild command
+do not care which one is active. On other databases search is unavailable and
+the sync events do nothing.
+
+The index tables are created by migration, and by Listing.__table__'s
+after_create event for databases built with db.create_all().
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+from sqlalchemy import (
+    Integer,
+    Select,
+    bindparam,
+    column,
+    delete,
+    event,
+    func,
+    inspect,
+    literal_column,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.orm import Session
+
+from .models import Listing
+
+# Title matches weigh more than description matches
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query_text: str) -> list[str]:
+    """Split user input into plain word terms (operators and quotes are dropped)."""
+    return _TERM_RE.findall(query_text or "")
+
+
+class SearchBackend(ABC):
+    """
+    Interface for a listing full-text index.
+
+    match() returns a subquery with listing_id and rank columns, where a lower
+    rank is a better match.
+    """
+
+    dialect = ""
+
+    @abstractmethod
+    def create(self, connection) -> None: ...
+
+    @abstractmethod
+    def drop(self, connection) -> None: ...
+
+    @abstractmethod
+    def upsert(self, connection, rows: list[dict]) -> None:
+        """Index (or re-index) rows of {"id", "title", "description"}."""
+
+    @abstractmethod
+    def delete(self, connection, listing_ids: Union[list[int], Select]) -> None:
+        """Remove listings (a list of ids or a SELECT of ids) from the index."""
+
+    @abstractmethod
+    def clear(self, connection) -> None: ...
+
+    @abstractmethod
+    def match(self, query_text: str):
+        """Subquery of (listing_id, rank) matching the query, or None."""
+
+    def rebuild(self, connection) -> int:
+        """Re-index every listing. Returns the number of listings indexed."""
+        self.create(connection)
+        self.clear(connection)
+        rows = [
+            dict(row._mapping)
+            for row in connection.execute(
+                select(Listing.id, Listing.title, Listing.description)
+            )
+        ]
+        if rows:
+            self.upsert(connection, rows)
+        return len(rows)
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """FTS5 virtual table keyed by listing id (rowid)."""
+
+    dialect = "sqlite"
+    fts = table("listing_fts", column("rowid", Integer), column("title"), column("description"))
+
+    def create(self, connection) -> None:
+        connection.execute(
+            text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS listing_fts USING fts5("
+                "title, description, tokenize='unicode61 remove_diacritics 2')"
+            )
+        )
+
+    def drop(self, connection) -> None:
+        connection.execute(text("DROP TABLE IF EXISTS listing_fts"))
+
+    def upsert(self, connection, rows: list[dict]) -> None:
+        self.delete(connection, [row["id"] for row in rows])
+        connection.execute(
+            text(
+                "INSERT INTO listing_fts (rowid, title, description) "
+                "VALUES (:id, :title, :description)"
+            ),
+            rows,
+        )
+
+    def delete(self, connection, listing_ids: Union[list[int], Select]) -> None:
+        if isinstance(listing_ids, Select) or listing_ids:
+            connection.execute(
+                delete(self.fts).where(self.fts.c.rowid.in_(listing_ids))
+            )
+
+    def clear(self, connection) -> None:
+        connection.execute(delete(self.fts))
+
+    def match(self, query_text: str):
+        terms = search_terms(query_text)
+        if not terms:
+            return None
+        # Quote every term (AND semantics); the last one also matches as a prefix
+        fts_query = " ".join(f'"{term}"' for term in terms) + "*"
+        rank = func.bm25(literal_column("listing_fts"), TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+        return (
+            select(self.fts.c.rowid.label("listing_id"), rank.label("rank"))
+            .where(literal_column("listing_fts").op("MATCH")(fts_query))
+            .subquery("search_hits")
+        )
+
+
+class PostgresTsvectorBackend(SearchBackend):
+    """listing_search table holding a weighted tsvector per listing."""
+
+    dialect = "postgresql"
+    search_table = table("listing_search", column("listing_id", Integer), column("document"))
+    config = "simple"
+
+    def create(self, connection) -> None:
+        connection.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS listing_search ("
+                "listing_id INTEGER PRIMARY KEY "
+                "REFERENCES listing (id) ON DELETE CASCADE, "
+                "document TSVECTOR NOT NULL)"
+            )
+        )
+        connection.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_listing_search_document "
+                "ON listing_search USING GIN (document)"
+            )
+        )
+
+    def drop(self, connection) -> None:
+        connection.execute(text("DROP TABLE IF EXISTS listing_search"))
+
+    def upsert(self, connection, rows: list[dict]) -> None:
+        connection.execute(
+            text(
+                "INSERT INTO listing_search (listing_id, document) VALUES (:id, "
+                f"setweight(to_tsvector('{self.config}', :title), 'A') || "
+                f"setweight(to_tsvector('{self.config}', :description), 'B')) "
+                "ON CONFLICT (listing_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            rows,
+        )
+
+    def delete(self, connection, listing_ids: Union[list[int], Select]) -> None:
+        if isinstance(listing_ids, Select) or listing_ids:
+            connection.execute(
+                delete(self.search_table).where(
+                    self.search_table.c.listing_id.in_(listing_ids)
+                )
+            )
+
+    def clear(self, connection) -> None:
+        connection.execute(delete(self.search_table))
+
+    def match(self, query_text: str):
+        terms = search_terms(query_text)
+        if not terms:
+            return None
+        tsquery = func.plainto_tsquery(
+            self.config, bindparam("search_text", " ".join(terms))
+        )
+        document = self.search_table.c.document
+        return (
+            select(
+                self.search_table.c.listing_id,
+                (-func.ts_rank(document, tsquery)).label("rank"),
+            )
+            .where(document.op("@@")(tsquery))
+            .subquery("search_hits")
+        )
+
+
+BACKENDS = {
+    backend.dialect: backend
+    for backend in (SQLiteFTS5Backend(), PostgresTsvectorBackend())
+}
+
+
+# Tables the backends manage outside the SQLAlchemy metadata (FTS5 keeps its
+# data in listing_fts_* shadow tables); autogenerate must leave them alone
+SEARCH_INDEX_TABLES = frozenset(
+    ["listing_fts", "listing_search"]
+    + [f"listing_fts_{shadow}" for shadow in ("data", "idx", "config", "docsize", "content")]
+)
+
+
+def is_search_index_object(name: Optional[str], type_: str, parent_names) -> bool:
+    """True for the search index tables and their indexes (Alembic include_name)."""
+    if type_ == "table":
+        return name in SEARCH_INDEX_TABLES
+    if type_ in ("index", "column", "unique_constraint", "foreign_key_constraint"):
+        return parent_names.get("table_name") in SEARCH_INDEX_TABLES
+    return False
+
+
+def get_search_backend(dialect_name: str) -> Optional[SearchBackend]:
+    """Return the search backend for a database dialect, or None if unsupported."""
+    return BACKENDS.get(dialect_name)
+
+
+def search_listings(session, query_text: str, category_ids=None):
+    """
+    Build a ranked SELECT of listings matching query_text.
+
+    Args:
+        session: SQLAlchemy session (selects the backend by its dialect)
+        query_text: raw user input
+        category_ids: optional iterable of category IDs (e.g. a subtree) to filter by
+
+    Returns:
+        select(Listing) ordered best match first, or None when the query has no
+        searchable terms or the database has no search backend.
+    """
+    backend = get_search_backend(session.get_bind().dialect.name)
+    if backend is None:
+        return None
+    hits = backend.match(query_text)
+    if hits is None:
+        return None
+    statement = select(Listing).join(hits, Listing.id == hits.c.listing_id)
+    if category_ids is not None:
+        statement = statement.where(Listing.category_id.in_(list(category_ids)))
+    return statement.order_by(hits.c.rank, Listing.created_at.desc(), Listing.id.desc())
+
+
+def rebuild_search_index(connection) -> Optional[int]:
+    """Re-index every listing. Returns the count, or None if unsupported."""
+    backend = get_search_backend(connection.dialect.name)
+    if backend is None:
+        return None
+    return backend.rebuild(connection)
+
+
+@event.listens_for(Listing.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    backend = get_search_backend(connection.dialect.name)
+    if backend is not None:
+        backend.create(connection)
+
+
+@event.listens_for(Listing.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    backend = get_search_backend(connection.dialect.name)
+    if backend is not None:
+        backend.drop(connection)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session, flush_context):
+    """
+    Mirror listing inserts, title/description edits and deletes into the
+    search index, in the same transaction as the listing write.
+    """
+    changed = [obj for obj in session.new if isinstance(obj, Listing)] + [
+        obj
+        for obj in session.dirty
+        if isinstance(obj, Listing)
+        and (
+            inspect(obj).attrs.title.history.has_changes()
+            or inspect(obj).attrs.description.history.has_changes()
+        )
+    ]
+    deleted_ids = [obj.id for obj in session.deleted if isinstance(obj, Listing)]
+    if not changed and not deleted_ids:
+        return
+
+    connection = session.connection()
+    backend = get_search_backend(connection.dialect.name)
+    if backend is None:
+        return
+    if changed:
+        backend.upsert(
+            connection,
+            [
+                {"id": obj.id, "title": obj.title, "description": obj.description}
+                for obj in changed
+            ],
+        )
+    if deleted_ids:
+        backend.delete(connection, deleted_ids)
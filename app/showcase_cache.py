@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+In-process cache of the precomputed home page showcase bundle.
+
+Choosing showcase categories and their candidate listings is the expensive part
+of the home page. The result (candidate category IDs plus a pool of listing IDs
+per category) is cached per worker and reused until either:
+- a listing write bumps the "listings" generation, or a category write bumps
+  the "category_tree" generation (see cache_generation), or
+- INDEX_SHOWCASE_CACHE_TTL seconds pass, so popularity shifts and random
+  category choices still refresh on a quiet site.
+
+Requests only sample from the cached pools and fetch the chosen listings.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from flask import current_app
+
+
+@dataclass(frozen=True)
+class ShowcaseBundle:
+    """
+    Candidate showcase categories and per-category listing ID pools.
+
+    key is the (listings generation, category tree generation) pair the bundle
+    was built from. Pools are ordered newest first.
+    """
+
+    key: tuple[int, int]
+    category_ids: tuple[int, ...]
+    pools: dict[int, tuple[int, ...]]
+    built_at: float = field(default_factory=time.monotonic)
+
+
+class ShowcaseCache:
+    """Per-app, per-process holder of the current ShowcaseBundle."""
+
+    def __init__(self):
+        self._bundle: Optional[ShowcaseBundle] = None
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, bundle: Optional[ShowcaseBundle], key, ttl: float) -> bool:
+        return (
+            bundle is not None
+            and bundle.key == key
+            and (ttl <= 0 or time.monotonic() - bundle.built_at < ttl)
+        )
+
+    def get(self, key: tuple[int, int], build: Callable[[], ShowcaseBundle]):
+        """Return the cached bundle for `key`, rebuilding it when stale."""
+        ttl = current_app.config.get("INDEX_SHOWCASE_CACHE_TTL", 300)
+        bundle = self._bundle
+        if self._is_fresh(bundle, key, ttl):
+            return bundle
+        with self._lock:
+            if not self._is_fresh(self._bundle, key, ttl):
+                self._bundle = build()
+            return self._bundle
+
+    def clear(self) -> None:
+        self._bundle = None
+
+
+def init_app(app) -> None:
+    """Register the showcase cache on the Flask app."""
+    app.extensions["showcase_cache"] = ShowcaseCache()
+
+
+def get_showcase_cache() -> ShowcaseCache:
+    return current_app.extensions["showcase_cache"]
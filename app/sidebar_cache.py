@@ -0,0 +1,138 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+In-process cache of the rendered sidebar category tree.
+
+The sidebar lists every category on every page. Rendering it runs the
+recursive macros/sidebar_category_tree.html macro over the whole tree, so the
+macro is run only once per category tree generation, over the CategoryTree
+snapshot (never the ORM). Instead of the active/expanded state, that
+rendering contains slot markers, which are filled in for the requested active
+category with one regex pass. The finished HTML is also kept per (generation,
+active category) in a small LRU of SIDEBAR_CACHE_SIZE entries.
+
+Both levels are dropped when a category write bumps the "category_tree"
+generation (see category_tree.get_category_tree).
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from flask import current_app, request
+from markupsafe import Markup
+
+from .category_tree import CategoryTree, get_category_tree
+
+# Slot markers: "\x1a<kind>:<category id>\x1a" (\x1a never occurs in HTML)
+_SLOT_RE = re.compile("\x1a([a-z]+):([0-9]+)\x1a")
+
+# kind -> (text when off, text when on); "active" is on for the active
+# category, the others for expanded nodes (ancestors of the active category)
+SLOT_TEXT = {
+    "active": ("", " active"),
+    "collapsed": (" collapsed", ""),
+    "expanded": ("false", "true"),
+    "rotate": ("", " rotate-180"),
+    "show": ("", " show"),
+}
+
+
+def slot(kind: str, category_id: int) -> Markup:
+    """Marker for a piece of per-request state, used by the sidebar macro."""
+    return Markup(f"\x1a{kind}:{category_id}\x1a")
+
+
+def apply_state(html: str, active_id: Optional[int], expanded_ids) -> Markup:
+    """Fill in the slot markers of a rendered tree for one active category."""
+    expanded = set(expanded_ids)
+
+    def fill(match):
+        kind, category_id = match.group(1), int(match.group(2))
+        on = category_id == active_id if kind == "active" else category_id in expanded
+        return SLOT_TEXT[kind][on]
+
+    return Markup(_SLOT_RE.sub(fill, html))
+
+
+class SidebarCache:
+    """Per-app, per-process holder of the rendered trees of one generation."""
+
+    def __init__(self):
+        self._key: Optional[tuple] = None
+        self._template: Optional[str] = None
+        self._pages: OrderedDict[Optional[int], Markup] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: tuple,
+        active_id: Optional[int],
+        expanded_ids,
+        render: Callable[[], str],
+        max_entries: int,
+    ) -> Markup:
+        """
+        Return the sidebar for `active_id`; `key` identifies the tree (its
+        generation) and `render` renders it with slot markers.
+        """
+        with self._lock:
+            if self._key != key:
+                self._key, self._template = key, None
+                self._pages.clear()
+            html = self._pages.get(active_id)
+            if html is not None:
+                self._pages.move_to_end(active_id)
+                return html
+            template = self._template
+        if template is None:
+            template = render()
+        html = apply_state(template, active_id, expanded_ids)
+        with self._lock:
+            if self._key == key:
+                self._template = template
+                self._pages[active_id] = html
+                while len(self._pages) > max_entries:
+                    self._pages.popitem(last=False)
+        return html
+
+    def clear(self) -> None:
+        with self._lock:
+            self._key, self._template = None, None
+            self._pages.clear()
+
+
+def _render_tree(tree: CategoryTree) -> str:
+    template = current_app.jinja_env.get_template("macros/sidebar_category_tree.html")
+    return str(template.module.render_category_tree(tree.roots, slot))  # type: ignore
+
+
+def sidebar_category_tree(active_category_id: Optional[int] = None) -> Markup:
+    """
+    Rendered sidebar category tree with `active_category_id` highlighted and
+    its ancestors expanded, for templates.
+    """
+    tree = get_category_tree()
+    active = tree.get(active_category_id)
+    active_id = active.id if active is not None else None
+    expanded_ids = active.ancestor_ids if active is not None else ()
+    # URLs in the HTML depend on where the app is mounted
+    key = (tree.generation, request.script_root)
+    return current_app.extensions["sidebar_cache"].get(
+        key,
+        active_id,
+        expanded_ids,
+        lambda: _render_tree(tree),
+        current_app.config.get("SIDEBAR_CACHE_SIZE", 64),
+    )
+
+
+def init_app(app) -> None:
+    """Register the sidebar cache and the sidebar_category_tree() template global."""
+    app.extensions["sidebar_cache"] = SidebarCache()
+    app.jinja_env.globals["sidebar_category_tree"] = sidebar_category_tree
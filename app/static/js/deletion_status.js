@@ -0,0 +1,49 @@
+/*
+ * SPDX-License-Identifier: GPL-2.0-only
+ * Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+ *
+ * Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+ * See LICENSE file in the project root for full license information.
+ */
+
+/**
+ * User Deletion Status Poller
+ *
+ * Elements with a data-delete-job attribute (the status URL of a user
+ * deletion job) are refreshed every few seconds with the job's progress
+ * until it finishes or fails.
+ */
+
+const DELETION_POLL_INTERVAL = 3000;
+
+function renderDeletionStatus(element, job) {
+    if (job.status === 'done') {
+        element.textContent = `Deleted (job #${job.id}).`;
+        return true;
+    }
+    if (job.status === 'failed') {
+        element.textContent = `Deletion failed (job #${job.id}): ${job.error || ''}`;
+        element.classList.replace('text-muted', 'text-danger');
+        return true;
+    }
+    const total = job.progress_total === null ? '' : ` / ${job.progress_total}`;
+    element.textContent = `Deleting (job #${job.id}): ${job.progress || 0}${total} listings`;
+    return false;
+}
+
+function pollDeletionStatus(element) {
+    fetch(element.dataset.deleteJob, { headers: { Accept: 'application/json' } })
+        .then((response) => (response.ok ? response.json() : null))
+        .then((job) => {
+            if (job && !renderDeletionStatus(element, job)) {
+                setTimeout(() => pollDeletionStatus(element), DELETION_POLL_INTERVAL);
+            }
+        })
+        .catch(() => setTimeout(() => pollDeletionStatus(element), DELETION_POLL_INTERVAL));
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('[data-delete-job]').forEach((element) => {
+        setTimeout(() => pollDeletionStatus(element), DELETION_POLL_INTERVAL);
+    });
+});
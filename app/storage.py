@@ -0,0 +1,284 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Storage backends for listing image files.
+
+Originals, thumbnails and derivatives live in named areas ("uploads",
+"thumbnails", "derivatives"). Routes, background jobs and CLI commands go
+through the backend selected by STORAGE_BACKEND:
+- "local": the UPLOAD_DIR / THUMBNAIL_DIR / DERIVATIVE_DIR directories,
+  served by the media route, optionally through X-Accel-Redirect or
+  X-Sendfile (default)
+- "s3": an S3-compatible bucket (AWS S3, MinIO, ...), so several app nodes
+  share media without NFS; files are served from S3_PUBLIC_URL (e.g. a CDN)
+  or straight from the bucket endpoint. Requires boto3 (`classifieds[s3]`).
+
+Uploads are still staged in the local TEMP_DIR while a request validates
+them. Deleted images are journaled and their files removed in batches by a
+background job (delete_many).
+"""
+
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import ContextManager, Mapping
+
+from flask import current_app, url_for
+
+from .assets import IMMUTABLE_CACHE_CONTROL
+
+# Area name -> config key of its directory (local backend)
+AREA_DIRS = {
+    "uploads": "UPLOAD_DIR",
+    "thumbnails": "THUMBNAIL_DIR",
+    "derivatives": "DERIVATIVE_DIR",
+}
+
+# Content-addressed names start with the digest of the original's bytes
+# ("<hash>.png", "<hash>-224x224.jpg", "<hash>-640w.webp")
+CONTENT_NAME_RE = re.compile(r"^[0-9a-f]{64}(?:[-.]|$)")
+
+# Config keys a backend is built from (also passed to worker processes)
+SETTINGS_KEYS = (
+    "STORAGE_BACKEND",
+    "UPLOAD_DIR",
+    "THUMBNAIL_DIR",
+    "DERIVATIVE_DIR",
+    "TEMP_DIR",
+    "S3_BUCKET",
+    "S3_PREFIX",
+    "S3_ENDPOINT_URL",
+    "S3_REGION",
+    "S3_PUBLIC_URL",
+)
+
+
+def is_content_named(name: str) -> bool:
+    """True if a file's name identifies its bytes, so it can be cached forever."""
+    return CONTENT_NAME_RE.match(name) is not None
+
+
+class StorageBackend(ABC):
+    """
+    Interface for image file storage.
+
+    Names are plain filenames; each area is a flat namespace. delete and
+    delete_many accept names that do not exist.
+    """
+
+    name = ""
+
+    def __init__(self, config: Mapping):
+        # Read lazily: directories may be reconfigured after start-up
+        self.config = config
+
+    @property
+    def temp_dir(self) -> str:
+        return self.config["TEMP_DIR"]
+
+    def new_temp_path(self, suffix: str = "") -> str:
+        """Return a fresh local path in TEMP_DIR for building a file to store."""
+        os.makedirs(self.temp_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.temp_dir)
+        os.close(fd)
+        return path
+
+    @abstractmethod
+    def exists(self, area: str, name: str) -> bool: ...
+
+    @abstractmethod
+    def store(self, area: str, name: str, local_path: str) -> None:
+        """Move a local file into storage; `local_path` is consumed."""
+
+    @abstractmethod
+    def delete(self, area: str, name: str) -> None: ...
+
+    def delete_many(self, area: str, names: list[str]) -> None:
+        """Delete several files of an area (backends may batch the requests)."""
+        for name in names:
+            self.delete(area, name)
+
+    @abstractmethod
+    def local_file(self, area: str, name: str) -> ContextManager[str]:
+        """
+        Context manager yielding a local path to read the file from (e.g. to
+        decode an original). Raises FileNotFoundError if it does not exist.
+        """
+
+    @abstractmethod
+    def url(self, area: str, name: str) -> str:
+        """Public URL of a stored file."""
+
+
+class LocalStorage(StorageBackend):
+    """Files in local directories (one per area), served by the media route."""
+
+    name = "local"
+
+    def path(self, area: str, name: str) -> str:
+        return os.path.join(self.config[AREA_DIRS[area]], name)
+
+    def exists(self, area, name):
+        return os.path.exists(self.path(area, name))
+
+    def store(self, area, name, local_path):
+        path = self.path(area, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(local_path, path)
+
+    def delete(self, area, name):
+        path = self.path(area, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    @contextmanager
+    def local_file(self, area, name):
+        path = self.path(area, name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        yield path
+
+    def url(self, area, name):
+        return url_for("media.serve_media", area=area, name=name)
+
+
+class S3Storage(StorageBackend):
+    """
+    Objects in an S3-compatible bucket, keyed "<S3_PREFIX><area>/<name>".
+
+    Credentials come from boto3's usual chain (environment, config files,
+    instance roles). S3_ENDPOINT_URL points it at MinIO or another
+    S3-compatible service.
+    """
+
+    name = "s3"
+
+    def __init__(self, config, client=None):
+        super().__init__(config)
+        if client is None:
+            try:
+                import boto3
+            except ImportError as e:
+                raise RuntimeError(
+                    "STORAGE_BACKEND='s3' requires boto3: install classifieds[s3]."
+                ) from e
+            client = boto3.client(
+                "s3",
+                endpoint_url=config.get("S3_ENDPOINT_URL") or None,
+                region_name=config.get("S3_REGION") or None,
+            )
+        self.client = client
+        self.bucket = config["S3_BUCKET"]
+        self.prefix = config.get("S3_PREFIX") or ""
+
+    def key(self, area: str, name: str) -> str:
+        if area not in AREA_DIRS:
+            raise ValueError(f"Unknown storage area '{area}'")
+        return f"{self.prefix}{area}/{name}"
+
+    def exists(self, area, name):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(area, name))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def store(self, area, name, local_path):
+        extra_args = {
+            "ContentType": mimetypes.guess_type(name)[0] or "application/octet-stream"
+        }
+        if is_content_named(name):
+            extra_args["CacheControl"] = IMMUTABLE_CACHE_CONTROL
+        self.client.upload_file(
+            local_path,
+            self.bucket,
+            self.key(area, name),
+            ExtraArgs=extra_args,
+        )
+        os.remove(local_path)
+
+    def delete(self, area, name):
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(area, name))
+
+    def delete_many(self, area, names):
+        # DeleteObjects takes up to 1000 keys per request
+        for start in range(0, len(names), 1000):
+            objects = [{"Key": self.key(area, name)} for name in names[start : start + 1000]]
+            response = self.client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True}
+            )
+            if response.get("Errors"):
+                error = response["Errors"][0]
+                raise OSError(f"Could not delete {error['Key']}: {error['Message']}")
+
+    @contextmanager
+    def local_file(self, area, name):
+        from botocore.exceptions import ClientError
+
+        path = self.new_temp_path(suffix=os.path.splitext(name)[1])
+        try:
+            try:
+                self.client.download_file(self.bucket, self.key(area, name), path)
+            except ClientError as e:
+                raise FileNotFoundError(self.key(area, name)) from e
+            yield path
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def url(self, area, name):
+        key = self.key(area, name)
+        public_url = self.config.get("S3_PUBLIC_URL")
+        if public_url:
+            return f"{public_url.rstrip('/')}/{key}"
+        endpoint = self.config.get("S3_ENDPOINT_URL")
+        if endpoint:
+            return f"{endpoint.rstrip('/')}/{self.bucket}/{key}"
+        region = self.config.get("S3_REGION") or "us-east-1"
+        return f"https://{self.bucket}.s3.{region}.amazonaws.com/{key}"
+
+
+BACKENDS = {
+    LocalStorage.name: LocalStorage,
+    S3Storage.name: S3Storage,
+}
+
+
+def create_storage(config: Mapping) -> StorageBackend:
+    """Build the backend selected by config["STORAGE_BACKEND"]."""
+    backend = config.get("STORAGE_BACKEND") or LocalStorage.name
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend}'")
+    return BACKENDS[backend](config)
+
+
+def storage_settings(config: Mapping) -> dict:
+    """Picklable copy of the storage config, to rebuild the backend elsewhere."""
+    return {key: config.get(key) for key in SETTINGS_KEYS}
+
+
+def init_app(app) -> None:
+    """Register the storage backend and the media_url() template global."""
+    app.extensions["storage"] = create_storage(app.config)
+    app.jinja_env.globals["media_url"] = media_url
+
+
+def get_storage() -> StorageBackend:
+    return current_app.extensions["storage"]
+
+
+def media_url(area: str, name: str) -> str:
+    """URL of a stored image file, for templates: media_url('thumbnails', name)."""
+    return get_storage().url(area, name)
@@ -0,0 +1,55 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add composite indexes for listing browse/owner queries and listing_image joins.
+
+- listing(category_id, created_at): category grids and showcases
+  (category_id IN (...) ORDER BY created_at DESC)
+- listing(user_id, created_at): admin and user listing pages
+- listing_image(listing_id): image lookups per listing
+
+Revision ID: a7d4e2b9c6f3
+Revises: f2c6a9e1d3b5
+Create Date: 2026-10-18
+
+Index creation is skipped when an index with the same name already exists.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "a7d4e2b9c6f3"
+down_revision = "f2c6a9e1d3b5"
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("listing", "ix_listing_category_id_created_at", ["category_id", "created_at"]),
+    ("listing", "ix_listing_user_id_created_at", ["user_id", "created_at"]),
+    ("listing_image", "ix_listing_image_listing_id", ["listing_id"]),
+]
+
+
+def _existing_indexes(table_name):
+    inspector = sa.inspect(op.get_bind())
+    return {ix["name"] for ix in inspector.get_indexes(table_name)}
+
+
+def upgrade():
+    for table_name, index_name, columns in INDEXES:
+        if index_name not in _existing_indexes(table_name):
+            with op.batch_alter_table(table_name, schema=None) as batch_op:
+                batch_op.create_index(index_name, columns)
+
+
+def downgrade():
+    for table_name, index_name, _columns in reversed(INDEXES):
+        if index_name in _existing_indexes(table_name):
+            with op.batch_alter_table(table_name, schema=None) as batch_op:
+                batch_op.drop_index(index_name)
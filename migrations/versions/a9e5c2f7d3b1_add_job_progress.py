@@ -0,0 +1,34 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add progress columns to job for long running jobs (user deletion).
+
+Revision ID: a9e5c2f7d3b1
+Revises: f7c3e0a5b2d8
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "a9e5c2f7d3b1"
+down_revision = "f7c3e0a5b2d8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("job", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("progress", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("progress_total", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("job", schema=None) as batch_op:
+        batch_op.drop_column("progress_total")
+        batch_op.drop_column("progress")
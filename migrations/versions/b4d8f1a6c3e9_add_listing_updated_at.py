@@ -0,0 +1,43 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add listing.updated_at (validator for conditional GETs of listing pages),
+backfilled from created_at.
+
+Revision ID: b4d8f1a6c3e9
+Revises: a9e5c2f7d3b1
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "b4d8f1a6c3e9"
+down_revision = "a9e5c2f7d3b1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("listing", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+    listing = sa.table(
+        "listing",
+        sa.column("created_at", sa.DateTime()),
+        sa.column("updated_at", sa.DateTime()),
+    )
+    op.execute(listing.update().values(updated_at=listing.c.created_at))
+
+    with op.batch_alter_table("listing", schema=None) as batch_op:
+        batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table("listing", schema=None) as batch_op:
+        batch_op.drop_column("updated_at")
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add the listing full-text search index and fill it from existing listings.
+
+- SQLite: FTS5 virtual table listing_fts (rowid = listing.id)
+- PostgreSQL: listing_search table with a weighted tsvector and a GIN index
+
+Other databases are left unchanged (search is unavailable there).
+The index is kept current by ORM events afterwards; see app/search.py.
+
+Revision ID: b8e3f1c5d2a6
+Revises: a7d4e2b9c6f3
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "b8e3f1c5d2a6"
+down_revision = "a7d4e2b9c6f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        conn.execute(
+            sa.text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS listing_fts USING fts5("
+                "title, description, tokenize='unicode61 remove_diacritics 2')"
+            )
+        )
+        conn.execute(sa.text("DELETE FROM listing_fts"))
+        conn.execute(
+            sa.text(
+                "INSERT INTO listing_fts (rowid, title, description) "
+                "SELECT id, title, description FROM listing"
+            )
+        )
+    elif conn.dialect.name == "postgresql":
+        conn.execute(
+            sa.text(
+                "CREATE TABLE IF NOT EXISTS listing_search ("
+                "listing_id INTEGER PRIMARY KEY "
+                "REFERENCES listing (id) ON DELETE CASCADE, "
+                "document TSVECTOR NOT NULL)"
+            )
+        )
+        conn.execute(
+            sa.text(
+                "CREATE INDEX IF NOT EXISTS ix_listing_search_document "
+                "ON listing_search USING GIN (document)"
+            )
+        )
+        conn.execute(
+            sa.text(
+                "INSERT INTO listing_search (listing_id, document) "
+                "SELECT id, "
+                "setweight(to_tsvector('simple', title), 'A') || "
+                "setweight(to_tsvector('simple', description), 'B') "
+                "FROM listing "
+                "ON CONFLICT (listing_id) DO UPDATE SET document = EXCLUDED.document"
+            )
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        conn.execute(sa.text("DROP TABLE IF EXISTS listing_fts"))
+    elif conn.dialect.name == "postgresql":
+        conn.execute(sa.text("DROP TABLE IF EXISTS listing_search"))
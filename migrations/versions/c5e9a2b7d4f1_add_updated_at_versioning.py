@@ -0,0 +1,61 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add category.updated_at and cache_generation.updated_at, and seed the global
+"content" generation.
+
+Existing categories and counters are backfilled with the migration time (no
+earlier change time is known). The "content" counter starts above any value a
+worker may have cached under the implicit 0.
+
+Revision ID: c5e9a2b7d4f1
+Revises: b4d8f1a6c3e9
+Create Date: 2026-10-18
+"""
+
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "c5e9a2b7d4f1"
+down_revision = "b4d8f1a6c3e9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for table_name in ("category", "cache_generation"):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+        table = sa.table(table_name, sa.column("updated_at", sa.DateTime()))
+        op.execute(table.update().values(updated_at=now))
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.alter_column(
+                "updated_at", existing_type=sa.DateTime(), nullable=False
+            )
+
+    conn = op.get_bind()
+    exists = conn.execute(
+        sa.text("SELECT 1 FROM cache_generation WHERE name = 'content'")
+    ).first()
+    if exists is None:
+        conn.execute(
+            sa.text(
+                "INSERT INTO cache_generation (name, value, updated_at) "
+                "VALUES ('content', 1, :now)"
+            ),
+            {"now": now},
+        )
+
+
+def downgrade():
+    for table_name in ("cache_generation", "category"):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column("updated_at")
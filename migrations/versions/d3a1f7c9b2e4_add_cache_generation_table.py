@@ -0,0 +1,45 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add cache_generation table for invalidating in-process caches.
+
+Each row is a named counter (e.g. "category_tree") bumped in the same
+transaction as the writes it tracks. Worker processes compare it against
+the generation their cached snapshot was built from.
+
+Revision ID: d3a1f7c9b2e4
+Revises: c2b7f4d1a9e0
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "d3a1f7c9b2e4"
+down_revision = "c2b7f4d1a9e0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "cache_generation",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+    # Seed the category tree counter so bumps are plain UPDATEs
+    conn = op.get_bind()
+    conn.execute(
+        sa.text("INSERT INTO cache_generation (name, value) VALUES ('category_tree', 1)")
+    )
+
+
+def downgrade():
+    op.drop_table("cache_generation")
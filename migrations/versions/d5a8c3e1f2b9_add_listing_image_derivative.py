@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add listing_image_derivative table for responsive image sizes.
+
+Revision ID: d5a8c3e1f2b9
+Revises: c4f9a2d7e1b8
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "d5a8c3e1f2b9"
+down_revision = "c4f9a2d7e1b8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "listing_image_derivative",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("image_id", sa.Integer(), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("format", sa.String(length=8), nullable=False),
+        sa.Column("filename", sa.String(length=256), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["image_id"],
+            ["listing_image.id"],
+            name="fk_listingimagederivative_image_id",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "image_id", "width", "format", name="uq_listingimagederivative_variant"
+        ),
+    )
+    with op.batch_alter_table("listing_image_derivative", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_listing_image_derivative_image_id"), ["image_id"]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("listing_image_derivative", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_listing_image_derivative_image_id"))
+    op.drop_table("listing_image_derivative")
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add job.subject_id (the row a job acts on) with an index on (kind, subject_id),
+so the admin users page looks up deletion jobs by user id in SQL.
+
+Existing user deletion jobs are backfilled from their payload.
+
+Revision ID: d8f4b1e6a3c2
+Revises: c5e9a2b7d4f1
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "d8f4b1e6a3c2"
+down_revision = "c5e9a2b7d4f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("job", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("subject_id", sa.Integer(), nullable=True))
+        batch_op.create_index(
+            "ix_job_kind_subject_id", ["kind", "subject_id"], unique=False
+        )
+
+    job = sa.table(
+        "job",
+        sa.column("id", sa.Integer()),
+        sa.column("kind", sa.String()),
+        sa.column("payload", sa.JSON()),
+        sa.column("subject_id", sa.Integer()),
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(job.c.id, job.c.payload).where(job.c.kind == "delete_user")
+    ).all()
+    for row in rows:
+        user_id = (row.payload or {}).get("user_id")
+        if user_id is not None:
+            connection.execute(
+                job.update().where(job.c.id == row.id).values(subject_id=user_id)
+            )
+
+
+def downgrade():
+    with op.batch_alter_table("job", schema=None) as batch_op:
+        batch_op.drop_index("ix_job_kind_subject_id")
+        batch_op.drop_column("subject_id")
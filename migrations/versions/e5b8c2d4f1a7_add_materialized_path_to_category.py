@@ -0,0 +1,67 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add materialized path column to Category and backfill it.
+
+The path lists ancestor IDs from the root down to the category itself,
+e.g. "/1/5/9/". It turns descendant lookups, subtree listing filters and
+cycle checks into single indexed queries.
+
+Revision ID: e5b8c2d4f1a7
+Revises: d3a1f7c9b2e4
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "e5b8c2d4f1a7"
+down_revision = "d3a1f7c9b2e4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("category", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("path", sa.String(length=1024), nullable=True))
+        batch_op.create_index("ix_category_path", ["path"])
+
+    # Backfill: walk each category's parent chain in Python.
+    # Categories caught in a (legacy) cycle get a path rooted at themselves.
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, parent_id FROM category")).fetchall()
+    parent_of = {row.id: row.parent_id for row in rows}
+
+    for category_id in parent_of:
+        chain = [category_id]
+        visited = {category_id}
+        parent_id = parent_of[category_id]
+        while parent_id is not None and parent_id in parent_of:
+            if parent_id in visited:
+                break
+            visited.add(parent_id)
+            chain.insert(0, parent_id)
+            parent_id = parent_of[parent_id]
+        path = "/" + "/".join(str(cid) for cid in chain) + "/"
+        conn.execute(
+            sa.text("UPDATE category SET path = :path WHERE id = :id"),
+            {"path": path, "id": category_id},
+        )
+
+    # Paths changed the category hierarchy data; invalidate cached trees
+    conn.execute(
+        sa.text(
+            "UPDATE cache_generation SET value = value + 1 WHERE name = 'category_tree'"
+        )
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("category", schema=None) as batch_op:
+        batch_op.drop_index("ix_category_path")
+        batch_op.drop_column("path")
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add listing_image.content_hash for content-addressed, deduplicated image files.
+
+Existing rows keep their random filenames and a NULL hash: their files are
+not shared, so they are deleted with their image as before.
+
+Revision ID: e6b2d9f4a1c7
+Revises: d5a8c3e1f2b9
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "e6b2d9f4a1c7"
+down_revision = "d5a8c3e1f2b9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("listing_image", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("content_hash", sa.String(length=64), nullable=True)
+        )
+        batch_op.create_index(
+            batch_op.f("ix_listing_image_content_hash"), ["content_hash"]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("listing_image", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_listing_image_content_hash"))
+        batch_op.drop_column("content_hash")
@@ -0,0 +1,44 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Seed the "media" cache generation, whose row lock serializes uploads with the
+file reaper. Seeding it up front keeps the first two writers from racing to
+insert it.
+
+Revision ID: e9a2c5f8b4d7
+Revises: d8f4b1e6a3c2
+Create Date: 2026-10-18
+"""
+
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "e9a2c5f8b4d7"
+down_revision = "d8f4b1e6a3c2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    exists = conn.execute(
+        sa.text("SELECT 1 FROM cache_generation WHERE name = 'media'")
+    ).first()
+    if exists is None:
+        conn.execute(
+            sa.text(
+                "INSERT INTO cache_generation (name, value, updated_at) "
+                "VALUES ('media', 1, :now)"
+            ),
+            {"now": datetime.now(timezone.utc).replace(tzinfo=None)},
+        )
+
+
+def downgrade():
+    op.execute(sa.text("DELETE FROM cache_generation WHERE name = 'media'"))
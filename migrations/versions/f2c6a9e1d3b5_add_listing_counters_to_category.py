@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add denormalized listing counters to Category and backfill them.
+
+direct_listing_count counts listings in the category itself;
+subtree_listing_count also includes every descendant category.
+Both are kept current by ORM events on Listing afterwards.
+
+Revision ID: f2c6a9e1d3b5
+Revises: e5b8c2d4f1a7
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "f2c6a9e1d3b5"
+down_revision = "e5b8c2d4f1a7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("category", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "direct_listing_count",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+        batch_op.add_column(
+            sa.Column(
+                "subtree_listing_count",
+                sa.Integer(),
+                nullable=False,
+                server_default="0",
+            )
+        )
+        batch_op.create_index(
+            "ix_category_direct_listing_count", ["direct_listing_count"]
+        )
+
+    # Backfill from the listing table (relies on category.path from e5b8c2d4f1a7)
+    conn = op.get_bind()
+    conn.execute(
+        sa.text(
+            """
+            UPDATE category
+            SET direct_listing_count = (
+                SELECT COUNT(*) FROM listing WHERE listing.category_id = category.id
+            )
+            """
+        )
+    )
+    conn.execute(
+        sa.text(
+            """
+            UPDATE category
+            SET subtree_listing_count = (
+                SELECT COUNT(*)
+                FROM listing
+                JOIN category AS sub ON sub.id = listing.category_id
+                WHERE sub.path >= category.path
+                  AND sub.path < substr(category.path, 1, length(category.path) - 1) || '0'
+            )
+            """
+        )
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("category", schema=None) as batch_op:
+        batch_op.drop_index("ix_category_direct_listing_count")
+        batch_op.drop_column("subtree_listing_count")
+        batch_op.drop_column("direct_listing_count")
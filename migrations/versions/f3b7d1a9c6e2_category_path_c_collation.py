@@ -0,0 +1,47 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Give category.path the "C" (byte-order) collation on PostgreSQL.
+
+Subtree queries are half-open ranges over the path ("/1/5/" up to "/1/50"),
+which only hold when "/" sorts right below the digits. Locale collations such
+as en_US.UTF-8 do not guarantee that. SQLite compares text bytewise already
+and is left alone.
+
+Revision ID: f3b7d1a9c6e2
+Revises: e9a2c5f8b4d7
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "f3b7d1a9c6e2"
+down_revision = "e9a2c5f8b4d7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        # Changing the collation rebuilds ix_category_path with it
+        op.alter_column(
+            "category",
+            "path",
+            type_=sa.String(length=1024, collation="C"),
+            existing_nullable=True,
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            "category",
+            "path",
+            type_=sa.String(length=1024),
+            existing_nullable=True,
+        )
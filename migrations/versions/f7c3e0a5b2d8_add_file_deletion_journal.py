@@ -0,0 +1,37 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Add the file_deletion journal for deferred, batched image file deletes.
+
+Revision ID: f7c3e0a5b2d8
+Revises: e6b2d9f4a1c7
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "f7c3e0a5b2d8"
+down_revision = "e6b2d9f4a1c7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "file_deletion",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("area", sa.String(length=16), nullable=False),
+        sa.Column("name", sa.String(length=256), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("file_deletion")
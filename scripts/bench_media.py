@@ -0,0 +1,75 @@
+# SPDX-License-Identifier: GPL-2.0-only
+# Copyright (c) 2025 Fernando "ferabreu" Mees Abreu
+#
+# Licensed under the GNU General Public License v2.0 (GPL-2.0-only).
+# See LICENSE file in the project root for full license information.
+#
+"""
+Benchmark of the worker time spent per media request.
+
+Serves the same image through /media/<area>/<name> in each MEDIA_SEND_MODE
+and reports the mean time the WSGI app takes per request, including reading
+the response body (what a worker is busy with). With "x-accel-redirect" and
+"x-sendfile" the worker only emits a header, so the time no longer grows with
+the file size. Also shows the cost of a revalidation (If-None-Match -> 304).
+Requests go through the in-process test client, so these are lower bounds: over
+a real socket a "flask" worker is held for the whole transfer to the client.
+
+Usage:
+    uv run python scripts/bench_media.py [--requests 500] [--size 1600]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from app import create_app
+from app.config import TestingConfig
+from app.models import db
+
+
+def _time_requests(client, url, count, headers=None):
+    started = time.perf_counter()
+    for _ in range(count):
+        response = client.get(url, headers=headers)
+        response.get_data()
+        response.close()
+    return (time.perf_counter() - started) / count
+
+
+def run_benchmark(requests, size):
+    app = create_app(TestingConfig)
+    with tempfile.TemporaryDirectory() as tmp, app.app_context():
+        db.create_all()
+        app.config["UPLOAD_DIR"] = tmp
+        name = "ab" * 32 + ".jpg"
+        path = os.path.join(tmp, name)
+        Image.effect_noise((size, size * 3 // 4), 64).convert("RGB").save(
+            path, "JPEG", quality=90
+        )
+        url = f"/media/uploads/{name}"
+        etag = f'"{name[:-4]}"'
+        client = app.test_client()
+        print(f"Image: {os.path.getsize(path) / 1024:.0f} KiB, {requests} requests")
+        print(f"{'mode':<18}{'full GET':>14}{'304':>14}")
+        for mode in ("flask", "x-accel-redirect", "x-sendfile"):
+            app.config["MEDIA_SEND_MODE"] = mode
+            client.get(url).close()  # warm up
+            full = _time_requests(client, url, requests)
+            revalidated = _time_requests(
+                client, url, requests, headers={"If-None-Match": etag}
+            )
+            print(
+                f"{mode:<18}{full * 1e6:>11.0f} us{revalidated * 1e6:>11.0f} us"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--size", type=int, default=1600, help="Image width")
+    args = parser.parse_args()
+    run_benchmark(args.requests, args.size)
@@ -1,4 +1,8 @@
+import io
+
 import pytest
+from PIL import Image
+from sqlalchemy import event
 
 from app import create_app, db
 from app.config import TestingConfig
@@ -25,6 +29,101 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture()
+def query_recorder(app):
+    """
+    Record every SQL statement sent to the test database.
+
+    Yields a list that fills up as statements execute; clear() it
+    before the part of the test you want to measure.
+    """
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture()
+def media_dirs(app, tmp_path):
+    """Point the upload, temp, thumbnail and derivative dirs at tmp_path."""
+    for key in ("UPLOAD_DIR", "TEMP_DIR", "THUMBNAIL_DIR", "DERIVATIVE_DIR"):
+        path = tmp_path / key.lower()
+        path.mkdir()
+        app.config[key] = str(path)
+    return tmp_path
+
+
+@pytest.fixture()
+def png():
+    """
+    Factory for in-memory PNG files, rewound and ready to upload:
+    png(size=(640, 480), color="red", mode="RGB").
+    """
+
+    def _png(size=(640, 480), color="red", mode="RGB"):
+        buffer = io.BytesIO()
+        Image.new(mode, size, color=color).save(buffer, "PNG")
+        buffer.seek(0)
+        return buffer
+
+    return _png
+
+
+@pytest.fixture()
+def login(client):
+    """Log the test client in as a user dict from the user/admin_user fixtures."""
+
+    def _login(user):
+        # Not following the redirect: requests share the test's app context,
+        # and rendering a page here would memoize the category tree on g
+        # before later fixtures add categories
+        response = client.post(
+            "/auth/login",
+            data={"email": user["email"], "password": user["password"]},
+        )
+        assert response.status_code == 302
+
+    return _login
+
+
+@pytest.fixture()
+def logged_in_client(client, user, login):
+    """The test client, logged in as the user fixture."""
+    login(user)
+    return client
+
+
+@pytest.fixture()
+def post_listing(client, png):
+    """
+    Post the new-listing form with one image and return the response.
+
+    post_listing(category, image=None, filename="photo.png", title="Red bicycle")
+    uploads a fresh 640x480 PNG unless `image` (a file object) is given.
+    Log in first, e.g. with the logged_in_client fixture.
+    """
+
+    def _post_listing(category, image=None, filename="photo.png", title="Red bicycle"):
+        return client.post(
+            "/new",
+            data={
+                "title": title,
+                "description": "A red bicycle in good shape.",
+                "price": "50",
+                "category": str(category["id"]),
+                "images": [(image if image is not None else png(), filename)],
+            },
+            content_type="multipart/form-data",
+        )
+
+    return _post_listing
+
+
 @pytest.fixture()
 def user(app):
     with app.app_context():
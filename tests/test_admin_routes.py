@@ -17,3 +17,77 @@ def test_admin_users_requires_admin(client, user):
     response = client.get(url_for("admin.dashboard"))
     # Should redirect or forbid for non-admin depending on decorator behavior
     assert response.status_code in (302, 403)
+
+
+def _login_admin(client, admin_user):
+    client.post(
+        "/auth/login",
+        data={"email": admin_user["email"], "password": admin_user["password"]},
+        follow_redirects=True,
+    )
+
+
+def test_admin_categories_subtree_counts(client, admin_user, category_with_children):
+    _login_admin(client, admin_user)
+
+    response = client.get("/admin/categories")
+
+    assert response.status_code == 200
+    html = response.data.decode()
+    parent_id = category_with_children["parent"]["id"]
+    musical_id = category_with_children["musical"]["id"]
+    appliances_id = category_with_children["appliances"]["id"]
+    # Goods: 2 direct + 5 in Musical Instruments
+    assert f'value="{parent_id}" data-listing-count="7"' in html
+    assert f'value="{musical_id}" data-listing-count="5"' in html
+    assert f'value="{appliances_id}" data-listing-count="0"' in html
+
+
+def test_admin_categories_constant_queries(
+    app, client, admin_user, category_with_children, query_recorder
+):
+    _login_admin(client, admin_user)
+    client.get("/admin/categories")
+    query_recorder.clear()
+    client.get("/admin/categories")
+    baseline = len(query_recorder)
+
+    # Add more categories (with listings) and check the query count holds
+    from app import db
+    from app.models import Category, Listing
+
+    with app.app_context():
+        for index in range(10):
+            extra = Category(
+                name=f"Extra {index}",
+                parent_id=category_with_children["parent"]["id"],
+            )
+            db.session.add(extra)
+            db.session.flush()
+            db.session.add(
+                Listing("Extra", "desc", 1.0, admin_user["id"], extra.id)
+            )
+        db.session.commit()
+
+    client.get("/admin/categories")
+    query_recorder.clear()
+    client.get("/admin/categories")
+
+    assert len(query_recorder) == baseline
+
+
+def test_admin_listings_keyset_and_sorted_pages(
+    app, client, admin_user, category_with_children, query_recorder
+):
+    _login_admin(client, admin_user)
+    app.config["LISTING_PAGINATION_MODE"] = "keyset"
+
+    query_recorder.clear()
+    response = client.get("/admin/listings")
+    assert response.status_code == 200
+    # The total comes from the category counters, not COUNT(*) over listings
+    assert not any("count(" in statement.lower() for statement in query_recorder)
+
+    # Sorting by another column falls back to numbered pages
+    response = client.get("/admin/listings?sort=title&direction=asc")
+    assert response.status_code == 200
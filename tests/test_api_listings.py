@@ -0,0 +1,128 @@
+"""
+Tests for the JSON listings API.
+
+Tests cover:
+- Listing pages are newest first and walk with keyset cursors
+- ?category= restricts to a category subtree (by id or path)
+- ?fields= selects fields; description and images are only loaded on request
+- The detail endpoint, JSON errors and unknown fields
+- Responses are gzip-compressed when accepted
+"""
+
+import gzip
+import json
+
+from app import db
+from app.models import Listing, ListingImage, ListingImageDerivative
+
+
+def _get(client, url, **kwargs):
+    response = client.get(url, **kwargs)
+    return response, response.get_json()
+
+
+def test_pages_walk_with_cursors(client, category_with_children):
+    ids = []
+    url = "/api/listings?limit=3"
+    while url:
+        response, data = _get(client, url)
+        assert response.status_code == 200
+        assert len(data["items"]) <= 3
+        ids += [item["id"] for item in data["items"]]
+        cursor = data["next_cursor"]
+        url = f"/api/listings?limit=3&after={cursor}" if cursor else None
+
+    expected = db.session.execute(
+        db.select(Listing.id).order_by(Listing.created_at.desc(), Listing.id.desc())
+    ).scalars().all()
+    assert ids == expected
+    assert len(ids) == 7
+
+
+def test_category_subtree_filter(client, category_with_children):
+    parent = category_with_children["parent"]
+    musical = category_with_children["musical"]
+
+    _, by_id = _get(client, f"/api/listings?category={parent['id']}&limit=50")
+    _, by_path = _get(client, "/api/listings?category=goods/musical-instruments")
+
+    assert len(by_id["items"]) == 7
+    assert {item["category_id"] for item in by_path["items"]} == {musical["id"]}
+    assert len(by_path["items"]) == 5
+    response, error = _get(client, "/api/listings?category=nowhere")
+    assert response.status_code == 404
+    assert "nowhere" in error["error"]
+
+
+def test_sparse_fields_skip_description_and_images(
+    client, category_with_children, query_recorder
+):
+    _, data = _get(client, "/api/listings?fields=id,title")
+
+    assert set(data["items"][0]) == {"id", "title"}
+    assert not any("listing_image" in query for query in query_recorder)
+    assert not any("description" in query for query in query_recorder)
+
+    response, error = _get(client, "/api/listings?fields=id,password_hash")
+    assert response.status_code == 400
+    assert "password_hash" in error["error"]
+
+
+def test_listing_detail(client, category_with_children):
+    listing = db.session.execute(db.select(Listing)).scalars().first()
+    image = ListingImage(
+        filename="c" * 64 + ".jpg",
+        listing_id=listing.id,
+        thumbnail_filename="c" * 64 + "-224x224.jpg",
+        content_hash="c" * 64,
+    )
+    db.session.add(image)
+    db.session.flush()
+    db.session.add(
+        ListingImageDerivative(
+            image_id=image.id,
+            width=320,
+            height=240,
+            format="webp",
+            filename="c" * 64 + "-320w.webp",
+        )
+    )
+    db.session.commit()
+
+    response, data = _get(client, f"/api/listings/{listing.id}")
+
+    assert response.status_code == 200
+    assert data["description"] == listing.description
+    assert data["category_path"] == "goods"
+    assert data["url"].endswith(f"/listing/{listing.id}")
+    assert data["thumbnail"].endswith("/media/thumbnails/" + "c" * 64 + "-224x224.jpg")
+    assert data["images"][0]["derivatives"] == [
+        {
+            "width": 320,
+            "height": 240,
+            "format": "webp",
+            "url": "http://localhost/media/derivatives/" + "c" * 64 + "-320w.webp",
+        }
+    ]
+
+    response, error = _get(client, "/api/listings/9999")
+    assert response.status_code == 404
+    assert error == {"error": "Listing not found."}
+
+
+def test_invalid_cursor(client, category_with_children):
+    response, _ = _get(client, "/api/listings?after=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_gzip_compression(client, category_with_children):
+    plain = client.get("/api/listings?fields=id,title,description")
+    compressed = client.get(
+        "/api/listings?fields=id,title,description",
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert json.loads(gzip.decompress(compressed.data)) == plain.get_json()
@@ -0,0 +1,102 @@
+"""
+Tests for the batched, resumable thumbnail backfill command.
+
+Tests cover:
+- Missing thumbnails are created in committed batches (also with a process pool)
+- An interrupted run resumes after its checkpoint
+- --regenerate replaces existing thumbnails and deletes the old files
+"""
+
+import os
+
+from PIL import Image
+
+from app import db
+from app.cli.maintenance import _write_checkpoint, run_backfill_thumbnails
+from app.models import ListingImage
+
+
+def _add_images(app, listing_id, count, missing=()):
+    image_ids = []
+    for i in range(count):
+        filename = f"original-{i}.png"
+        if i not in missing:
+            Image.new("RGB", (400, 300), color="green").save(
+                os.path.join(app.config["UPLOAD_DIR"], filename)
+            )
+        image = ListingImage(filename=filename, listing_id=listing_id)
+        db.session.add(image)
+        db.session.flush()
+        image_ids.append(image.id)
+    db.session.commit()
+    return image_ids
+
+
+def _thumbnails():
+    return dict(
+        db.session.execute(
+            db.select(ListingImage.id, ListingImage.thumbnail_filename)
+        ).all()
+    )
+
+
+def test_backfill_in_batches(app, listing, media_dirs, tmp_path, capsys):
+    image_ids = _add_images(app, listing["id"], 5, missing={3})
+    checkpoint = tmp_path / "backfill.checkpoint"
+
+    run_backfill_thumbnails(workers=1, batch_size=2, checkpoint_path=str(checkpoint))
+
+    output = capsys.readouterr().out
+    assert "Processed 2 images" in output and "Processed 5 images" in output
+    assert "Successfully processed: 4" in output
+    assert "Errors: 1" in output
+    thumbnails = _thumbnails()
+    assert thumbnails[image_ids[3]] is None
+    assert all(thumbnails[i] for i in image_ids if i != image_ids[3])
+    assert sorted(os.listdir(app.config["THUMBNAIL_DIR"])) == sorted(
+        t for t in thumbnails.values() if t
+    )
+    assert not checkpoint.exists()
+
+
+def test_backfill_with_process_pool(app, listing, media_dirs, tmp_path):
+    image_ids = _add_images(app, listing["id"], 4)
+
+    run_backfill_thumbnails(
+        workers=2, batch_size=3, checkpoint_path=str(tmp_path / "checkpoint")
+    )
+
+    thumbnails = _thumbnails()
+    for image_id in image_ids:
+        path = os.path.join(app.config["THUMBNAIL_DIR"], thumbnails[image_id])
+        with Image.open(path) as thumbnail:
+            assert thumbnail.size == tuple(app.config["THUMBNAIL_SIZE"])
+
+
+def test_backfill_resumes_from_checkpoint(app, listing, media_dirs, tmp_path, capsys):
+    image_ids = _add_images(app, listing["id"], 4)
+    checkpoint = tmp_path / "backfill.checkpoint"
+    _write_checkpoint(str(checkpoint), image_ids[1], regenerate=False)
+
+    run_backfill_thumbnails(workers=1, batch_size=10, checkpoint_path=str(checkpoint))
+
+    assert f"Resuming after image id {image_ids[1]}" in capsys.readouterr().out
+    thumbnails = _thumbnails()
+    assert [bool(thumbnails[i]) for i in image_ids] == [False, False, True, True]
+
+    # With --restart the checkpoint is ignored (and a finished run leaves none)
+    run_backfill_thumbnails(workers=1, checkpoint_path=str(checkpoint), restart=True)
+    assert all(_thumbnails().values())
+
+
+def test_regenerate_replaces_thumbnails(app, listing, media_dirs, tmp_path):
+    image_ids = _add_images(app, listing["id"], 2)
+    checkpoint = str(tmp_path / "checkpoint")
+    run_backfill_thumbnails(workers=1, checkpoint_path=checkpoint)
+    before = _thumbnails()
+
+    run_backfill_thumbnails(workers=1, regenerate=True, checkpoint_path=checkpoint)
+
+    after = _thumbnails()
+    assert all(after[i] and after[i] != before[i] for i in image_ids)
+    assert sorted(os.listdir(app.config["THUMBNAIL_DIR"])) == sorted(after.values())
@@ -0,0 +1,151 @@
+"""
+Tests for the materialized path on Category.
+
+Tests cover:
+- Path assignment on insert (including parent and child in the same flush)
+- Subtree moves rewrite descendant paths in one statement
+- Descendant lookups and cycle checks run as single queries
+- The path column compares bytewise (C collation on PostgreSQL)
+"""
+
+import re
+
+import pytest
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.schema import CreateTable
+
+from app import db
+from app.models import Category, Listing
+
+SUBTREE_UPDATE = re.compile(r"^UPDATE category SET path=.*substr")
+
+
+@pytest.fixture()
+def deep_tree(app):
+    """Create A -> B -> C -> D plus an unrelated root E. Returns IDs."""
+    with app.app_context():
+        a = Category(name="A", url_name="a")
+        db.session.add(a)
+        db.session.flush()
+        b = Category(name="B", url_name="b", parent_id=a.id)
+        db.session.add(b)
+        db.session.flush()
+        c = Category(name="C", url_name="c", parent_id=b.id)
+        db.session.add(c)
+        db.session.flush()
+        d = Category(name="D", url_name="d", parent_id=c.id)
+        e = Category(name="E", url_name="e")
+        db.session.add_all([d, e])
+        db.session.commit()
+        return {"a": a.id, "b": b.id, "c": c.id, "d": d.id, "e": e.id}
+
+
+def test_paths_assigned_on_insert(app, deep_tree):
+    with app.app_context():
+        d = db.session.get(Category, deep_tree["d"])
+        ids = deep_tree
+        assert d.path == f"/{ids['a']}/{ids['b']}/{ids['c']}/{ids['d']}/"
+        assert db.session.get(Category, ids["e"]).path == f"/{ids['e']}/"
+
+
+def test_path_assigned_when_parent_in_same_flush(app):
+    with app.app_context():
+        parent = Category(name="Parent", url_name="parent")
+        child = Category(name="Child", url_name="child")
+        child.parent = parent
+        db.session.add_all([parent, child])
+        db.session.commit()
+
+        assert child.path == f"/{parent.id}/{child.id}/"
+
+
+def test_descendant_ids_single_query(app, deep_tree, query_recorder):
+    with app.app_context():
+        b = db.session.get(Category, deep_tree["b"])
+        query_recorder.clear()
+
+        descendant_ids = b.get_descendant_ids()
+
+        assert descendant_ids == [deep_tree["b"], deep_tree["c"], deep_tree["d"]]
+        assert len(query_recorder) == 1
+
+
+def test_subtree_filter_for_listings(app, deep_tree, user):
+    with app.app_context():
+        db.session.add_all(
+            [
+                Listing("In D", "desc", 1.0, user["id"], deep_tree["d"]),
+                Listing("In E", "desc", 1.0, user["id"], deep_tree["e"]),
+            ]
+        )
+        db.session.commit()
+        b = db.session.get(Category, deep_tree["b"])
+
+        titles = db.session.execute(
+            db.select(Listing.title).where(
+                Listing.category_id.in_(b.subtree_ids_select())
+            )
+        ).scalars().all()
+
+        assert titles == ["In D"]
+
+
+def test_move_subtree_rewrites_descendant_paths(app, deep_tree, query_recorder):
+    with app.app_context():
+        b = db.session.get(Category, deep_tree["b"])
+        query_recorder.clear()
+
+        b.parent_id = deep_tree["e"]
+        db.session.commit()
+
+        ids = deep_tree
+        d = db.session.get(Category, ids["d"])
+        assert d.path == f"/{ids['e']}/{ids['b']}/{ids['c']}/{ids['d']}/"
+        # One UPDATE for the whole subtree, regardless of its size
+        assert len([s for s in query_recorder if SUBTREE_UPDATE.match(s)]) == 1
+
+
+def test_cycle_check_uses_parent_path(app, deep_tree, query_recorder):
+    with app.app_context():
+        a = db.session.get(Category, deep_tree["a"])
+        query_recorder.clear()
+
+        assert a.would_create_cycle(deep_tree["d"], db.session) is True
+        assert a.would_create_cycle(deep_tree["e"], db.session) is False
+        assert len(query_recorder) == 2
+
+
+def test_moving_under_descendant_is_rejected(app, deep_tree):
+    with app.app_context():
+        a = db.session.get(Category, deep_tree["a"])
+        a.parent_id = deep_tree["c"]
+
+        with pytest.raises(ValueError, match="cycle"):
+            db.session.flush()
+        db.session.rollback()
+
+
+def test_swapping_parents_in_one_flush_is_allowed(app, deep_tree):
+    with app.app_context():
+        a = db.session.get(Category, deep_tree["a"])
+        b = db.session.get(Category, deep_tree["b"])
+        # B becomes a root and A moves under it, in a single flush
+        b.parent_id = None
+        a.parent_id = deep_tree["b"]
+        db.session.commit()
+
+        ids = deep_tree
+        assert db.session.get(Category, ids["a"]).path == f"/{ids['b']}/{ids['a']}/"
+
+
+@pytest.mark.parametrize(
+    "dialect, collate", [(postgresql.dialect(), 'COLLATE "C"'), (sqlite.dialect(), None)]
+)
+def test_path_column_compares_bytewise(dialect, collate):
+    # subtree_clause ranges assume "/" sorts right below "0"
+    ddl = str(CreateTable(Category.__table__).compile(dialect=dialect))
+    path_column = next(line for line in ddl.splitlines() if "path VARCHAR" in line)
+    if collate:
+        assert collate in path_column
+    else:
+        assert "COLLATE" not in path_column
@@ -0,0 +1,113 @@
+"""
+Tests for the in-process category tree snapshot.
+
+Tests cover:
+- Path resolution, breadcrumbs, full paths and descendant sets from the snapshot
+- Rebuild only after a category write bumps the stored generation
+- Category browsing without per-request category table loads
+"""
+
+import re
+
+from app import db
+from app.category_tree import get_category_tree
+from app.models import CATEGORY_TREE_GENERATION, Category, get_cache_generation
+
+CATEGORY_QUERY = re.compile(r"\bFROM category\b")
+
+
+def test_tree_resolves_paths_and_descendants(app, category_with_children):
+    with app.app_context():
+        tree = get_category_tree()
+        node = tree.resolve_path("goods/musical-instruments")
+
+        assert node is not None
+        assert node.id == category_with_children["musical"]["id"]
+        assert node.url_path == "goods/musical-instruments"
+        assert node.get_full_path() == "Goods > Musical Instruments"
+        assert [cat.name for cat in node.breadcrumb] == [
+            "Goods",
+            "Musical Instruments",
+        ]
+
+        parent = tree.get(category_with_children["parent"]["id"])
+        assert parent.get_descendant_ids()[0] == parent.id
+        assert set(parent.get_descendant_ids()) == {
+            category_with_children["parent"]["id"],
+            category_with_children["musical"]["id"],
+            category_with_children["appliances"]["id"],
+        }
+        assert [child.name for child in parent.children] == [
+            "Home Appliances",
+            "Musical Instruments",
+        ]
+        assert tree.resolve_path("goods/unknown") is None
+
+
+def test_category_write_bumps_generation_and_rebuilds(app, category):
+    with app.app_context():
+        tree = get_category_tree()
+        generation = get_cache_generation(db.session, CATEGORY_TREE_GENERATION)
+        assert tree.generation == generation
+
+        db.session.add(Category(name="Books", url_name="books"))
+        db.session.commit()
+
+        assert (
+            get_cache_generation(db.session, CATEGORY_TREE_GENERATION)
+            == generation + 1
+        )
+        rebuilt = get_category_tree()
+        assert rebuilt is not tree
+        assert rebuilt.resolve_path("books") is not None
+
+
+def test_rolled_back_write_keeps_generation(app, category):
+    with app.app_context():
+        generation = get_cache_generation(db.session, CATEGORY_TREE_GENERATION)
+        db.session.add(Category(name="Books", url_name="books"))
+        db.session.flush()
+        db.session.rollback()
+
+        assert get_cache_generation(db.session, CATEGORY_TREE_GENERATION) == generation
+
+
+def test_from_path_uses_snapshot(app, category_with_children, query_recorder):
+    with app.app_context():
+        get_category_tree()
+        query_recorder.clear()
+
+        resolved = Category.from_path("goods/home-appliances")
+
+        assert resolved.id == category_with_children["appliances"]["id"]
+        # Only the primary-key load of the matched row, no table scan
+        assert len([s for s in query_recorder if CATEGORY_QUERY.search(s)]) <= 1
+
+
+def test_category_page_skips_tree_queries(client, category_with_children, query_recorder):
+    path = "goods/musical-instruments"
+    assert client.get(f"/{path}").status_code == 200
+    query_recorder.clear()
+
+    response = client.get(f"/{path}")
+
+    assert response.status_code == 200
+    category_queries = [
+        s
+        for s in query_recorder
+        if CATEGORY_QUERY.search(s) and not s.startswith("SELECT category.subtree_listing_count")
+    ]
+    # Path, breadcrumb, sidebar, navbar and descendants all come from the
+    # snapshot (the pagination total is a counter read)
+    assert category_queries == []
+
+
+def test_navbar_adds_no_category_queries(app, client, category_with_children, query_recorder):
+    client.get("/auth/login")
+    query_recorder.clear()
+
+    response = client.get("/auth/login")
+
+    assert response.status_code == 200
+    assert b"Goods" in response.data
+    assert not any(CATEGORY_QUERY.search(s) for s in query_recorder)
@@ -0,0 +1,90 @@
+"""
+Tests for content-addressed, reference-counted image storage.
+
+Tests cover:
+- Identical uploads are stored, thumbnailed and resized once
+- Files are only deleted when the last image using them is deleted
+- The thumbnail backfill creates one thumbnail per distinct content
+"""
+
+import io
+import os
+
+from app import db
+from app.cli.maintenance import run_backfill_thumbnails
+from app.models import Listing, ListingImage
+from app.routes.utils import hash_file
+
+
+def _files(app, key):
+    return sorted(os.listdir(app.config[key]))
+
+
+def test_identical_uploads_share_files(
+    app, logged_in_client, category, media_dirs, post_listing, png
+):
+    data = png(size=(800, 600), color="purple").getvalue()
+    post_listing(category, image=io.BytesIO(data), title="First post")
+    post_listing(category, image=io.BytesIO(data), title="Second post")
+
+    images = db.session.execute(db.select(ListingImage)).scalars().all()
+    assert len(images) == 2
+    first, second = images
+    content_hash = first.content_hash
+    # Named after the content (and the detected format, not the upload name)
+    assert first.filename == second.filename == f"{content_hash}.png"
+    assert _files(app, "UPLOAD_DIR") == [first.filename]
+    assert hash_file(os.path.join(app.config["UPLOAD_DIR"], first.filename)) == content_hash
+    assert first.thumbnail_filename == second.thumbnail_filename
+    assert _files(app, "THUMBNAIL_DIR") == [first.thumbnail_filename]
+    assert {d.filename for d in first.derivatives} == {
+        d.filename for d in second.derivatives
+    }
+    assert len(_files(app, "DERIVATIVE_DIR")) == len(first.derivatives)
+
+
+def test_files_deleted_with_last_reference(
+    app, logged_in_client, category, media_dirs, post_listing, png
+):
+    data = png(size=(800, 600), color="purple").getvalue()
+    post_listing(category, image=io.BytesIO(data), title="First post")
+    post_listing(category, image=io.BytesIO(data), title="Second post")
+    first_id, second_id = db.session.execute(
+        db.select(Listing.id).order_by(Listing.id)
+    ).scalars()
+
+    logged_in_client.post(f"/delete/{first_id}")
+    assert db.session.get(Listing, first_id) is None
+    assert len(_files(app, "UPLOAD_DIR")) == 1
+    assert len(_files(app, "THUMBNAIL_DIR")) == 1
+    assert _files(app, "DERIVATIVE_DIR")
+
+    logged_in_client.post(f"/delete/{second_id}")
+    assert _files(app, "UPLOAD_DIR") == []
+    assert _files(app, "THUMBNAIL_DIR") == []
+    assert _files(app, "DERIVATIVE_DIR") == []
+
+
+def test_backfill_thumbnails_shared_content_once(
+    app, listing, media_dirs, tmp_path, png
+):
+    data = png(size=(800, 600), color="purple").getvalue()
+    content_hash = "ab" * 32
+    filename = f"{content_hash}.png"
+    with open(os.path.join(app.config["UPLOAD_DIR"], filename), "wb") as f:
+        f.write(data)
+    for _ in range(3):
+        db.session.add(
+            ListingImage(
+                filename=filename, listing_id=listing["id"], content_hash=content_hash
+            )
+        )
+    db.session.commit()
+
+    run_backfill_thumbnails(workers=1, checkpoint_path=str(tmp_path / "checkpoint"))
+
+    thumbnails = set(
+        db.session.execute(db.select(ListingImage.thumbnail_filename)).scalars()
+    )
+    assert thumbnails == {f"{content_hash}-224x224.jpg"}
+    assert _files(app, "THUMBNAIL_DIR") == [f"{content_hash}-224x224.jpg"]
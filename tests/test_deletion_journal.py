@@ -0,0 +1,274 @@
+"""
+Tests for bulk listing deletes through the file deletion journal.
+
+Tests cover:
+- Bulk deletes remove rows set-based and keep counters, search and caches in step
+- Single deletes and image removal on edit go through the same journal
+- Files are journaled in the delete transaction and removed by the reaper job
+- An interrupted run leaves the journal to be replayed
+- Content still used by other listings (or uploaded again) is kept
+- An upload of the same bytes racing the reaper keeps its file
+"""
+
+import os
+import threading
+
+from app import create_app, db
+from app.config import TestingConfig
+from app.jobs import run_pending_jobs
+from app.models import (
+    LISTINGS_GENERATION,
+    Category,
+    FileDeletion,
+    Job,
+    Listing,
+    ListingImage,
+    ListingImageDerivative,
+    User,
+    get_cache_generation,
+)
+from app.routes.utils import REAP_FILES_JOB, reap_deleted_files, store_uploads
+from app.search import search_listings
+from app.storage import LocalStorage
+
+
+def _add_listing(app, user_id, category_id, content_hash, title="Old bicycle"):
+    """A listing with one image whose files exist in every storage area."""
+    listing = Listing(
+        title=title,
+        description="Bicycle in good condition.",
+        price=50,
+        user_id=user_id,
+        category_id=category_id,
+    )
+    db.session.add(listing)
+    db.session.flush()
+    image = ListingImage(
+        filename=f"{content_hash}.jpg",
+        listing_id=listing.id,
+        thumbnail_filename=f"{content_hash}-224x224.jpg",
+        content_hash=content_hash,
+    )
+    db.session.add(image)
+    db.session.flush()
+    db.session.add(
+        ListingImageDerivative(
+            image_id=image.id,
+            width=320,
+            height=240,
+            format="jpeg",
+            filename=f"{content_hash}-320w.jpg",
+        )
+    )
+    db.session.commit()
+    for key, name in (
+        ("UPLOAD_DIR", image.filename),
+        ("THUMBNAIL_DIR", image.thumbnail_filename),
+        ("DERIVATIVE_DIR", f"{content_hash}-320w.jpg"),
+    ):
+        with open(os.path.join(app.config[key], name), "wb") as f:
+            f.write(b"image")
+    return listing.id
+
+
+def _files(app):
+    return sorted(
+        name
+        for key in ("UPLOAD_DIR", "THUMBNAIL_DIR", "DERIVATIVE_DIR")
+        for name in os.listdir(app.config[key])
+    )
+
+
+def test_bulk_delete_journals_and_reaps_files(
+    app, client, login, admin_user, user, category, media_dirs
+):
+    ids = [
+        _add_listing(app, user["id"], category["id"], c * 64) for c in "abc"
+    ]
+    generation = get_cache_generation(db.session, LISTINGS_GENERATION)
+    login(admin_user)
+
+    client.post(
+        "/admin/listings/delete_selected",
+        data={"selected_listings": [str(i) for i in ids[:2]]},
+    )
+
+    assert db.session.execute(db.select(Listing.id)).scalars().all() == [ids[2]]
+    assert db.session.execute(db.select(ListingImageDerivative)).all() != []
+    assert db.session.get(Category, category["id"]).subtree_listing_count == 1
+    assert get_cache_generation(db.session, LISTINGS_GENERATION) > generation
+    hits = db.session.execute(search_listings(db.session, "bicycle")).scalars().all()
+    assert [hit.id for hit in hits] == [ids[2]]
+    # JOB_MODE=inline: the reaper already ran
+    assert _files(app) == ["c" * 64 + suffix for suffix in ("-224x224.jpg", "-320w.jpg", ".jpg")]
+    assert db.session.execute(db.select(FileDeletion)).all() == []
+
+
+def test_journal_survives_until_reaper_runs(
+    app, client, login, admin_user, user, category, media_dirs
+):
+    app.config["JOB_MODE"] = "worker"
+    _add_listing(app, user["id"], category["id"], "d" * 64)
+    login(admin_user)
+
+    client.post(f"/admin/users/delete/{user['id']}")
+    # The user deletion job; the reaper job it queues stays pending
+    assert run_pending_jobs(limit=1) == 1
+
+    assert db.session.execute(db.select(Listing)).all() == []
+    # Committed with the delete: files and journal wait for the reaper
+    assert len(_files(app)) == 3
+    journal = db.session.execute(db.select(FileDeletion.area)).scalars().all()
+    assert sorted(journal) == ["derivatives", "thumbnails", "uploads"]
+    assert db.session.execute(
+        db.select(Job).where(Job.kind == REAP_FILES_JOB)
+    ).scalar_one().status == Job.STATUS_PENDING
+
+    run_pending_jobs()
+
+    assert _files(app) == []
+    assert db.session.execute(db.select(FileDeletion)).all() == []
+
+
+def test_shared_and_reuploaded_content_is_kept(
+    app, client, login, admin_user, user, category, media_dirs
+):
+    app.config["JOB_MODE"] = "worker"
+    shared = _add_listing(app, user["id"], category["id"], "e" * 64)
+    _add_listing(app, admin_user["id"], category["id"], "e" * 64)
+    reuploaded = _add_listing(app, user["id"], category["id"], "f" * 64)
+    login(admin_user)
+
+    client.post(
+        "/admin/listings/delete_selected",
+        data={"selected_listings": [str(shared), str(reuploaded)]},
+    )
+    # Still used by the admin's listing: not even journaled
+    names = db.session.execute(db.select(FileDeletion.name)).scalars().all()
+    assert not any(name.startswith("e") for name in names)
+    # The same content is uploaded again before the reaper runs
+    _add_listing(app, admin_user["id"], category["id"], "f" * 64)
+
+    assert reap_deleted_files() == 3
+
+    assert len(_files(app)) == 6
+
+
+def test_single_delete_and_edit_go_through_journal(
+    app, logged_in_client, user, category, media_dirs
+):
+    app.config["JOB_MODE"] = "worker"
+    deleted = _add_listing(app, user["id"], category["id"], "a" * 64)
+    edited = _add_listing(app, user["id"], category["id"], "b" * 64)
+    image_id = db.session.execute(
+        db.select(ListingImage.id).where(ListingImage.listing_id == edited)
+    ).scalar_one()
+
+    logged_in_client.post(f"/delete/{deleted}")
+    logged_in_client.post(
+        f"/edit/{edited}",
+        data={
+            "title": "Old bicycle",
+            "description": "Bicycle in good condition.",
+            "price": "50",
+            "category": str(category["id"]),
+            "delete_images": [str(image_id)],
+        },
+    )
+
+    assert db.session.get(Listing, deleted) is None
+    assert db.session.execute(db.select(ListingImage)).all() == []
+    # Nothing was unlinked in the requests: the reaper owns the files
+    assert len(_files(app)) == 6
+    assert db.session.execute(db.select(FileDeletion)).all() != []
+    # The deleted listing's content is uploaded again before the reaper runs
+    _add_listing(app, user["id"], category["id"], "a" * 64)
+
+    run_pending_jobs()
+
+    assert _files(app) == ["a" * 64 + suffix for suffix in ("-224x224.jpg", "-320w.jpg", ".jpg")]
+    assert db.session.execute(db.select(FileDeletion)).all() == []
+
+
+def test_upload_racing_the_reaper_keeps_its_file(tmp_path, monkeypatch):
+    class RaceConfig(TestingConfig):
+        # A file database: reaper and upload run on their own connections
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'race.db'}"
+        JOB_MODE = "worker"
+
+    app = create_app(RaceConfig)
+    for key in ("UPLOAD_DIR", "TEMP_DIR", "THUMBNAIL_DIR", "DERIVATIVE_DIR"):
+        (tmp_path / key.lower()).mkdir()
+        app.config[key] = str(tmp_path / key.lower())
+    content_hash = "9" * 64
+    name = f"{content_hash}.jpg"
+    with app.app_context():
+        db.create_all()
+        user = User(email="race@classifieds.io", first_name="R", last_name="Ace")
+        user.set_password("password123")
+        category = Category(name="Race", url_name="race")
+        db.session.add_all([user, category])
+        # The last image with this content was deleted: its file is journaled
+        db.session.add(FileDeletion("uploads", name))
+        db.session.commit()
+        user_id, category_id = user.id, category.id
+    (tmp_path / "upload_dir" / name).write_bytes(b"image")
+
+    # The reaper pauses between its in-use check and the file delete
+    reaper_checked = threading.Event()
+    resume_reaper = threading.Event()
+    delete_many = LocalStorage.delete_many
+
+    def _paused_delete_many(self, area, names):
+        reaper_checked.set()
+        resume_reaper.wait(5)
+        delete_many(self, area, names)
+
+    monkeypatch.setattr(LocalStorage, "delete_many", _paused_delete_many)
+
+    def _reap():
+        with app.app_context():
+            reap_deleted_files()
+            db.session.remove()
+
+    def _upload():
+        # The same bytes are uploaded again, as create_listing does
+        with app.app_context():
+            temp_path = tmp_path / "temp_dir" / "upload.jpg"
+            temp_path.write_bytes(b"image")
+            listing = Listing(
+                title="Again",
+                description="Same photo.",
+                price=1,
+                user_id=user_id,
+                category_id=category_id,
+            )
+            db.session.add(listing)
+            db.session.flush()
+            db.session.add(
+                ListingImage(
+                    filename=name, content_hash=content_hash, listing_id=listing.id
+                )
+            )
+            store_uploads([(str(temp_path), name)])
+            db.session.commit()
+            db.session.remove()
+
+    reaper = threading.Thread(target=_reap)
+    reaper.start()
+    assert reaper_checked.wait(5)
+    uploader = threading.Thread(target=_upload)
+    uploader.start()
+    # The upload waits for the media lock the reaper holds
+    uploader.join(0.5)
+    resume_reaper.set()
+    reaper.join(10)
+    uploader.join(10)
+
+    with app.app_context():
+        assert db.session.execute(db.select(ListingImage.filename)).scalars().all() == [
+            name
+        ]
+        assert db.session.execute(db.select(FileDeletion)).all() == []
+        db.session.remove()
+    assert (tmp_path / "upload_dir" / name).read_bytes() == b"image"
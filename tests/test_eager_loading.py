@@ -0,0 +1,91 @@
+"""
+Tests for eager loading of listing card data.
+
+Tests cover:
+- Category grids load every card's images in one extra query
+- Index showcases load images only for the displayed listings
+- The admin listings table joins owners instead of lazy-loading them
+- Statement counts stay flat as the number of listings grows
+"""
+
+import re
+
+import pytest
+
+from app import db
+from app.models import Category, Listing, ListingImage
+
+IMAGE_QUERY = re.compile(r"\bFROM listing_image\b")
+USER_QUERY = re.compile(r"\bFROM \"?user\"?\s")
+
+
+def _add_listings(category_id, user_id, count, start=0):
+    for index in range(start, start + count):
+        listing = Listing(
+            title=f"Camera {index:02d}",
+            description="A camera with a photo.",
+            price=float(index),
+            user_id=user_id,
+            category_id=category_id,
+        )
+        listing.images.append(
+            ListingImage(
+                filename=f"camera-{index}.jpg",
+                listing_id=None,
+                thumbnail_filename=f"camera-{index}_thumb.jpg",
+            )
+        )
+        db.session.add(listing)
+    db.session.commit()
+
+
+@pytest.fixture()
+def cameras(app, user):
+    with app.app_context():
+        category = Category(name="Cameras", url_name="cameras")
+        db.session.add(category)
+        db.session.commit()
+        _add_listings(category.id, user["id"], 6)
+        return {"id": category.id, "user_id": user["id"]}
+
+
+def _measure(client, url, query_recorder):
+    # Start from an empty identity map so nothing is served from earlier loads
+    db.session.expunge_all()
+    query_recorder.clear()
+    response = client.get(url)
+    assert response.status_code == 200
+    return response, list(query_recorder)
+
+
+def test_grid_statement_count_is_flat(app, client, cameras, query_recorder):
+    client.get("/cameras")
+    response, small = _measure(client, "/cameras", query_recorder)
+    assert "camera-0_thumb.jpg" in response.get_data(as_text=True)
+    assert len([s for s in small if IMAGE_QUERY.search(s)]) == 1
+
+    with app.app_context():
+        _add_listings(cameras["id"], cameras["user_id"], 18, start=6)
+    client.get("/cameras")
+    _, full = _measure(client, "/cameras", query_recorder)
+
+    assert len(full) == len(small)
+
+
+def test_showcase_loads_images_in_one_query(app, client, cameras, query_recorder):
+    response, statements = _measure(client, "/", query_recorder)
+    assert "_thumb.jpg" in response.get_data(as_text=True)
+    assert len([s for s in statements if IMAGE_QUERY.search(s)]) == 1
+
+
+def test_admin_listings_join_owner(app, client, admin_user, cameras, query_recorder):
+    client.post(
+        "/auth/login",
+        data={"email": admin_user["email"], "password": admin_user["password"]},
+        follow_redirects=True,
+    )
+    _, statements = _measure(client, "/admin/listings", query_recorder)
+
+    # At most the login user loader; owners come from the listing join
+    assert len([s for s in statements if USER_QUERY.search(s)]) <= 1
+    assert not any(IMAGE_QUERY.search(s) for s in statements)
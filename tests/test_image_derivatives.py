@@ -0,0 +1,101 @@
+"""
+Tests for responsive image derivatives.
+
+Tests cover:
+- The derivatives job writes every width/format without upscaling
+- Cards and the detail page list derivatives in srcset
+- Derivative files are removed with their listing
+"""
+
+import os
+
+from PIL import Image
+
+from app import db
+from app.jobs import run_pending_jobs
+from app.models import ListingImage, ListingImageDerivative
+
+
+def _derivatives():
+    return (
+        db.session.execute(
+            db.select(ListingImageDerivative).order_by(
+                ListingImageDerivative.format, ListingImageDerivative.width
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+
+def test_derivatives_cover_widths_without_upscaling(
+    app, logged_in_client, category, media_dirs, post_listing, png
+):
+    app.config["IMAGE_DERIVATIVE_WIDTHS"] = (320, 640, 1024, 1600)
+    # Translucent: the JPEG derivatives have to drop the alpha channel
+    post_listing(
+        category, image=png(size=(1200, 900), color=(0, 128, 255, 128), mode="RGBA")
+    )
+
+    derivatives = _derivatives()
+    assert [(d.format, d.width) for d in derivatives] == [
+        ("jpeg", 320),
+        ("jpeg", 640),
+        ("jpeg", 1024),
+        ("jpeg", 1200),
+        ("webp", 320),
+        ("webp", 640),
+        ("webp", 1024),
+        ("webp", 1200),
+    ]
+    for derivative in derivatives:
+        path = os.path.join(app.config["DERIVATIVE_DIR"], derivative.filename)
+        with Image.open(path) as img:
+            assert img.format == derivative.format.upper()
+            assert img.size == (derivative.width, derivative.height)
+    assert derivatives[0].height == 240
+
+
+def test_templates_emit_srcset(
+    app, logged_in_client, category, media_dirs, post_listing
+):
+    post_listing(category)
+    image = db.session.execute(db.select(ListingImage)).scalar_one()
+    webp_320 = image.derivatives_for("webp")[0].filename
+
+    page = logged_in_client.get(f"/category/{category['id']}")
+    assert b'<source type="image/webp"' in page.data
+    assert f"/media/derivatives/{webp_320} 320w".encode() in page.data
+
+    detail = logged_in_client.get(f"/listing/{image.listing_id}")
+    largest_jpeg = image.derivatives_for("jpeg")[-1].filename
+    assert f'href="/media/derivatives/{largest_jpeg}"'.encode() in detail.data
+    assert b'sizes="192px"' in detail.data
+
+
+def test_no_srcset_before_derivatives_exist(
+    app, logged_in_client, category, media_dirs, post_listing
+):
+    app.config["JOB_MODE"] = "worker"
+    post_listing(category)
+
+    page = logged_in_client.get(f"/category/{category['id']}")
+    assert b"srcset" not in page.data
+
+    run_pending_jobs()
+    db.session.expire_all()
+    page = logged_in_client.get(f"/category/{category['id']}")
+    assert b"srcset" in page.data
+
+
+def test_derivative_files_removed_with_listing(
+    app, logged_in_client, category, media_dirs, post_listing
+):
+    post_listing(category)
+    image = db.session.execute(db.select(ListingImage)).scalar_one()
+    assert os.listdir(app.config["DERIVATIVE_DIR"])
+
+    logged_in_client.post(f"/delete/{image.listing_id}")
+
+    assert _derivatives() == []
+    assert os.listdir(app.config["DERIVATIVE_DIR"]) == []
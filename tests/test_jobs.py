@@ -0,0 +1,180 @@
+"""
+Tests for the background job queue and off-request thumbnail generation.
+
+Tests cover:
+- Uploads commit without a thumbnail and queue a thumbnail job
+- The job generates the thumbnail; the placeholder is shown until then
+- Retry with backoff, failure accounting, and unreadable uploads
+- Originals are stored before the jobs that read them are committed
+- Thread mode re-dispatches a failed job once its backoff has passed
+"""
+
+import io
+import os
+import time
+
+from PIL import Image
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import create_app, db
+from app.config import TestingConfig
+from app.jobs import JOB_HANDLERS, dispatch_jobs, enqueue_job, run_pending_jobs
+from app.models import FileDeletion, Job, Listing, ListingImage
+
+
+def test_upload_queues_thumbnail_job(
+    app, logged_in_client, category, media_dirs, post_listing
+):
+    app.config["JOB_MODE"] = "worker"
+
+    response = post_listing(category)
+    assert response.status_code == 302
+
+    image = db.session.execute(db.select(ListingImage)).scalar_one()
+    assert image.thumbnail_filename is None
+    job = db.session.execute(
+        db.select(Job).where(Job.kind == "thumbnail")
+    ).scalar_one()
+    assert job.status == Job.STATUS_PENDING
+
+    # Until the job runs, cards fall back to the placeholder image
+    page = logged_in_client.get(f"/category/{category['id']}")
+    assert b"img/no-image-thumbnail.png" in page.data
+
+    assert run_pending_jobs() == 2  # thumbnail + derivatives
+    db.session.expire_all()
+    assert job.status == Job.STATUS_DONE and job.attempts == 1
+    assert image.thumbnail_filename
+    thumbnail_path = os.path.join(app.config["THUMBNAIL_DIR"], image.thumbnail_filename)
+    with Image.open(thumbnail_path) as thumbnail:
+        assert thumbnail.size == tuple(app.config["THUMBNAIL_SIZE"])
+
+
+def test_original_is_stored_when_jobs_commit(
+    app, logged_in_client, category, media_dirs, post_listing
+):
+    app.config["JOB_MODE"] = "worker"
+    stored_at_commit = []
+
+    def _check_original(session):
+        stored_at_commit.append(os.listdir(app.config["UPLOAD_DIR"]))
+
+    event.listen(Session, "before_commit", _check_original)
+    try:
+        post_listing(category)
+    finally:
+        event.remove(Session, "before_commit", _check_original)
+
+    image = db.session.execute(db.select(ListingImage)).scalar_one()
+    # The commit that queues the thumbnail job already sees the original
+    assert [image.filename] in stored_at_commit
+
+
+def test_failed_commit_hands_stored_original_to_reaper(
+    logged_in_client, category, media_dirs, post_listing
+):
+    def _fail_listing_commit(session):
+        if any(isinstance(obj, ListingImage) for obj in session.new):
+            raise RuntimeError("commit failed")
+
+    event.listen(Session, "before_flush", _fail_listing_commit)
+    try:
+        response = post_listing(category)
+    finally:
+        event.remove(Session, "before_flush", _fail_listing_commit)
+
+    assert b"Listing was not created" in response.data
+    assert db.session.execute(db.select(Listing)).first() is None
+    # JOB_MODE=inline: the reaper already removed the unused original
+    assert not os.listdir(media_dirs / "upload_dir")
+    assert db.session.execute(db.select(FileDeletion)).first() is None
+    assert not os.listdir(media_dirs / "temp_dir")
+
+
+def test_inline_mode_runs_jobs_after_commit(
+    logged_in_client, category, media_dirs, post_listing
+):
+    post_listing(category)
+
+    image = db.session.execute(db.select(ListingImage)).scalar_one()
+    assert image.thumbnail_filename is not None
+
+
+def test_unreadable_upload_is_rejected(
+    logged_in_client, category, media_dirs, post_listing
+):
+    response = post_listing(
+        category, image=io.BytesIO(b"not an image"), filename="fake.png"
+    )
+
+    assert response.status_code == 200
+    assert b"could not be read" in response.data
+    assert db.session.execute(db.select(Listing)).first() is None
+    assert not os.listdir(media_dirs / "temp_dir")
+
+
+def test_failing_job_is_retried_then_failed(app, monkeypatch):
+    calls = []
+
+    def _always_fails(payload):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(JOB_HANDLERS, "test-failure", _always_fails)
+
+    job = enqueue_job("test-failure", {"n": 1}, max_attempts=2)
+    db.session.commit()
+
+    assert run_pending_jobs() == 1
+    db.session.refresh(job)
+    assert job.status == Job.STATUS_PENDING
+    assert job.attempts == 1
+    assert job.last_error == "RuntimeError: boom"
+    # Backoff: not runnable again right away
+    assert run_pending_jobs() == 0
+
+    job.run_after = job.created_at
+    db.session.commit()
+    assert run_pending_jobs() == 1
+    db.session.refresh(job)
+    assert job.status == Job.STATUS_FAILED
+    assert job.attempts == 2
+    assert len(calls) == 2
+
+
+def test_thread_mode_retries_after_backoff(tmp_path, monkeypatch):
+    class ThreadConfig(TestingConfig):
+        # A file database: the pool threads use their own connections
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'jobs.db'}"
+        JOB_MODE = "thread"
+        JOB_RETRY_DELAY = 0.05
+
+    calls = []
+
+    def _fails_once(payload):
+        calls.append(payload)
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+
+    monkeypatch.setitem(JOB_HANDLERS, "test-transient", _fails_once)
+    app = create_app(ThreadConfig)
+    with app.app_context():
+        db.create_all()
+        job = enqueue_job("test-transient", {"n": 1})
+        db.session.commit()
+
+        # No further request dispatches jobs: the retry is scheduled by the pool
+        dispatch_jobs()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            db.session.refresh(job)
+            if job.status == Job.STATUS_DONE:
+                break
+            time.sleep(0.02)
+
+        assert job.status == Job.STATUS_DONE
+        assert job.attempts == 2
+        assert len(calls) == 2
+        app.extensions["job_executor"].shutdown(wait=True)
+        db.session.remove()
@@ -0,0 +1,124 @@
+"""
+Tests for conditional GETs of listing detail pages.
+
+Tests cover:
+- Detail pages carry a weak ETag and Last-Modified from listing.updated_at
+- If-None-Match / If-Modified-Since get 304 without loading the listing
+- updated_at moves with listing edits, new images and new derivatives
+- The ETag differs per viewer
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from app import db
+from app.models import Listing, ListingImage, ListingImageDerivative
+
+
+@pytest.fixture()
+def listing_id(category_with_children):
+    return db.session.execute(db.select(Listing.id)).scalars().first()
+
+
+def _updated_at(listing_id):
+    db.session.expire_all()
+    return db.session.get(Listing, listing_id).updated_at
+
+
+def test_detail_page_validators(client, listing_id):
+    response = client.get(f"/listing/{listing_id}")
+
+    assert response.status_code == 200
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.last_modified is not None
+    assert "Cookie" in response.headers["Vary"]
+    assert response.cache_control.no_cache
+
+
+def test_revalidation_skips_loading_the_listing(client, listing_id, query_recorder):
+    response = client.get(f"/listing/{listing_id}")
+    query_recorder.clear()
+
+    by_etag = client.get(
+        f"/listing/{listing_id}", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    queries = list(query_recorder)
+    by_date = client.get(
+        f"/listing/{listing_id}",
+        headers={"If-Modified-Since": response.headers["Last-Modified"]},
+    )
+
+    assert by_etag.status_code == 304
+    assert by_date.status_code == 304
+    # At most the category tree generation besides listing.updated_at
+    listing_queries = [query for query in queries if "cache_generation" not in query]
+    assert len(listing_queries) == 1
+    assert listing_queries[0].startswith("SELECT listing.updated_at")
+
+
+def test_missing_listing_is_404(client, category_with_children):
+    assert client.get("/listing/9999").status_code == 404
+
+
+def test_edits_change_the_version(client, listing_id):
+    etag = client.get(f"/listing/{listing_id}").headers["ETag"]
+    before = _updated_at(listing_id)
+
+    listing = db.session.get(Listing, listing_id)
+    listing.price = 999
+    db.session.commit()
+
+    after_edit = _updated_at(listing_id)
+    assert after_edit > before
+    response = client.get(f"/listing/{listing_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    image = ListingImage(
+        filename="a" * 64 + ".jpg", listing_id=listing_id, content_hash="a" * 64
+    )
+    db.session.add(image)
+    db.session.commit()
+    after_image = _updated_at(listing_id)
+    assert after_image > after_edit
+
+    db.session.add(
+        ListingImageDerivative(
+            image_id=image.id,
+            width=320,
+            height=240,
+            format="jpeg",
+            filename="a" * 64 + "-320w.jpg",
+        )
+    )
+    db.session.commit()
+    assert _updated_at(listing_id) > after_image
+
+
+def test_stale_if_modified_since_gets_page(client, listing_id):
+    response = client.get(f"/listing/{listing_id}")
+    earlier = response.last_modified - timedelta(days=1)
+
+    response = client.get(
+        f"/listing/{listing_id}",
+        headers={"If-Modified-Since": earlier.strftime("%a, %d %b %Y %H:%M:%S GMT")},
+    )
+
+    assert response.status_code == 200
+
+
+def test_etag_depends_on_viewer(client, user, listing_id):
+    anonymous = client.get(f"/listing/{listing_id}").headers["ETag"]
+    client.post(
+        "/auth/login",
+        data={"email": user["email"], "password": user["password"]},
+        follow_redirects=True,
+    )
+
+    response = client.get(
+        f"/listing/{listing_id}", headers={"If-None-Match": anonymous}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != anonymous
+    assert response.cache_control.private
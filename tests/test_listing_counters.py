@@ -0,0 +1,85 @@
+"""
+Tests for the denormalized per-category listing counters.
+
+Tests cover:
+- Counter maintenance on listing insert, delete and category change
+- Counter shifts when a category subtree is moved
+- Reconciliation of drift caused by writes that bypass the ORM
+"""
+
+from sqlalchemy import update
+
+from app import db
+from app.cli.maintenance import run_reconcile_listing_counts
+from app.models import Category, Listing
+
+
+def _counts(category_id):
+    db.session.expire_all()
+    category = db.session.get(Category, category_id)
+    return category.direct_listing_count, category.subtree_listing_count
+
+
+def test_counts_after_inserts(app, category_with_children):
+    with app.app_context():
+        ids = category_with_children
+        assert _counts(ids["parent"]["id"]) == (2, 7)
+        assert _counts(ids["musical"]["id"]) == (5, 5)
+        assert _counts(ids["appliances"]["id"]) == (0, 0)
+
+
+def test_counts_after_delete_and_category_change(app, category_with_children):
+    with app.app_context():
+        ids = category_with_children
+        listings = db.session.execute(
+            db.select(Listing).where(Listing.category_id == ids["musical"]["id"])
+        ).scalars().all()
+
+        db.session.delete(listings[0])
+        listings[1].category_id = ids["appliances"]["id"]
+        db.session.commit()
+
+        assert _counts(ids["musical"]["id"]) == (3, 3)
+        assert _counts(ids["appliances"]["id"]) == (1, 1)
+        assert _counts(ids["parent"]["id"]) == (2, 6)
+
+
+def test_counts_follow_moved_subtree(app, category_with_children):
+    with app.app_context():
+        ids = category_with_children
+        other_root = Category(name="Other root", url_name="other-root")
+        db.session.add(other_root)
+        db.session.commit()
+
+        musical = db.session.get(Category, ids["musical"]["id"])
+        musical.parent_id = other_root.id
+        db.session.commit()
+
+        assert _counts(ids["parent"]["id"]) == (2, 2)
+        assert _counts(other_root.id) == (0, 5)
+
+
+def test_reconcile_repairs_drift(app, category_with_children, capsys):
+    with app.app_context():
+        ids = category_with_children
+        db.session.execute(
+            update(Category)
+            .where(Category.id == ids["parent"]["id"])
+            .values(direct_listing_count=99, subtree_listing_count=0)
+        )
+        db.session.commit()
+
+        run_reconcile_listing_counts()
+
+        assert _counts(ids["parent"]["id"]) == (2, 7)
+        assert "Corrected listing counters for 1 categories." in capsys.readouterr().out
+
+
+def test_showcase_selection_reads_counters(app, client, showcase_categories, query_recorder):
+    client.get("/")
+    query_recorder.clear()
+
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert not any("GROUP BY" in statement for statement in query_recorder)
@@ -170,3 +170,34 @@ def test_other_category_section(app, client, category_with_children):
         # Verify "Other {category}" section renders
         # (Goods has 2 direct listings that should appear in "Other Goods")
         assert b"General Good" in response.data
+
+
+def test_showcase_pools_bounded_in_sql(app, category_with_children, query_recorder):
+    """
+    Verify that showcase pools take direct listings first, top up from
+    descendants, stop at fetch_limit, and come from one windowed query.
+    """
+    from app.category_tree import get_category_tree
+    from app.models import Listing, db
+    from app.routes.listings.helpers import get_showcase_pools
+
+    with app.app_context():
+        tree = get_category_tree()
+        goods = tree.get(category_with_children["parent"]["id"])
+        musical = tree.get(category_with_children["musical"]["id"])
+        appliances = tree.get(category_with_children["appliances"]["id"])
+
+        query_recorder.clear()
+        pools = get_showcase_pools([goods, musical, appliances], fetch_limit=4)
+
+        assert len(query_recorder) == 1
+        assert "row_number() OVER" in query_recorder[0]
+        assert len(pools[goods.id]) == 4
+        assert len(pools[musical.id]) == 4
+        assert appliances.id not in pools
+
+        categories = [
+            db.session.get(Listing, listing_id).category_id
+            for listing_id in pools[goods.id]
+        ]
+        assert categories == [goods.id, goods.id, musical.id, musical.id]
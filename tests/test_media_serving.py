@@ -0,0 +1,103 @@
+"""
+Tests for media serving and long-lived caching.
+
+Tests cover:
+- Content-named media get a strong ETag, an immutable Cache-Control and 304s
+- Legacy (uuid-named) media get the shorter MEDIA_CACHE_MAX_AGE
+- X-Accel-Redirect / X-Sendfile modes hand files off without sending them
+- Unknown areas and unsafe names are rejected
+- CSS/JS URLs are fingerprinted and cached as immutable
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+CONTENT_NAME = "ab" * 32 + "-224x224.jpg"
+
+
+@pytest.fixture()
+def thumbnail(app, media_dirs):
+    path = os.path.join(app.config["THUMBNAIL_DIR"], CONTENT_NAME)
+    Image.new("RGB", (224, 224), color="red").save(path, "JPEG")
+    return path
+
+
+def test_content_named_media_is_immutable(app, client, thumbnail):
+    response = client.get(f"/media/thumbnails/{CONTENT_NAME}")
+
+    assert response.status_code == 200
+    assert response.mimetype == "image/jpeg"
+    assert response.headers["ETag"] == f'"{CONTENT_NAME[:-4]}"'
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 60 * 60
+
+    revalidated = client.get(
+        f"/media/thumbnails/{CONTENT_NAME}",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert revalidated.status_code == 304
+
+
+def test_legacy_media_uses_short_max_age(app, client, media_dirs):
+    name = "0f1e2d3c4b5a69788796a5b4c3d2e1f0.png"
+    Image.new("RGB", (10, 10)).save(os.path.join(app.config["UPLOAD_DIR"], name))
+
+    response = client.get(f"/media/uploads/{name}")
+
+    assert response.status_code == 200
+    assert not response.cache_control.immutable
+    assert response.cache_control.max_age == app.config["MEDIA_CACHE_MAX_AGE"]
+
+
+def test_x_accel_redirect_hands_off(app, client, media_dirs):
+    app.config["MEDIA_SEND_MODE"] = "x-accel-redirect"
+
+    response = client.get(f"/media/thumbnails/{CONTENT_NAME}")
+
+    assert response.status_code == 200
+    assert response.data == b""
+    assert response.headers["X-Accel-Redirect"] == f"/_media/thumbnails/{CONTENT_NAME}"
+    assert response.mimetype == "image/jpeg"
+    assert response.cache_control.immutable
+
+    revalidated = client.get(
+        f"/media/thumbnails/{CONTENT_NAME}",
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert revalidated.status_code == 304
+    assert "X-Accel-Redirect" not in revalidated.headers
+
+
+def test_x_sendfile_hands_off(app, client, media_dirs):
+    app.config["MEDIA_SEND_MODE"] = "x-sendfile"
+
+    response = client.get(f"/media/thumbnails/{CONTENT_NAME}")
+
+    assert response.data == b""
+    assert response.headers["X-Sendfile"] == os.path.join(
+        app.config["THUMBNAIL_DIR"], CONTENT_NAME
+    )
+
+
+@pytest.mark.parametrize(
+    "path", ["/media/temp/x.jpg", "/media/uploads/..", "/media/uploads/missing.jpg"]
+)
+def test_rejected_media_paths(app, client, media_dirs, path):
+    assert client.get(path).status_code == 404
+
+
+def test_assets_are_fingerprinted(app, client):
+    page = client.get("/")
+    assert b"/static/css/styles.css?v=" in page.data
+
+    start = page.data.index(b"/static/css/styles.css?v=")
+    url = page.data[start : page.data.index(b'"', start)].decode()
+    response = client.get(url)
+    assert response.cache_control.immutable
+    response.close()
+
+    stale = client.get("/static/css/styles.css?v=0")
+    assert not stale.cache_control.immutable
+    stale.close()
@@ -0,0 +1,141 @@
+"""
+Tests for the anonymous full-page cache.
+
+Tests cover:
+- Anonymous pages are served from the cache with ETag, Last-Modified, Vary
+- A cache hit only reads the content generation
+- Conditional requests get 304 (If-None-Match and If-Modified-Since)
+- Keys include the query string
+- Listing and category writes invalidate cached pages
+- Logged-in users and pages with flash messages bypass the cache
+- Cached pages survive the Redis store's serialization
+"""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app import db
+from app.models import Category, Listing
+from app.page_cache import CachedPage, RedisPageStore
+
+
+@pytest.fixture()
+def page_cache(app):
+    app.config["PAGE_CACHE_ENABLED"] = True
+    return app
+
+
+def test_anonymous_pages_are_cached(page_cache, client, category_with_children):
+    first = client.get("/goods")
+    second = client.get("/goods")
+
+    assert first.headers["X-Page-Cache"] == "miss"
+    assert second.headers["X-Page-Cache"] == "hit"
+    assert second.data == first.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second.headers["Last-Modified"] == first.headers["Last-Modified"]
+    assert "Cookie" in second.headers["Vary"]
+    assert second.cache_control.no_cache
+
+    # The query string is part of the key
+    assert client.get("/goods?view=listings").headers["X-Page-Cache"] == "miss"
+
+
+def test_hit_reads_only_the_generation(
+    page_cache, client, category_with_children, query_recorder
+):
+    client.get("/goods/musical-instruments")
+    query_recorder.clear()
+
+    assert client.get("/goods/musical-instruments").headers["X-Page-Cache"] == "hit"
+
+    assert len(query_recorder) == 1
+    assert "cache_generation" in query_recorder[0]
+
+
+def test_conditional_requests(page_cache, client, category_with_children):
+    response = client.get("/")
+
+    by_etag = client.get("/", headers={"If-None-Match": response.headers["ETag"]})
+    by_date = client.get(
+        "/", headers={"If-Modified-Since": response.headers["Last-Modified"]}
+    )
+
+    assert by_etag.status_code == 304
+    assert by_etag.data == b""
+    assert by_date.status_code == 304
+
+
+def test_writes_invalidate_pages(page_cache, client, category_with_children):
+    goods = category_with_children["parent"]
+    listing_id = db.session.execute(
+        db.select(Listing.id).where(Listing.category_id == goods["id"])
+    ).scalars().first()
+    url = f"/listing/{listing_id}"
+    client.get(url)
+    client.get("/goods")
+
+    listing = db.session.get(Listing, listing_id)
+    listing.title = "Renamed good"
+    db.session.commit()
+
+    response = client.get(url)
+    assert response.headers["X-Page-Cache"] == "miss"
+    assert b"Renamed good" in response.data
+
+    client.get("/goods")
+    category = db.session.get(Category, goods["id"])
+    category.name = "Stuff"
+    db.session.commit()
+
+    response = client.get("/goods")
+    assert response.headers["X-Page-Cache"] == "miss"
+    assert b"Stuff" in response.data
+
+
+def test_authenticated_users_bypass_cache(
+    page_cache, client, login, user, category_with_children
+):
+    client.get("/goods")
+    login(user)
+
+    response = client.get("/goods")
+
+    assert "X-Page-Cache" not in response.headers
+    assert user["email"].encode() in response.data
+
+
+def test_disabled_by_default(app, client, category_with_children):
+    client.get("/goods")
+    assert "X-Page-Cache" not in client.get("/goods").headers
+
+
+class _DictRedis:
+    """Just enough of a Redis client for RedisPageStore."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def test_redis_store_round_trip():
+    store = RedisPageStore({}, client=_DictRedis())
+    page = CachedPage(
+        body=b"<html>\n<body>hi</body></html>",
+        content_type="text/html; charset=utf-8",
+        etag="abc",
+        last_modified=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        expires_at=time.time() + 60,
+    )
+
+    store.set("1:/?", page, 60)
+
+    assert store.get("1:/?") == page
+    assert store.get("2:/?") is None
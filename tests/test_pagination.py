@@ -0,0 +1,116 @@
+"""
+Tests for offset and keyset (cursor) pagination of listing grids.
+
+Tests cover:
+- Cursor encoding round trips and malformed cursors
+- Walking forward and back through a category grid with cursors
+- Keyset mode selected by configuration
+- Totals read from category counters instead of COUNT(*)
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import Category, Listing
+from app.routes.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+
+@pytest.fixture()
+def many_listings(app, user):
+    """A category with 30 listings, ten of them sharing one timestamp."""
+    with app.app_context():
+        category = Category(name="Books", url_name="books")
+        db.session.add(category)
+        db.session.commit()
+
+        base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        for index in range(30):
+            # Listings 10-19 share a timestamp so the id tiebreaker matters
+            offset = 10 if 10 <= index < 20 else index
+            listing = Listing(
+                title=f"Book {index:02d}",
+                description="A book listing.",
+                price=float(index),
+                user_id=user["id"],
+                category_id=category.id,
+            )
+            listing.created_at = base + timedelta(minutes=offset)
+            db.session.add(listing)
+        db.session.commit()
+        newest_first = db.session.execute(
+            db.select(Listing.id).order_by(
+                Listing.created_at.desc(), Listing.id.desc()
+            )
+        ).scalars().all()
+        return {"category_id": category.id, "ids": newest_first}
+
+
+def _page_titles(response):
+    # Each card shows its title more than once (image alt text and heading)
+    titles = re.findall(r"Book \d\d", response.get_data(as_text=True))
+    return list(dict.fromkeys(titles))
+
+
+def _cursor_link(response, name):
+    match = re.search(rf"[?&;]{name}=([A-Za-z0-9_-]+)", response.get_data(as_text=True))
+    return match.group(1) if match else None
+
+
+def test_cursor_round_trip_and_garbage():
+    created_at = datetime(2025, 3, 4, 5, 6, 7, 891011)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    assert decode_cursor("not-a-cursor!") is None
+    assert decode_cursor("") is None
+
+
+def test_keyset_pages_cover_every_listing_once(app, many_listings):
+    query = db.select(Listing).where(
+        Listing.category_id == many_listings["category_id"]
+    )
+    with app.test_request_context():
+        seen = []
+        page = keyset_paginate(query, per_page=7)
+        assert not page.has_prev
+        while True:
+            seen.extend(listing.id for listing in page.items)
+            if not page.has_next:
+                break
+            page = keyset_paginate(query, per_page=7, after=page.next_cursor)
+        assert seen == many_listings["ids"]
+
+        # Walking back from the last page returns the previous window
+        previous = keyset_paginate(query, per_page=7, before=page.prev_cursor)
+        assert [listing.id for listing in previous.items] == many_listings["ids"][21:28]
+        assert previous.has_next and previous.has_prev
+
+
+def test_category_grid_cursor_links(app, client, many_listings):
+    app.config["LISTING_PAGINATION_MODE"] = "keyset"
+    url = f"/category/{many_listings['category_id']}"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert len(_page_titles(first)) == 24
+    assert "30 listings" in first.get_data(as_text=True)
+    next_cursor = _cursor_link(first, "after")
+    assert next_cursor is not None
+    assert _cursor_link(first, "before") is None
+
+    second = client.get(f"{url}?after={next_cursor}")
+    assert len(_page_titles(second)) == 6
+    assert set(_page_titles(first)).isdisjoint(_page_titles(second))
+
+    back = client.get(f"{url}?before={_cursor_link(second, 'before')}")
+    assert _page_titles(back) == _page_titles(first)
+
+
+def test_offset_grid_total_from_counters(client, many_listings, query_recorder):
+    response = client.get("/books?page=2")
+    assert response.status_code == 200
+    assert len(_page_titles(response)) == 6
+    assert not any("count(" in statement.lower() for statement in query_recorder)
+    # Page links stay on the category route
+    assert "/books?page=1" in response.get_data(as_text=True)
@@ -0,0 +1,123 @@
+"""
+Query-plan regression tests (SQLite).
+
+Checks that the hot listing queries are served by the composite indexes
+instead of full table scans plus temporary sort B-trees. The category grid
+and showcase plans are taken from the statements the production code issues
+(recorded while it runs), so a change to those queries or to the indexes
+fails here.
+"""
+
+import pytest
+from sqlalchemy import event, select, text
+
+from app import db
+from app.category_tree import get_category_tree
+from app.models import Listing, ListingImage
+from app.routes.listings.helpers import get_showcase_pools
+from app.routes.pagination import encode_cursor
+
+GRID_ORDER_BY = "ORDER BY listing.created_at DESC, listing.id DESC"
+
+
+@pytest.fixture()
+def recorded_statements(app):
+    """Record (statement, parameters) of every SQL statement executed."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", _record)
+
+
+def _query_plan(statement):
+    compiled = statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def _recorded_plan(statements, marker):
+    """Plan of the one recorded statement containing `marker`."""
+    matches = [(sql, params) for sql, params in statements if marker in sql]
+    assert len(matches) == 1, f"expected one statement with {marker!r}"
+    # Stop recording: EXPLAIN runs through the same engine
+    statements.clear()
+    sql, params = matches[0]
+    rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+    return " | ".join(row[-1] for row in rows)
+
+
+def _grid_plan(client, recorded_statements, url):
+    recorded_statements.clear()
+    assert client.get(url).status_code == 200
+    return _recorded_plan(recorded_statements, GRID_ORDER_BY)
+
+
+def test_leaf_category_grid_sorts_by_index(
+    client, category_with_children, recorded_statements
+):
+    plan = _grid_plan(
+        client,
+        recorded_statements,
+        f"/category/{category_with_children['musical']['id']}",
+    )
+    assert "USING INDEX ix_listing_category_id_created_at (category_id=?)" in plan
+    # (category_id, created_at) entries end with the rowid: no sort needed
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.parametrize("mode", ["offset", "keyset"])
+def test_subtree_category_grid_uses_category_index(
+    app, client, category_with_children, recorded_statements, mode
+):
+    app.config["LISTING_PAGINATION_MODE"] = mode
+    url = f"/category/{category_with_children['parent']['id']}"
+    if mode == "keyset":
+        newest = db.session.execute(
+            select(Listing).order_by(Listing.created_at.desc(), Listing.id.desc())
+        ).scalars().first()
+        url += f"?after={encode_cursor(newest.created_at, newest.id)}"
+
+    plan = _grid_plan(client, recorded_statements, url)
+
+    # Keyset pages also seek to the cursor within each category's range
+    assert "USING INDEX ix_listing_category_id_created_at (category_id=?" in plan
+    assert "SCAN listing" not in plan
+
+
+def test_showcase_pool_query_uses_category_index(
+    app, category_with_children, recorded_statements
+):
+    with app.test_request_context():
+        parent = get_category_tree().get(category_with_children["parent"]["id"])
+        recorded_statements.clear()
+        pools = get_showcase_pools([parent], fetch_limit=10)
+
+        plan = _recorded_plan(recorded_statements, "row_number() OVER")
+
+    assert len(pools[parent.id]) == 7
+    # One index range per (showcase, category) pair, never a listing scan
+    assert "INDEX ix_listing_category_id_created_at (category_id=?)" in plan
+    assert "SCAN listing" not in plan
+
+
+def test_user_listings_query_uses_user_index(app):
+    with app.app_context():
+        plan = _query_plan(
+            select(Listing)
+            .where(Listing.user_id == 1)
+            .order_by(Listing.created_at.desc())
+        )
+        assert "ix_listing_user_id_created_at" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_listing_images_lookup_uses_index(app):
+    with app.app_context():
+        plan = _query_plan(
+            select(ListingImage).where(ListingImage.listing_id.in_([1, 2, 3]))
+        )
+        assert "ix_listing_image_listing_id" in plan
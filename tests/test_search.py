@@ -0,0 +1,129 @@
+"""
+Tests for listing full-text search.
+
+Tests cover:
+- Index sync on listing insert, edit and delete
+- Ranking (title matches before description matches) and prefix matching
+- Category subtree filtering on the /search route
+- Rebuilding the index from the listing table
+- Autogenerate leaving the index tables alone
+- Incomplete backends cannot be instantiated
+"""
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import text
+
+from app import db
+from app.cli.maintenance import run_rebuild_search_index
+from app.models import Listing
+from app.search import (
+    SearchBackend,
+    SQLiteFTS5Backend,
+    is_search_index_object,
+    search_listings,
+)
+
+
+def _add_listing(title, description, user_id, category_id):
+    listing = Listing(
+        title=title,
+        description=description,
+        price=1.0,
+        user_id=user_id,
+        category_id=category_id,
+    )
+    db.session.add(listing)
+    db.session.commit()
+    return listing.id
+
+
+def _search(query_text, category_ids=None):
+    statement = search_listings(db.session, query_text, category_ids)
+    if statement is None:
+        return []
+    return [listing.title for listing in db.session.execute(statement).scalars()]
+
+
+def test_index_follows_listing_writes(app, user, category):
+    with app.app_context():
+        listing_id = _add_listing(
+            "Vintage guitar", "Solid spruce top.", user["id"], category["id"]
+        )
+        assert _search("guitar") == ["Vintage guitar"]
+
+        listing = db.session.get(Listing, listing_id)
+        listing.title = "Vintage banjo"
+        db.session.commit()
+        assert _search("guitar") == []
+        assert _search("banjo") == ["Vintage banjo"]
+
+        db.session.delete(listing)
+        db.session.commit()
+        assert _search("banjo") == []
+
+
+def test_title_matches_rank_first_and_prefixes_match(app, user, category):
+    with app.app_context():
+        _add_listing(
+            "Amplifier", "Works great with any guitar.", user["id"], category["id"]
+        )
+        _add_listing("Guitar strings", "Nickel wound.", user["id"], category["id"])
+
+        assert _search("guitar") == ["Guitar strings", "Amplifier"]
+        assert _search("guit") == ["Guitar strings", "Amplifier"]
+        # Operators and quotes in user input are treated as plain words
+        assert _search('"guitar" OR NEAR(') == []
+        assert _search("  ") == []
+
+
+def test_search_route_filters_by_subtree(client, category_with_children):
+    goods_id = category_with_children["parent"]["id"]
+    musical_id = category_with_children["musical"]["id"]
+    appliances_id = category_with_children["appliances"]["id"]
+
+    response = client.get(f"/search?q=instrument&category={goods_id}")
+    assert response.status_code == 200
+    assert b"Musical Instrument 1" in response.data
+    assert b"5 results" in response.data
+
+    response = client.get(f"/search?q=instrument&category={musical_id}")
+    assert b"5 results" in response.data
+
+    response = client.get(f"/search?q=instrument&category={appliances_id}")
+    assert b"No listings match" in response.data
+
+
+def test_rebuild_search_index(app, category_with_children, capsys):
+    with app.app_context():
+        db.session.execute(text("DELETE FROM listing_fts"))
+        db.session.commit()
+        assert _search("instrument") == []
+
+        run_rebuild_search_index()
+
+        assert "Indexed 7 listings." in capsys.readouterr().out
+        assert len(_search("instrument")) == 5
+
+
+def test_autogenerate_skips_search_index_tables(app):
+    def include_name(name, type_, parent_names):
+        return not is_search_index_object(name, type_, parent_names)
+
+    with app.app_context(), db.engine.connect() as connection:
+        tables = set(db.inspect(connection).get_table_names())
+        assert {"listing_fts", "listing_fts_data", "listing_fts_idx"} <= tables
+
+        context = MigrationContext.configure(
+            connection, opts={"include_name": include_name}
+        )
+        assert compare_metadata(context, db.metadata) == []
+
+
+def test_incomplete_backend_rejected():
+    class NoMatch(SQLiteFTS5Backend):
+        match = SearchBackend.match
+
+    with pytest.raises(TypeError, match="match"):
+        NoMatch()
@@ -0,0 +1,58 @@
+"""
+Tests for the cached home page showcase bundle.
+
+Tests cover:
+- Listings generation bumps on deletes but not on plain edits
+- Cache hits skip category selection and pool queries
+- Listing writes invalidate the cached pools
+"""
+
+from app import db
+from app.models import LISTINGS_GENERATION, Listing, get_cache_generation
+
+
+def _listings_generation():
+    return get_cache_generation(db.session, LISTINGS_GENERATION)
+
+
+def test_listings_generation_tracks_membership_changes(app, listing):
+    with app.app_context():
+        start = _listings_generation()
+        item = db.session.get(Listing, listing["id"])
+
+        item.title = "Renamed"
+        db.session.commit()
+        assert _listings_generation() == start
+
+        db.session.delete(item)
+        db.session.commit()
+        assert _listings_generation() == start + 1
+
+
+def test_cache_hit_is_one_listing_fetch(client, showcase_categories, query_recorder):
+    client.get("/")
+    query_recorder.clear()
+
+    response = client.get("/")
+
+    assert response.status_code == 200
+    listing_queries = [s for s in query_recorder if "FROM listing " in s + " "]
+    # Only the IN fetch of the sampled listings; no pool or category scans
+    assert len(listing_queries) == 1
+    assert "listing.id IN" in listing_queries[0]
+    assert not any("direct_listing_count DESC" in s for s in query_recorder)
+
+
+def test_listing_writes_invalidate_pools(app, client, showcase_categories):
+    client.get("/")
+    with app.app_context():
+        for item in db.session.execute(
+            db.select(Listing).where(
+                Listing.category_id == showcase_categories["sports"]["id"]
+            )
+        ).scalars():
+            db.session.delete(item)
+        db.session.commit()
+
+    for _ in range(5):
+        assert b"Sports Listing" not in client.get("/").data
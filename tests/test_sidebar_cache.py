@@ -0,0 +1,91 @@
+"""
+Tests for the cached sidebar category tree.
+
+Tests cover:
+- The active category is highlighted and its ancestors expanded
+- The tree macro runs once per category tree generation
+- A category write invalidates the cached HTML
+- No slot markers leak into pages
+"""
+
+import re
+
+import pytest
+
+from app import db
+from app.models import Category
+from app.sidebar_cache import SidebarCache
+
+
+def _link(html, url_name):
+    """Class attribute of the sidebar link to a category."""
+    match = re.search(
+        r'class="(nav-link px-0 flex-grow-1 text-dark[^"]*)"\s+href="[^"]*/' + url_name + '"',
+        html,
+    )
+    return match.group(1)
+
+
+def _collapse(html, category_id):
+    return re.search(r'class="(collapse ms-3[^"]*)" id="catcollapse%d"' % category_id, html).group(1)
+
+
+@pytest.fixture()
+def render_counter(app, monkeypatch):
+    import app.sidebar_cache as sidebar_cache
+
+    calls = []
+    render = sidebar_cache._render_tree
+
+    def counting_render(tree):
+        calls.append(tree.generation)
+        return render(tree)
+
+    monkeypatch.setattr(sidebar_cache, "_render_tree", counting_render)
+    app.extensions["sidebar_cache"].clear()
+    return calls
+
+
+def test_active_category_state(client, category_with_children):
+    parent = category_with_children["parent"]
+
+    html = client.get("/goods/musical-instruments").get_data(as_text=True)
+
+    assert _link(html, "musical-instruments").endswith(" active")
+    assert not _link(html, "home-appliances").endswith(" active")
+    assert _collapse(html, parent["id"]).endswith(" show")
+    assert 'aria-expanded="true"' in html
+    assert "\x1a" not in html
+
+    html = client.get("/").get_data(as_text=True)
+    assert " active" not in _link(html, "goods")
+    assert _collapse(html, parent["id"]) == "collapse ms-3"
+    assert "\x1a" not in html
+
+
+def test_tree_rendered_once_per_generation(client, category_with_children, render_counter):
+    for path in ("/", "/goods", "/goods/musical-instruments", "/goods"):
+        assert client.get(path).status_code == 200
+
+    assert len(render_counter) == 1
+
+    db.session.add(Category(name="Vehicles", url_name="vehicles"))
+    db.session.commit()
+
+    html = client.get("/goods").get_data(as_text=True)
+    assert "Vehicles" in html
+    assert len(render_counter) == 2
+    assert render_counter[1] > render_counter[0]
+
+
+def test_page_lru_is_bounded():
+    cache = SidebarCache()
+
+    def render():
+        return "<a class='x\x1aactive:1\x1a'></a><a class='x\x1aactive:2\x1a'></a>"
+
+    for active_id in (1, 2, None):
+        cache.get((1, ""), active_id, (), render, max_entries=2)
+
+    assert list(cache._pages) == [2, None]
+    assert cache._pages[2] == "<a class='x'></a><a class='x active'></a>"
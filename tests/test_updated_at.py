@@ -0,0 +1,93 @@
+"""
+Tests for updated_at versioning and the content generation.
+
+Tests cover:
+- Category updated_at moves with its columns and ancestor moves, not counters
+- Every content write bumps the content generation and its timestamp
+- Listing pages take Last-Modified from the category tree as well
+"""
+
+from datetime import timedelta
+
+from app import db
+from app.models import (
+    CONTENT_GENERATION,
+    Category,
+    Listing,
+    get_cache_generation_state,
+)
+
+
+def _category(category_id):
+    db.session.expire_all()
+    return db.session.get(Category, category_id)
+
+
+def test_category_updated_at(category_with_children, user):
+    parent_id = category_with_children["parent"]["id"]
+    musical_id = category_with_children["musical"]["id"]
+    before = _category(parent_id).updated_at
+
+    # Counter updates are not changes of the category
+    db.session.add(
+        Listing(
+            title="Drum",
+            description="A drum.",
+            price=5,
+            user_id=user["id"],
+            category_id=musical_id,
+        )
+    )
+    db.session.commit()
+    assert _category(parent_id).updated_at == before
+
+    category = _category(parent_id)
+    category.name = "Things"
+    db.session.commit()
+    renamed = _category(parent_id).updated_at
+    assert renamed > before
+
+    # Moving a category rewrites (and touches) its subtree's paths
+    other = Category(name="Other", url_name="other")
+    db.session.add(other)
+    db.session.commit()
+    musical_before = _category(musical_id).updated_at
+    category = _category(parent_id)
+    category.parent_id = other.id
+    db.session.commit()
+    assert _category(musical_id).updated_at > musical_before
+
+
+def test_content_generation_state(category_with_children):
+    value, bumped_at = get_cache_generation_state(db.session, CONTENT_GENERATION)
+
+    listing = db.session.execute(db.select(Listing)).scalars().first()
+    listing.title = "Edited"
+    db.session.commit()
+
+    new_value, new_bumped_at = get_cache_generation_state(
+        db.session, CONTENT_GENERATION
+    )
+    assert new_value == value + 1
+    assert new_bumped_at > bumped_at
+    assert get_cache_generation_state(db.session, "never-bumped") == (0, None)
+
+
+def test_listing_last_modified_follows_categories(client, category_with_children):
+    listing_id = db.session.execute(db.select(Listing.id)).scalars().first()
+    first = client.get(f"/listing/{listing_id}").last_modified
+
+    category = _category(category_with_children["parent"]["id"])
+    category.name = "Things"
+    db.session.commit()
+    # Pretend the rename happened a while after the listing was last seen
+    category = _category(category_with_children["parent"]["id"])
+    category.updated_at = first + timedelta(hours=1)
+    db.session.commit()
+
+    response = client.get(
+        f"/listing/{listing_id}",
+        headers={"If-Modified-Since": first.strftime("%a, %d %b %Y %H:%M:%S GMT")},
+    )
+    assert response.status_code == 200
+    assert response.last_modified > first
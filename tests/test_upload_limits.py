@@ -0,0 +1,86 @@
+"""
+Tests for upload size, format and pixel-budget checks.
+
+Tests cover:
+- Files whose leading bytes are not an accepted image are never written
+- Per-file byte cap and request-wide MAX_CONTENT_LENGTH (413)
+- Pixel budget enforced from the header, without decoding the image
+"""
+
+import io
+import os
+
+import pytest
+from PIL import Image, ImageFile
+from werkzeug.datastructures import FileStorage
+
+from app import db
+from app.models import Listing
+from app.routes.utils import UploadRejected, save_image_upload
+
+
+def test_accepts_valid_image(app, tmp_path, png):
+    path = tmp_path / "ok.png"
+    save_image_upload(FileStorage(png(size=(64, 48)), "ok.png"), str(path))
+    with Image.open(path) as img:
+        assert img.size == (64, 48)
+
+
+@pytest.mark.parametrize(
+    "data, reason",
+    [
+        (b"<?php echo 'hi'; ?>", "could not be read as a JPEG, PNG or GIF"),
+        # PNG signature followed by garbage: rejected when parsing the header
+        (b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, "could not be read"),
+    ],
+)
+def test_rejects_non_images(app, tmp_path, data, reason):
+    path = tmp_path / "bad.png"
+    with pytest.raises(UploadRejected, match=reason):
+        save_image_upload(FileStorage(io.BytesIO(data), "bad.png"), str(path))
+    assert not path.exists()
+
+
+def test_rejects_files_over_byte_cap(app, tmp_path, png):
+    app.config["UPLOAD_MAX_FILE_SIZE"] = 100
+    path = tmp_path / "big.png"
+    with pytest.raises(UploadRejected, match="is larger than"):
+        save_image_upload(FileStorage(png(size=(64, 48)), "big.png"), str(path))
+    assert not path.exists()
+
+
+def test_pixel_budget_checked_without_decoding(app, tmp_path, monkeypatch, png):
+    app.config["IMAGE_MAX_PIXELS"] = 1000
+
+    def _no_decode(self):
+        raise AssertionError("image was decoded")
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load", _no_decode)
+    path = tmp_path / "wide.png"
+    with pytest.raises(UploadRejected, match=r"64x48 pixels"):
+        save_image_upload(FileStorage(png(size=(64, 48)), "wide.png"), str(path))
+    assert not path.exists()
+
+
+def test_rejected_upload_shows_reason(
+    app, logged_in_client, category, media_dirs, post_listing
+):
+    app.config["UPLOAD_MAX_FILE_SIZE"] = 100
+
+    response = post_listing(category)
+
+    assert response.status_code == 200
+    assert b"is larger than" in response.data
+    assert db.session.execute(db.select(Listing)).first() is None
+    assert not os.listdir(media_dirs / "temp_dir")
+
+
+def test_request_over_max_content_length(
+    app, logged_in_client, category, media_dirs, post_listing
+):
+    app.config["MAX_CONTENT_LENGTH"] = 1024
+
+    response = post_listing(category, image=io.BytesIO(b"\x00" * 4096))
+
+    assert response.status_code == 413
+    assert b"Upload too large" in response.data
@@ -0,0 +1,128 @@
+"""
+Tests for deleting users in a background job.
+
+Tests cover:
+- The request only queues the job; the worker deletes the user and listings
+- Listings are deleted in chunks and the job reports its progress
+- The users page and the status endpoint show the job
+- Deletion jobs are looked up by their indexed subject id
+- A second request while the job is pending does not queue another one
+"""
+
+from app import db
+from app.jobs import run_pending_jobs
+from app.models import Category, Job, Listing, User
+from app.routes.users import DELETE_USER_JOB, get_user_deletions
+
+
+def _add_listings(user_id, category_id, count):
+    for i in range(count):
+        db.session.add(
+            Listing(
+                title=f"Listing {i}",
+                description="For sale.",
+                price=10,
+                user_id=user_id,
+                category_id=category_id,
+            )
+        )
+    db.session.commit()
+
+
+def _deletion_job():
+    return db.session.execute(
+        db.select(Job).where(Job.kind == DELETE_USER_JOB)
+    ).scalar_one()
+
+
+def test_delete_user_runs_as_job(app, client, login, admin_user, user, category):
+    app.config["JOB_MODE"] = "worker"
+    app.config["USER_DELETE_CHUNK_SIZE"] = 2
+    _add_listings(user["id"], category["id"], 5)
+    login(admin_user)
+
+    response = client.post(f"/admin/users/delete/{user['id']}")
+
+    assert response.status_code == 302
+    job = _deletion_job()
+    assert job.status == Job.STATUS_PENDING
+    assert job.payload == {"user_id": user["id"]}
+    assert job.subject_id == user["id"]
+    assert db.session.get(User, user["id"]) is not None
+    page = client.get("/admin/users")
+    assert f"Deleting (job #{job.id})".encode() in page.data
+    assert f'data-delete-job="/admin/users/delete/status/{job.id}"'.encode() in page.data
+    assert b"js/deletion_status.js" in page.data
+
+    run_pending_jobs()
+
+    db.session.expire_all()
+    job = _deletion_job()
+    assert job.status == Job.STATUS_DONE
+    assert (job.progress, job.progress_total) == (5, 5)
+    assert db.session.get(User, user["id"]) is None
+    assert db.session.execute(db.select(Listing)).all() == []
+    assert db.session.get(Category, category["id"]).subtree_listing_count == 0
+
+
+def test_delete_status_endpoint(app, client, login, admin_user, user, category):
+    app.config["JOB_MODE"] = "worker"
+    _add_listings(user["id"], category["id"], 3)
+    login(admin_user)
+    client.post(f"/admin/users/delete/{user['id']}")
+    job_id = _deletion_job().id
+
+    pending = client.get(f"/admin/users/delete/status/{job_id}").get_json()
+    assert pending["status"] == Job.STATUS_PENDING
+    assert pending["user_id"] == user["id"]
+
+    run_pending_jobs()
+
+    done = client.get(f"/admin/users/delete/status/{job_id}").get_json()
+    assert done == {
+        "id": job_id,
+        "user_id": user["id"],
+        "status": Job.STATUS_DONE,
+        "progress": 3,
+        "progress_total": 3,
+        "error": None,
+    }
+
+
+def test_delete_user_is_queued_once(app, client, login, admin_user, user):
+    app.config["JOB_MODE"] = "worker"
+    login(admin_user)
+
+    client.post(f"/admin/users/delete/{user['id']}")
+    response = client.post(
+        f"/admin/users/delete/{user['id']}", follow_redirects=True
+    )
+
+    assert b"already being deleted" in response.data
+    assert len(db.session.execute(db.select(Job)).all()) == 1
+
+
+def test_delete_user_inline(app, client, login, admin_user, user, category):
+    _add_listings(user["id"], category["id"], 2)
+    login(admin_user)
+
+    client.post(f"/admin/users/delete/{user['id']}")
+
+    db.session.expire_all()
+    assert db.session.get(User, user["id"]) is None
+    assert db.session.execute(db.select(Listing)).all() == []
+
+
+def test_user_deletions_filtered_in_sql(app, user, admin_user, query_recorder):
+    for subject_id in (user["id"], admin_user["id"], 999):
+        job = Job(DELETE_USER_JOB, {"user_id": subject_id}, subject_id=subject_id)
+        job.status = Job.STATUS_FAILED
+        db.session.add(job)
+    db.session.commit()
+    query_recorder.clear()
+
+    deletions = get_user_deletions([user["id"]])
+
+    assert list(deletions) == [user["id"]]
+    assert any("job.subject_id IN" in statement for statement in query_recorder)
+    assert get_user_deletions([]) == {}